@@ -2,11 +2,43 @@
 Inventory Agent - Optimizes inventory levels and reorder points
 """
 import math
+from statistics import NormalDist
+import numpy as np
+try:
+    from agents.inventory_store import MemoryInventoryStore
+except ImportError:  # run as a script: python agents/inventory_agent.py
+    from inventory_store import MemoryInventoryStore
+try:
+    from metrics import timed
+except ImportError:  # run as a script: hot paths are not timed
+    from contextlib import nullcontext as timed
+
+# Default grid for the service-level solver: 50% to 99.9% cycle service level
+SERVICE_LEVEL_GRID = np.round(np.concatenate([np.arange(0.50, 0.99, 0.01), np.arange(0.99, 0.9991, 0.001)]), 4)
+
+def service_level_z(service_level):
+    """
+    z-score (inverse normal CDF) for one or many cycle service levels
+    Each distinct level is inverted once, so catalogs sharing a few targets stay cheap
+    """
+    levels = np.asarray(service_level, dtype=np.float64)
+    if not ((levels > 0) & (levels < 1)).all():
+        raise ValueError("service_level must be between 0 and 1 (exclusive)")
+    unique, inverse = np.unique(levels, return_inverse=True)
+    z = np.array([NormalDist().inv_cdf(level) for level in unique])
+    return z[inverse].reshape(levels.shape) if levels.ndim else float(z[0])
 
 class InventoryAgent:
-    def __init__(self):
-        self.inventory_levels = {}
+    def __init__(self, store=None):
+        # Optimization results per item (see agents/inventory_store.py)
+        self.inventory_levels = store if store is not None else MemoryInventoryStore()
+        # Latest ERP snapshot: available stock and unit cost per item
+        self.stock_levels = {}
+        self.unit_costs = {}
         self.safety_stock_multiplier = 1.65  # 95% service level
+        # Per-item target service levels (override the default multiplier); written from
+        # the CPU pool's threads, so kept in a locked store bounded like the results store
+        self.service_levels = MemoryInventoryStore(maxsize=getattr(self.inventory_levels, 'maxsize', 100_000))
     
     def eoq_calculate(self, annual_demand, ordering_cost, holding_cost_per_unit):
         """
@@ -19,33 +51,41 @@ class InventoryAgent:
         eoq = math.sqrt((2 * annual_demand * ordering_cost) / holding_cost_per_unit)
         return round(eoq)
     
-    def reorder_point(self, daily_demand, lead_time_days, daily_demand_std_dev=0):
+    def reorder_point(self, daily_demand, lead_time_days, daily_demand_std_dev=0, service_level=None):
         """
         Calculate reorder point
         ROP = (Daily Demand × Lead Time) + Safety Stock
+        Safety stock uses z(service_level), or the default multiplier when no level is given
         """
+        multiplier = self.safety_stock_multiplier if service_level is None else service_level_z(service_level)
         expected_demand = daily_demand * lead_time_days
-        safety_stock = self.safety_stock_multiplier * daily_demand_std_dev * math.sqrt(lead_time_days)
+        safety_stock = multiplier * daily_demand_std_dev * math.sqrt(lead_time_days)
         return round(expected_demand + safety_stock)
     
-    def optimize_inventory(self, item_id, annual_demand, ordering_cost, holding_cost_per_unit, lead_time_days=7, daily_std_dev=5):
+    def optimize_inventory(self, item_id, annual_demand, ordering_cost, holding_cost_per_unit, lead_time_days=7, daily_std_dev=5,
+                           service_level=None):
         """
         Complete inventory optimization for an item
+        service_level defaults to the item's stored target, then to the default multiplier
         """
-        # Calculate daily demand
-        daily_demand = annual_demand / 365
-        
-        # Calculate EOQ
-        eoq = self.eoq_calculate(annual_demand, ordering_cost, holding_cost_per_unit)
-        
-        # Calculate reorder point
-        rop = self.reorder_point(daily_demand, lead_time_days, daily_std_dev)
-        
-        # Calculate number of orders per year
-        orders_per_year = annual_demand / eoq if eoq > 0 else 0
+        if service_level is None:
+            service_level = self.service_levels.get(item_id)
         
-        # Calculate total inventory cost
-        total_cost = (ordering_cost * orders_per_year) + (holding_cost_per_unit * eoq / 2)
+        with timed('eoq'):
+            # Calculate daily demand
+            daily_demand = annual_demand / 365
+            
+            # Calculate EOQ
+            eoq = self.eoq_calculate(annual_demand, ordering_cost, holding_cost_per_unit)
+            
+            # Calculate reorder point
+            rop = self.reorder_point(daily_demand, lead_time_days, daily_std_dev, service_level)
+            
+            # Calculate number of orders per year
+            orders_per_year = annual_demand / eoq if eoq > 0 else 0
+            
+            # Calculate total inventory cost
+            total_cost = (ordering_cost * orders_per_year) + (holding_cost_per_unit * eoq / 2)
         
         result = {
             'item_id': item_id,
@@ -54,7 +94,11 @@ class InventoryAgent:
             'annual_orders': round(orders_per_year, 2),
             'total_annual_cost': round(total_cost, 2),
             'daily_demand': round(daily_demand, 2),
-            'lead_time_days': lead_time_days
+            'daily_std_dev': daily_std_dev,
+            'lead_time_days': lead_time_days,
+            'ordering_cost': ordering_cost,
+            'holding_cost_per_unit': holding_cost_per_unit,
+            'service_level': service_level
         }
         
         # Store in inventory levels
@@ -62,21 +106,417 @@ class InventoryAgent:
         
         return result
     
-    def check_inventory_status(self, item_id, current_stock):
-        """Check if inventory needs reordering"""
-        if item_id not in self.inventory_levels:
+    def optimize_batch(self, item_ids, annual_demand=None, ordering_cost=None, holding_cost_per_unit=None,
+                       lead_time_days=7, daily_std_dev=5, service_level=None, store=True):
+        """
+        Vectorized inventory optimization for many items in one pass
+        Accepts equal-length arrays (scalars are broadcast to every item) or a
+        DataFrame with item_id, annual_demand, ordering_cost, holding_cost and
+        optional lead_time / daily_std_dev / service_level columns. Returns columnar results.
+        service_level: per-item targets; None uses the default multiplier
+        """
+        if hasattr(item_ids, 'columns'):
+            frame = item_ids
+            item_ids = frame['item_id']
+            annual_demand = frame['annual_demand']
+            ordering_cost = frame['ordering_cost']
+            holding_cost_per_unit = frame['holding_cost']
+            if 'lead_time' in frame.columns:
+                lead_time_days = frame['lead_time']
+            if 'daily_std_dev' in frame.columns:
+                daily_std_dev = frame['daily_std_dev']
+            if 'service_level' in frame.columns:
+                service_level = frame['service_level']
+
+        item_ids = list(item_ids)
+        demand, order_cost, holding, lead_time, std_dev = np.broadcast_arrays(
+            *(np.asarray(col, dtype=np.float64) for col in
+              (annual_demand, ordering_cost, holding_cost_per_unit, lead_time_days, daily_std_dev))
+        )
+        if demand.ndim != 1 or len(demand) != len(item_ids):
+            raise ValueError("All columns must have the same length as item_ids")
+
+        with timed('eoq_batch'):
+            daily_demand = demand / 365
+
+            # EOQ = √(2DS/H), zero where demand or holding cost is not positive
+            valid = (holding > 0) & (demand > 0)
+            safe_holding = np.where(valid, holding, 1.0)
+            eoq = np.where(valid, np.round(np.sqrt(2 * demand * order_cost / safe_holding)), 0.0)
+
+            # ROP = (Daily Demand × Lead Time) + Safety Stock
+            multiplier = self.safety_stock_multiplier if service_level is None else service_level_z(service_level)
+            safety_stock = multiplier * std_dev * np.sqrt(lead_time)
+            rop = np.round(daily_demand * lead_time + safety_stock)
+
+            orders_per_year = np.divide(demand, eoq, out=np.zeros_like(demand), where=eoq > 0)
+            total_cost = order_cost * orders_per_year + holding * eoq / 2
+
+        result = {
+            'item_id': item_ids,
+            'optimal_order_quantity': eoq.astype(np.int64),
+            'reorder_point': rop.astype(np.int64),
+            'annual_orders': np.round(orders_per_year, 2),
+            'total_annual_cost': np.round(total_cost, 2),
+            'daily_demand': np.round(daily_demand, 2),
+            'daily_std_dev': std_dev,
+            'lead_time_days': lead_time,
+            'ordering_cost': order_cost,
+            'holding_cost_per_unit': holding,
+            'service_level': np.broadcast_to(np.asarray(service_level, dtype=np.float64), demand.shape)
+                             if service_level is not None else np.full(demand.shape, None)
+        }
+
+        if store:
+            columns = [result[key].tolist() if key != 'item_id' else item_ids for key in result]
+            self.inventory_levels.put_many((row[0], dict(zip(result.keys(), row))) for row in zip(*columns))
+
+        return result
+    
+    def optimize_service_levels(self, item_ids, annual_demand=None, holding_cost_per_unit=None, stockout_penalty=None,
+                                ordering_cost=None, order_quantity=None, lead_time_days=7, daily_std_dev=5,
+                                service_levels=None, block_size=1_000_000, store=True):
+        """
+        Pick the cost-minimizing cycle service level for every item
+        For each level z on the grid, with σL = daily_std_dev × √lead_time:
+          safety stock cost = H × z × σL
+          stockout cost     = penalty × (D / Q) × σL × G(z)
+        where G(z) = φ(z) − z(1 − Φ(z)) is the expected shortage per cycle in
+        units of σL and Q is order_quantity (EOQ from ordering_cost if omitted).
+        The whole (items × grid) cost matrix is evaluated with broadcasting,
+        in item blocks of about block_size cells. Accepts arrays or a DataFrame
+        like optimize_batch plus stockout_penalty / order_quantity columns.
+        """
+        if hasattr(item_ids, 'columns'):
+            frame = item_ids
+            item_ids = frame['item_id']
+            annual_demand = frame['annual_demand']
+            holding_cost_per_unit = frame['holding_cost']
+            stockout_penalty = frame['stockout_penalty']
+            if 'ordering_cost' in frame.columns:
+                ordering_cost = frame['ordering_cost']
+            if 'order_quantity' in frame.columns:
+                order_quantity = frame['order_quantity']
+            if 'lead_time' in frame.columns:
+                lead_time_days = frame['lead_time']
+            if 'daily_std_dev' in frame.columns:
+                daily_std_dev = frame['daily_std_dev']
+        if order_quantity is None and ordering_cost is None:
+            raise ValueError("Pass order_quantity or ordering_cost")
+
+        item_ids = list(item_ids)
+        demand, holding, penalty, lead_time, std_dev = np.broadcast_arrays(
+            *(np.asarray(col, dtype=np.float64) for col in
+              (annual_demand, holding_cost_per_unit, stockout_penalty, lead_time_days, daily_std_dev))
+        )
+        if demand.ndim != 1 or len(demand) != len(item_ids):
+            raise ValueError("All columns must have the same length as item_ids")
+        if order_quantity is None:
+            order_cost = np.broadcast_to(np.asarray(ordering_cost, dtype=np.float64), demand.shape)
+            valid = (holding > 0) & (demand > 0)
+            quantity = np.where(valid, np.sqrt(2 * demand * order_cost / np.where(valid, holding, 1.0)), 0.0)
+        else:
+            quantity = np.broadcast_to(np.asarray(order_quantity, dtype=np.float64), demand.shape)
+        cycles = np.divide(demand, quantity, out=np.zeros_like(demand), where=quantity > 0)
+        sigma = std_dev * np.sqrt(lead_time)
+
+        # Grid terms are computed once: Φ(z) is the service level itself
+        grid = SERVICE_LEVEL_GRID if service_levels is None else np.asarray(service_levels, dtype=np.float64)
+        z = service_level_z(grid)
+        loss = np.exp(-z ** 2 / 2) / math.sqrt(2 * math.pi) - z * (1 - grid)
+
+        best = np.empty(len(demand), dtype=np.int64)
+        block_rows = max(1, block_size // len(grid))
+        for start in range(0, len(demand), block_rows):
+            rows = slice(start, start + block_rows)
+            cost = (holding[rows, None] * z + (penalty[rows] * cycles[rows])[:, None] * loss) * sigma[rows, None]
+            best[rows] = np.argmin(cost, axis=1)
+
+        best_z = z[best]
+        safety_stock = best_z * sigma
+        safety_cost = holding * safety_stock
+        stockout_cost = penalty * cycles * sigma * loss[best]
+        result = {
+            'item_id': item_ids,
+            'service_level': grid[best],
+            'z_score': np.round(best_z, 4),
+            'safety_stock': np.round(safety_stock).astype(np.int64),
+            'reorder_point': np.round(demand / 365 * lead_time + safety_stock).astype(np.int64),
+            'safety_stock_cost': np.round(safety_cost, 2),
+            'expected_stockout_cost': np.round(stockout_cost, 2),
+            'total_cost': np.round(safety_cost + stockout_cost, 2)
+        }
+
+        if store:
+            self.service_levels.put_many(zip(item_ids, result['service_level'].tolist()))
+
+        return result
+    
+    def reorder_points_from_quantiles(self, item_ids, forecast, service_quantile, lead_time_days=7, store=True):
+        """
+        Size safety stock from quantile forecasts instead of a normal z-score
+        forecast, service_quantile: (items, periods) daily point forecasts and
+        the forecast quantile matching the target service level (e.g. P90 for
+        90%), as returned by SimpleForecastModel.forecast_skus. Over each
+        item's lead time:
+          expected demand = Σ forecast
+          safety stock    = √Σ (quantile − forecast)²   (days treated as independent)
+        Stored items get the new reorder point. Returns columnar results.
+        """
+        item_ids = list(item_ids)
+        forecast = np.atleast_2d(np.asarray(forecast, dtype=np.float64))
+        service_quantile = np.atleast_2d(np.asarray(service_quantile, dtype=np.float64))
+        lead_time = np.broadcast_to(np.asarray(lead_time_days, dtype=np.float64), (len(item_ids),))
+        if forecast.shape != service_quantile.shape or len(forecast) != len(item_ids):
+            raise ValueError("forecast and service_quantile must be shaped (len(item_ids), periods)")
+        if len(lead_time) and lead_time.max() > forecast.shape[1]:
+            raise ValueError("Forecast horizon is shorter than the lead time")
+        
+        in_lead_time = np.arange(forecast.shape[1]) < lead_time[:, None]
+        expected = (forecast * in_lead_time).sum(axis=1)
+        spread = np.maximum(service_quantile - forecast, 0.0) * in_lead_time
+        safety_stock = np.sqrt(np.square(spread).sum(axis=1))
+        rop = np.round(expected + safety_stock).astype(np.int64)
+        
+        if store:
+            updates = []
+            for item_id, record, point in zip(item_ids, self.inventory_levels.get_many(item_ids), rop.tolist()):
+                if record is not None:
+                    updates.append((item_id, dict(record, reorder_point=point)))
+            self.inventory_levels.put_many(updates)
+        
+        return {
+            'item_id': item_ids,
+            'lead_time_demand': np.round(expected, 2),
+            'safety_stock': np.round(safety_stock).astype(np.int64),
+            'reorder_point': rop
+        }
+    
+    def simulate_policy(self, demand, reorder_point, order_quantity, lead_time_days=7,
+                        initial_stock=None, holding_cost_per_unit=0, ordering_cost=0):
+        """
+        Monte Carlo simulation of a continuous-review (s, Q) policy
+        demand: daily demand paths shaped (paths, days), or (items, paths, days)
+        with one value per item for the policy parameters. Every path of every
+        item is stepped together, one day at a time:
+          1. receive orders due today
+          2. fill demand from stock (unmet demand is lost)
+          3. if stock on hand + on order <= ROP, order enough multiples of Q to
+             lift it above ROP; the order arrives lead_time_days later (min 1)
+        initial_stock defaults to ROP + Q; holding cost is per unit per year.
+        Returns per-item arrays of path averages.
+        """
+        demand = np.asarray(demand, dtype=np.float32)
+        if demand.ndim == 2:
+            demand = demand[None]
+        if demand.ndim != 3:
+            raise ValueError("demand must be shaped (paths, days) or (items, paths, days)")
+        n_items, n_paths, n_days = demand.shape
+        
+        rop, quantity, lead_time, holding, order_cost = (
+            np.broadcast_to(np.asarray(value, dtype=np.float64), (n_items,))
+            for value in (reorder_point, order_quantity, lead_time_days, holding_cost_per_unit, ordering_cost)
+        )
+        if (quantity <= 0).any():
+            raise ValueError("order_quantity must be positive")
+        stock = rop + quantity if initial_stock is None else np.broadcast_to(
+            np.asarray(initial_stock, dtype=np.float64), (n_items,))
+        lead_time = np.maximum(np.round(lead_time).astype(np.int64), 1)
+        
+        # Days as the leading axis so each step reads one contiguous (items, paths) slab
+        daily_demand = np.ascontiguousarray(np.moveaxis(demand, -1, 0))
+        rop, quantity = rop[:, None], quantity[:, None]
+        on_hand = np.repeat(stock[:, None], n_paths, axis=1)
+        on_order = np.zeros_like(on_hand)
+        # Ring buffer of outstanding orders indexed by arrival day
+        pipeline = np.zeros((lead_time.max() + 1, n_items, n_paths))
+        items = np.arange(n_items)
+        
+        served_total = np.zeros_like(on_hand)
+        stockout_days = np.zeros_like(on_hand)
+        orders = np.zeros_like(on_hand)
+        stock_days = np.zeros_like(on_hand)
+        for day in range(n_days):
+            arriving = pipeline[day % len(pipeline)]
+            on_hand += arriving
+            on_order -= arriving
+            arriving[:] = 0
+            
+            wanted = daily_demand[day]
+            served = np.minimum(on_hand, wanted)
+            on_hand -= served
+            served_total += served
+            stockout_days += wanted > served
+            
+            shortfall = rop - (on_hand + on_order)
+            placed = np.where(shortfall >= 0, (np.floor(shortfall / quantity) + 1) * quantity, 0.0)
+            orders += placed > 0
+            on_order += placed
+            pipeline[(day + lead_time) % len(pipeline), items] += placed
+            stock_days += on_hand
+        
+        demand_total = demand.sum(axis=2, dtype=np.float64)
+        fill_rate = np.divide(served_total, demand_total, out=np.ones_like(served_total), where=demand_total > 0)
+        holding_cost = stock_days * (holding / 365)[:, None]
+        ordering_total = orders * order_cost[:, None]
+        
+        return {
+            'fill_rate': np.round(fill_rate.mean(axis=1), 4),
+            'fill_rate_p05': np.round(np.percentile(fill_rate, 5, axis=1), 4),
+            'stockout_days': np.round(stockout_days.mean(axis=1), 2),
+            'stockout_probability': np.round((stockout_days > 0).mean(axis=1), 4),
+            'average_stock': np.round(stock_days.mean(axis=1) / max(n_days, 1), 2),
+            'orders': np.round(orders.mean(axis=1), 2),
+            'holding_cost': np.round(holding_cost.mean(axis=1), 2),
+            'ordering_cost': np.round(ordering_total.mean(axis=1), 2),
+            'total_cost': np.round((holding_cost + ordering_total).mean(axis=1), 2)
+        }
+    
+    def simulate_forecast(self, forecast_model, items, n_paths=1000, days=365, method='moving_average', seed=None):
+        """
+        Simulate the stored (ROP, EOQ) policy of each item against demand paths
+        sampled from a SimpleForecastModel (see models/forecast_model.py)
+        items: dicts with item_id and optional reorder_point, order_quantity,
+        lead_time, initial_stock, holding_cost, ordering_cost;
+        missing policy and cost values come from optimize_inventory / the ERP snapshot.
+        Items that are not SKUs of the forecast model are sampled around their
+        stored daily_demand / daily_std_dev; raises KeyError for items with neither.
+        """
+        columns = {key: [] for key in ('reorder_point', 'order_quantity', 'lead_time_days', 'initial_stock',
+                                       'holding_cost_per_unit', 'ordering_cost')}
+        demand = np.empty((len(items), n_paths, days), dtype=np.float32)
+        skus = forecast_model.skus
+        for i, item in enumerate(items):
+            item_id = item['item_id']
+            stored = self.inventory_levels.get(item_id, {})
+            rop = item.get('reorder_point', stored.get('reorder_point'))
+            quantity = item.get('order_quantity', stored.get('optimal_order_quantity'))
+            if rop is None or quantity is None:
+                raise ValueError(f"No reorder_point/order_quantity for {item_id}; optimize it first or pass them")
+            stock = item.get('initial_stock', self.stock_levels.get(item_id, rop + quantity))
+            columns['reorder_point'].append(rop)
+            columns['order_quantity'].append(quantity)
+            columns['lead_time_days'].append(item.get('lead_time', stored.get('lead_time_days', 7)))
+            columns['initial_stock'].append(stock)
+            columns['holding_cost_per_unit'].append(item.get('holding_cost', stored.get('holding_cost_per_unit', 0)))
+            columns['ordering_cost'].append(item.get('ordering_cost', stored.get('ordering_cost', 0)))
+            
+            item_seed = None if seed is None else seed + i
+            if skus is not None and item_id in skus:
+                demand[i] = forecast_model.sample_demand_paths(
+                    item_id, n_paths=n_paths, periods=days, method=method, seed=item_seed)
+            elif stored.get('daily_demand') is not None and stored.get('daily_std_dev') is not None:
+                # Same noise model as sample_demand_paths, around the optimized daily demand
+                paths = np.random.default_rng(item_seed).standard_normal((n_paths, days), dtype=np.float32)
+                paths *= np.float32(stored['daily_std_dev'])
+                paths += np.float32(stored['daily_demand'])
+                demand[i] = np.maximum(paths, 0, out=paths)
+            else:
+                raise KeyError(f"Unknown item: {item_id} is not a forecast SKU and has no stored demand")
+        
+        result = self.simulate_policy(demand, **columns)
+        result['item_id'] = [item['item_id'] for item in items]
+        return result
+    
+    def hydrate_from_erp(self, client):
+        """
+        Pull the current stock snapshot and unit costs from an ERP client
+        (see api/erp_client.py); returns the number of items with stock data
+        """
+        for item_id, product in client.get_products().items():
+            if 'unit_cost' in product:
+                self.unit_costs[item_id] = product['unit_cost']
+        for item_id, stock in client.get_inventory().items():
+            self.stock_levels[item_id] = stock.get('available', stock.get('current_stock', 0))
+        return len(self.stock_levels)
+    
+    def check_inventory_status(self, item_id, current_stock=None):
+        """Check if inventory needs reordering (defaults to the ERP stock snapshot)"""
+        levels = self.inventory_levels.get(item_id)
+        if levels is None:
             return "No optimization data available"
         
-        reorder_point = self.inventory_levels[item_id]['reorder_point']
+        if current_stock is None:
+            if item_id not in self.stock_levels:
+                return "No stock data available"
+            current_stock = self.stock_levels[item_id]
+        
+        reorder_point = levels['reorder_point']
         
         if current_stock <= reorder_point:
             return f"⚠️  REORDER NEEDED! Current: {current_stock}, ROP: {reorder_point}"
         else:
             return f"✅ Stock OK. Current: {current_stock}, ROP: {reorder_point}"
     
-    def get_inventory_summary(self):
-        """Get summary of all optimized items"""
-        return self.inventory_levels
+    def check_reorder_batch(self, stock=None, only_reorder=False):
+        """
+        Reorder decisions for many items in one vectorized comparison
+        stock: {item_id: {'available': ...}} as returned by /api/erp/inventory,
+        {item_id: quantity}, a columnar dict / DataFrame with item_id and
+        available (or current_stock), or None for the latest ERP snapshot.
+        Each item gets a status (stockout, reorder, ok, no_policy), the
+        suggested order (enough EOQ multiples to lift stock above the ROP) and
+        days of cover; results are columnar and sorted most urgent first.
+        """
+        item_ids, available = self._stock_columns(self.stock_levels if stock is None else stock)
+        records = self.inventory_levels.get_many(item_ids)
+        
+        has_policy = np.array([record is not None for record in records], dtype=bool)
+        rop, eoq, daily_demand = (
+            np.array([record[key] if record is not None else 0 for record in records], dtype=np.float64)
+            for key in ('reorder_point', 'optimal_order_quantity', 'daily_demand')
+        )
+        
+        reorder = has_policy & (available <= rop)
+        stockout = has_policy & (available <= 0)
+        shortfall = rop - available
+        suggested = np.where(reorder & (eoq > 0), (np.floor(shortfall / np.where(eoq > 0, eoq, 1)) + 1) * eoq, 0.0)
+        days_of_cover = np.divide(np.maximum(available, 0), daily_demand,
+                                  out=np.full(len(available), np.inf), where=daily_demand > 0)
+        
+        # Most urgent first: stockouts, then reorders, then OK, then unknown items;
+        # fewest days of cover first within each group
+        rank = np.select([stockout, reorder, has_policy], [0, 1, 2], default=3)
+        order = np.lexsort((days_of_cover, rank))
+        if only_reorder:
+            order = order[rank[order] <= 1]
+        
+        statuses = np.array(['stockout', 'reorder', 'ok', 'no_policy'])
+        return {
+            'item_id': [item_ids[i] for i in order],
+            'status': statuses[rank[order]],
+            'available': available[order],
+            'reorder_point': np.where(has_policy, rop, np.nan)[order],
+            'suggested_order_quantity': suggested[order].astype(np.int64),
+            'days_of_cover': np.round(days_of_cover[order], 1)
+        }
+    
+    @staticmethod
+    def _stock_columns(stock):
+        """(item_ids, available stock array) from any supported snapshot shape"""
+        if hasattr(stock, 'columns') or (isinstance(stock, dict) and 'item_id' in stock
+                                         and not isinstance(stock['item_id'], dict)):
+            column = 'available' if 'available' in stock else 'current_stock'
+            item_ids = list(stock['item_id'])
+            available = np.asarray(stock[column], dtype=np.float64)
+            if available.shape != (len(item_ids),):
+                raise ValueError("item_id and stock columns must have the same length")
+            return item_ids, available
+        if isinstance(stock, list):
+            stock = {record.get('item_id', record.get('sku')): record for record in stock}
+        item_ids = list(stock)
+        available = np.array([
+            value.get('available', value.get('current_stock', 0)) if isinstance(value, dict) else value
+            for value in stock.values()
+        ], dtype=np.float64)
+        return item_ids, available
+    
+    def get_inventory_summary(self, offset=0, limit=None, after=None):
+        """
+        Get summary of optimized items, one page at a time for large catalogs
+        after: the last item_id of the previous page (cheaper than a large offset)
+        """
+        return dict(self.inventory_levels.page(offset, limit, after=after))
 
 # Test the agent
 if __name__ == "__main__":
@@ -102,4 +542,16 @@ if __name__ == "__main__":
     
     # Check inventory status
     print(f"\nInventory Check: {agent.check_inventory_status('PART_001', 150)}")
-    print(f"Inventory Check: {agent.check_inventory_status('PART_001', 50)}")
\ No newline at end of file
+    print(f"Inventory Check: {agent.check_inventory_status('PART_001', 50)}")    
+    # Simulate the policy against 1,000 years of random daily demand
+    demand_paths = np.random.default_rng(42).normal(10000 / 365, 10, size=(1000, 365)).clip(min=0)
+    simulation = agent.simulate_policy(demand_paths, result['reorder_point'], result['optimal_order_quantity'],
+                                       lead_time_days=5, holding_cost_per_unit=2, ordering_cost=50)
+    print(f"\nSimulated Fill Rate: {simulation['fill_rate'][0]:.2%}")
+    print(f"Simulated Stockout Days/Year: {simulation['stockout_days'][0]}")
+    
+    # Choose service levels that balance safety stock against stockout penalties
+    levels = agent.optimize_service_levels(['PART_001', 'PART_002'], annual_demand=10000, holding_cost_per_unit=2,
+                                           stockout_penalty=[1, 25], ordering_cost=50, lead_time_days=5, daily_std_dev=10)
+    for item_id, level, rop in zip(levels['item_id'], levels['service_level'], levels['reorder_point']):
+        print(f"Best Service Level for {item_id}: {level:.1%} (ROP {rop})")
@@ -0,0 +1,250 @@
+"""
+Inventory Store - Thread-safe storage for per-item optimization results
+
+Both stores behave like a small dict (store[item_id], item_id in store,
+store.get(...), len(store)) and page with an item_id cursor (page(after=...)),
+so InventoryAgent can use either one:
+    MemoryInventoryStore  - in-process, locked, bounded with LRU eviction
+    SQLiteInventoryStore  - on disk, batched bulk writes, survives restarts
+"""
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from itertools import dropwhile, islice
+
+# One shared encoder: skips json.dumps' per-call setup on bulk writes
+_encode = json.JSONEncoder(separators=(',', ':'), check_circular=False).encode
+
+class MemoryInventoryStore:
+    """
+    In-memory store bounded to maxsize items
+    Reads and writes mark an item as recently used; the least recently used
+    item is evicted once the store is full (maxsize=None disables the bound)
+    """
+    def __init__(self, maxsize=100_000):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.RLock()
+        self.evictions = 0
+
+    def get(self, item_id, default=None):
+        with self._lock:
+            record = self._items.get(item_id)
+            if record is None:
+                return default
+            self._items.move_to_end(item_id)
+            return record
+
+    def get_many(self, item_ids):
+        """Records for many items (None where missing) under one lock acquisition; found items count as used"""
+        with self._lock:
+            items = self._items
+            records = [items.get(item_id) for item_id in item_ids]
+            for item_id, record in zip(item_ids, records):
+                if record is not None:
+                    items.move_to_end(item_id)
+            return records
+
+    def __getitem__(self, item_id):
+        record = self.get(item_id)
+        if record is None:
+            raise KeyError(item_id)
+        return record
+
+    def __setitem__(self, item_id, record):
+        self.put_many([(item_id, record)])
+
+    def __contains__(self, item_id):
+        with self._lock:
+            return item_id in self._items
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    def put_many(self, records):
+        """Insert or replace (item_id, record) pairs under one lock acquisition"""
+        with self._lock:
+            for item_id, record in records:
+                self._items[item_id] = record
+                self._items.move_to_end(item_id)
+            if self.maxsize is not None:
+                while len(self._items) > self.maxsize:
+                    self._items.popitem(last=False)
+                    self.evictions += 1
+
+    def page(self, offset=0, limit=None, after=None):
+        """
+        (item_id, record) pairs in insertion/use order, without copying the whole store
+        after: continue behind this item_id (from the end of the previous page) instead of skipping offset items
+        """
+        with self._lock:
+            items = iter(self._items.items())
+            if after is not None:
+                items = dropwhile(lambda item: item[0] != after, items)
+                next(items, None)
+            stop = None if limit is None else offset + limit
+            return list(islice(items, offset, stop))
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def stats(self):
+        with self._lock:
+            return {'backend': 'memory', 'items': len(self._items), 'maxsize': self.maxsize,
+                    'evictions': self.evictions}
+
+class SQLiteInventoryStore:
+    """
+    SQLite-backed store; only the requested rows are ever loaded
+    Every put_many call is committed before it returns, so other processes see
+    it right away; a bulk call commits in transactions of batch_size rows.
+    Each process opens its own connection,
+    so the store can be created before a pre-forking server forks.
+    The item count is kept up to date by this process's writes and recounted
+    only when another connection has committed (PRAGMA data_version).
+    """
+    def __init__(self, path, batch_size=1000):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending = {}
+        self._lock = threading.RLock()
+        self._connection = None
+        self._pid = None
+        self._count = None
+        self._count_version = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self._connect()
+
+    def _connect(self):
+        """Connection for the current process (reopened after a fork)"""
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS inventory_levels (item_id TEXT PRIMARY KEY, record TEXT NOT NULL)")
+            self._connection.commit()
+            self._pid = os.getpid()
+            self._count = None
+        return self._connection
+
+    def get(self, item_id, default=None):
+        with self._lock:
+            item_id = str(item_id)
+            if item_id in self._pending:
+                return self._pending[item_id]
+            row = self._connect().execute(
+                "SELECT record FROM inventory_levels WHERE item_id = ?", (item_id,)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def get_many(self, item_ids, chunk_size=900):
+        """Records for many items (None where missing), fetched chunk_size ids per query"""
+        item_ids = [str(item_id) for item_id in item_ids]
+        found = {}
+        with self._lock:
+            connection = self._connect()
+            for start in range(0, len(item_ids), chunk_size):
+                chunk = item_ids[start:start + chunk_size]
+                found.update(connection.execute(
+                    f"SELECT item_id, record FROM inventory_levels WHERE item_id IN ({','.join('?' * len(chunk))})",
+                    chunk).fetchall())
+            pending = dict(self._pending)
+        return [pending[item_id] if item_id in pending else
+                json.loads(found[item_id]) if item_id in found else None
+                for item_id in item_ids]
+
+    def __getitem__(self, item_id):
+        record = self.get(item_id)
+        if record is None:
+            raise KeyError(item_id)
+        return record
+
+    def __setitem__(self, item_id, record):
+        self.put_many([(item_id, record)])
+
+    def __contains__(self, item_id):
+        return self.get(item_id) is not None
+
+    def __len__(self):
+        with self._lock:
+            self.flush()
+            connection = self._connect()
+            # data_version only changes when another connection commits
+            version = connection.execute("PRAGMA data_version").fetchone()[0]
+            if self._count is None or version != self._count_version:
+                self._count = connection.execute("SELECT COUNT(*) FROM inventory_levels").fetchone()[0]
+                self._count_version = version
+            return self._count
+
+    def put_many(self, records):
+        """Insert or replace (item_id, record) pairs, committing every batch_size rows and at the end"""
+        with self._lock:
+            for item_id, record in records:
+                self._pending[str(item_id)] = record
+                if len(self._pending) >= self.batch_size:
+                    self.flush()
+            self.flush()
+
+    def page(self, offset=0, limit=None, after=None):
+        """
+        (item_id, record) pairs in item_id order
+        after: start behind this item_id, found through the primary key index;
+        prefer it to offset, which SQLite has to step through row by row
+        """
+        with self._lock:
+            self.flush()
+            if after is None:
+                rows = self._connect().execute(
+                    "SELECT item_id, record FROM inventory_levels ORDER BY item_id LIMIT ? OFFSET ?",
+                    (-1 if limit is None else limit, offset)).fetchall()
+            else:
+                rows = self._connect().execute(
+                    "SELECT item_id, record FROM inventory_levels WHERE item_id > ? "
+                    "ORDER BY item_id LIMIT ? OFFSET ?",
+                    (str(after), -1 if limit is None else limit, offset)).fetchall()
+        return [(item_id, json.loads(record)) for item_id, record in rows]
+
+    def flush(self):
+        """Commit buffered writes in one transaction"""
+        with self._lock:
+            if not self._pending:
+                return
+            connection = self._connect()
+            added = 0
+            with connection:
+                if self._count is not None:
+                    # Replaced rows leave the count unchanged; only new item_ids add to it
+                    item_ids = list(self._pending)
+                    added = len(item_ids)
+                    for start in range(0, len(item_ids), 900):
+                        chunk = item_ids[start:start + 900]
+                        added -= connection.execute(
+                            f"SELECT COUNT(*) FROM inventory_levels WHERE item_id IN ({','.join('?' * len(chunk))})",
+                            chunk).fetchone()[0]
+                connection.executemany(
+                    "INSERT OR REPLACE INTO inventory_levels (item_id, record) VALUES (?, ?)",
+                    ((item_id, _encode(record)) for item_id, record in self._pending.items()))
+            if self._count is not None:
+                self._count += added
+            self._pending.clear()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def stats(self):
+        with self._lock:
+            return {'backend': 'sqlite', 'path': self.path, 'items': len(self),
+                    'batch_size': self.batch_size}
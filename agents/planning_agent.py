@@ -0,0 +1,110 @@
+"""
+Planning Agent - Forecast to replenishment in one pass
+
+Chains the other components per block of SKUs:
+    forecast (SimpleForecastModel) → best supplier (SupplierAgent) → EOQ/ROP (InventoryAgent)
+Annual demand comes from the forecast, demand variability from the recent
+volatility in the trend statistics and the lead time from the chosen supplier,
+so none of them has to be typed in by hand.
+"""
+
+# Forecast horizon used to estimate annual demand: whole weeks, so weekday seasonality averages out
+PLAN_HORIZON = 28
+
+class PlanningAgent:
+    def __init__(self, forecast_model, supplier_agent, inventory_agent):
+        self.forecast_model = forecast_model
+        self.supplier_agent = supplier_agent
+        self.inventory_agent = inventory_agent
+
+    def choose_supplier(self, priority='balanced', weights=None, filters=None):
+        """(supplier_id, details) of the best supplier, shared by every SKU in a plan"""
+        ranked = self.supplier_agent.evaluate_suppliers(priority, top_k=1, weights=weights, filters=filters)
+        if not ranked:
+            raise ValueError("No supplier matches the given filters")
+        supplier_id, evaluation = ranked[0]
+        if not evaluation['details'].get('lead_time'):
+            raise ValueError(f"Supplier {supplier_id} has no lead_time")
+        return supplier_id, evaluation['details']
+
+    def trend_statistics(self, skus=None):
+        """
+        Trend statistics for the SKUs to plan (the whole catalog for None)
+        Computed once per plan and sliced per block; raises KeyError for unknown SKUs
+        """
+        return self.forecast_model.get_trend_skus(skus)
+
+    def plan_block(self, skus, supplier, trend=None, method='moving_average', ordering_cost=50, holding_cost=2,
+                   service_level=None, store=True):
+        """
+        Columnar plan for one block of SKUs
+        supplier: (supplier_id, details) from choose_supplier
+        trend: the block's rows of trend_statistics (fetched when omitted)
+        Forecasts and trend statistics come through the model's cache, so
+        repeated plans over the same data only redo the EOQ/ROP arithmetic.
+        """
+        supplier_id, details = supplier
+        forecast = self.forecast_model.get_forecast(method, periods=PLAN_HORIZON, skus=skus)
+        if trend is None:
+            trend = self.forecast_model.get_trend_skus(skus)
+
+        daily_demand = forecast['forecast'].mean(axis=1)
+        result = self.inventory_agent.optimize_batch(
+            forecast['skus'],
+            annual_demand=daily_demand * 365,
+            ordering_cost=ordering_cost,
+            holding_cost_per_unit=holding_cost,
+            lead_time_days=details['lead_time'],
+            daily_std_dev=trend['volatility'],
+            service_level=service_level,
+            store=store
+        )
+        result['supplier_id'] = [supplier_id] * len(forecast['skus'])
+        result['daily_std_dev'] = trend['volatility']
+        result['trend'] = trend['trend']
+        return result
+
+    def plan(self, skus=None, method='moving_average', priority='balanced', weights=None, filters=None,
+             ordering_cost=50, holding_cost=2, service_level=None, block_size=1000, store=True):
+        """
+        Generator of per-SKU replenishment plans, one block of block_size SKUs at a time
+        The supplier is chosen once up front; each block is forecast and optimized
+        with vector operations, and its rows are yielded before the next block starts.
+        """
+        supplier = self.choose_supplier(priority, weights, filters)
+        trend = self.trend_statistics(skus)
+        for start, block in self.blocks(trend, block_size):
+            yield from self.rows(self.plan_block(trend['skus'][start:start + block_size], supplier, block,
+                                                 method, ordering_cost, holding_cost, service_level, store))
+
+    @staticmethod
+    def blocks(trend, block_size):
+        """(start, trend rows) for consecutive blocks of block_size SKUs"""
+        for start in range(0, len(trend['skus']), block_size):
+            yield start, {key: value[start:start + block_size] for key, value in trend.items()}
+
+    @staticmethod
+    def rows(block):
+        """Columnar plan_block result as one plain dict per SKU"""
+        columns = {key: value if isinstance(value, list) else value.tolist() for key, value in block.items()}
+        keys = list(columns)
+        return (dict(zip(keys, row)) for row in zip(*columns.values()))
+
+# Test the agent
+if __name__ == "__main__":
+    import os
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from agents.inventory_agent import InventoryAgent
+    from agents.supplier_agent import SupplierAgent
+    from models.forecast_model import SimpleForecastModel
+
+    model = SimpleForecastModel()
+    if not model.load_data('data/sample_sku_data.csv'):
+        sys.exit(1)
+    agent = PlanningAgent(model, SupplierAgent(), InventoryAgent())
+
+    print("=== Replenishment Plan ===")
+    for row in agent.plan(priority='delivery', block_size=2):
+        print(f"{row['item_id']}: order {row['optimal_order_quantity']} at {row['reorder_point']} "
+              f"from {row['supplier_id']} ({row['daily_demand']}/day, trend {row['trend']})")
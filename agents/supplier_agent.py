@@ -1,6 +1,66 @@
 """
 Supplier Agent - Evaluates and ranks suppliers based on multiple criteria
 """
+import re
+from functools import lru_cache
+import numpy as np
+try:
+    from metrics import timed
+except ImportError:  # run as a script: hot paths are not timed
+    from contextlib import nullcontext as timed
+
+# Column order of the metric arrays
+METRICS = ('cost', 'quality', 'delivery', 'reliability', 'lead_time')
+# Metrics where lower is better; they are scored as (10 - value)
+LOWER_IS_BETTER = ('cost', 'lead_time')
+
+# Priority weights over (10 - cost, quality, delivery, reliability, 10 - lead_time)
+PRIORITY_WEIGHTS = {
+    'cost': (0.6, 0.2, 0.2, 0.0, 0.0),        # Cost-focused: lower cost gets higher score
+    'quality': (0.2, 0.6, 0.2, 0.0, 0.0),     # Quality-focused
+    'delivery': (0.2, 0.2, 0.6, 0.0, 0.0),    # Delivery-focused
+    'balanced': (0.3, 0.3, 0.2, 0.2, 0.0)     # Balanced scoring
+}
+
+FILTER_PATTERN = re.compile(r'^\s*(\w+)\s*(<=|>=|==|!=|<|>)\s*(-?\d+(?:\.\d*)?)\s*$')
+FILTER_OPS = {
+    '<=': np.less_equal,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '>': np.greater,
+    '==': np.equal,
+    '!=': np.not_equal
+}
+
+@lru_cache(maxsize=256)
+def compile_weights(spec):
+    """
+    Parse a weight spec such as 'cost:0.5,quality:0.3,lead_time:0.2'
+    into a weight tuple over METRICS; unlisted metrics get weight 0
+    """
+    weights = [0.0] * len(METRICS)
+    for part in spec.split(','):
+        name, sep, value = part.partition(':')
+        name = name.strip()
+        if not sep or name not in METRICS:
+            raise ValueError(f"Invalid weight '{part}', expected <metric>:<weight> with metric in {', '.join(METRICS)}")
+        weights[METRICS.index(name)] = float(value)
+    return tuple(weights)
+
+@lru_cache(maxsize=256)
+def compile_filters(spec):
+    """
+    Parse a filter spec such as 'lead_time<=5,reliability>=7'
+    into a tuple of (column, operator, value) conditions
+    """
+    plan = []
+    for part in spec.split(','):
+        match = FILTER_PATTERN.match(part)
+        if not match or match.group(1) not in METRICS:
+            raise ValueError(f"Invalid filter '{part}', expected <metric><op><number> with op in {', '.join(FILTER_OPS)}")
+        name, op, value = match.groups()
+        plan.append((METRICS.index(name), op, float(value)))
+    return tuple(plan)
 
 class SupplierAgent:
     def __init__(self):
@@ -31,45 +91,206 @@ class SupplierAgent:
                 'lead_time': 7
             }
         }
+        
+        # Columnar copy of the metrics: one row per supplier, one column per METRICS entry
+        self._ids = []
+        self._rows = {}
+        self._metrics = np.empty((16, len(METRICS)))
+        self._scores = {}
+        self._rankings = {}
+        for supplier_id, metrics in self.suppliers.items():
+            self._index_supplier(supplier_id, metrics)
     
-    def evaluate_suppliers(self, priority='balanced'):
+    def _index_supplier(self, supplier_id, metrics):
+        """Write a supplier's metrics into the column arrays, growing them when full"""
+        row = self._rows.get(supplier_id)
+        if row is None:
+            row = len(self._ids)
+            if row == len(self._metrics):
+                self._metrics = np.concatenate([self._metrics, np.empty_like(self._metrics)])
+            self._ids.append(supplier_id)
+            self._rows[supplier_id] = row
+        self._metrics[row] = [metrics.get(name, np.nan) for name in METRICS]
+        # Cached scores and rankings are stale now
+        self._scores.clear()
+        self._rankings.clear()
+    
+    def _filter_mask(self, filter_plan):
+        """Boolean mask of suppliers meeting every condition (missing metrics never match)"""
+        metrics = self._metrics[:len(self._ids)]
+        mask = np.ones(len(self._ids), dtype=bool)
+        for column, op, value in filter_plan:
+            # NaN compares unequal to everything, so '!=' alone would let missing metrics through
+            mask &= ~np.isnan(metrics[:, column]) & FILTER_OPS[op](metrics[:, column], value)
+        return mask
+    
+    def _score(self, weights, rows=None):
+        """Score suppliers (all, or the given rows) with one weighted matrix-vector product"""
+        with timed('supplier_scoring'):
+            weights = np.asarray(weights, dtype=np.float64)
+            # (10 - x) * w  ==  -x * w + 10 * w for lower-is-better metrics
+            lower = np.array([name in LOWER_IS_BETTER for name in METRICS])
+            signed = np.where(lower, -weights, weights)
+            offset = 10 * weights[lower].sum()
+            used = np.flatnonzero(signed)
+            metrics = self._metrics[:len(self._ids)] if rows is None else self._metrics[rows]
+            return np.round(metrics[:, used] @ signed[used] + offset, 2)
+    
+    def evaluate_suppliers(self, priority='balanced', top_k=None, weights=None, filters=None):
         """
         Evaluate suppliers based on different priorities
         priority: 'cost', 'quality', 'delivery', or 'balanced'
+        top_k: only return the k best suppliers (0 returns none; negative raises ValueError)
+        weights: custom weights overriding priority, as a spec string
+                 ('cost:0.5,quality:0.5') or a {metric: weight} dict
+        filters: range conditions such as 'lead_time<=5,reliability>=7'
+                 (a string or a list of strings), applied before scoring
         """
-        scores = {}
+        if top_k is not None and top_k < 0:
+            raise ValueError(f"top_k must be non-negative, got {top_k}")
+        if weights is None:
+            weight_plan = PRIORITY_WEIGHTS.get(priority, PRIORITY_WEIGHTS['balanced'])
+        elif isinstance(weights, dict):
+            weight_plan = compile_weights(','.join(f"{name}:{value}" for name, value in weights.items()))
+        else:
+            weight_plan = compile_weights(weights)
+        if filters and not isinstance(filters, str):
+            filters = ','.join(filters)
+        filter_plan = compile_filters(filters) if filters else ()
         
-        for supplier_id, metrics in self.suppliers.items():
-            if priority == 'cost':
-                # Cost-focused: lower cost gets higher score
-                score = (10 - metrics['cost']) * 0.6 + metrics['quality'] * 0.2 + metrics['delivery'] * 0.2
-            elif priority == 'quality':
-                # Quality-focused
-                score = metrics['quality'] * 0.6 + metrics['delivery'] * 0.2 + (10 - metrics['cost']) * 0.2
-            elif priority == 'delivery':
-                # Delivery-focused
-                score = metrics['delivery'] * 0.6 + metrics['quality'] * 0.2 + (10 - metrics['cost']) * 0.2
-            else:  # balanced
-                # Balanced scoring
-                score = (10 - metrics['cost']) * 0.3 + metrics['quality'] * 0.3 + metrics['delivery'] * 0.2 + metrics['reliability'] * 0.2
-            
-            scores[supplier_id] = {
-                'score': round(score, 2),
-                'details': metrics
-            }
+        if filter_plan:
+            rows = np.flatnonzero(self._filter_mask(filter_plan))
+            scores = self._score(weight_plan, rows)
+        else:
+            rows = None
+            if weight_plan not in self._scores:
+                self._scores[weight_plan] = self._score(weight_plan)
+            scores = self._scores[weight_plan]
+        # NaN scores (missing metrics) rank last
+        keys = np.where(np.isnan(scores), np.inf, -scores)
+        
+        plan_key = (weight_plan, filter_plan)
+        if plan_key in self._rankings:
+            order = self._rankings[plan_key]
+        elif top_k is not None and top_k < len(scores):
+            # Partial selection, then sort only the candidates: every row tied with the
+            # k-th key is kept and ties go by row, so the result is exactly the prefix
+            # of the stable full ranking whether or not that ranking is cached
+            if top_k == 0:
+                order = np.empty(0, dtype=np.intp)
+            else:
+                kth = np.partition(keys, top_k - 1)[top_k - 1]
+                top = np.flatnonzero(keys <= kth)
+                order = top[np.lexsort((top, keys[top]))]
+        else:
+            # Sort by score (highest first) and keep the ranking for later requests
+            order = np.argsort(keys, kind='stable')
+            if len(self._rankings) >= 256:
+                self._rankings.clear()
+            self._rankings[plan_key] = order
         
-        # Sort by score (highest first)
-        ranked_suppliers = sorted(scores.items(), key=lambda x: x[1]['score'], reverse=True)
+        if top_k is not None:
+            order = order[:top_k]
+        
+        ranked_suppliers = []
+        for position in order:
+            row = position if rows is None else rows[position]
+            supplier_id = self._ids[row]
+            ranked_suppliers.append((supplier_id, {
+                'score': None if np.isnan(scores[position]) else float(scores[position]),
+                'details': self.suppliers[supplier_id]
+            }))
         return ranked_suppliers
     
+    def pareto_front(self, criteria=('cost', 'quality', 'lead_time'), filters=None, block_size=512):
+        """
+        Non-dominated suppliers over the given criteria
+        Lower is better for cost and lead_time, higher for the others.
+        Sort-filter skyline: after sorting by coordinate sum a supplier can only
+        be dominated by one that precedes it, so each block is checked against
+        the front found so far and against itself instead of all pairs.
+        """
+        if isinstance(criteria, str):
+            criteria = [name.strip() for name in criteria.split(',') if name.strip()]
+        unknown = [name for name in criteria if name not in METRICS]
+        if unknown or not criteria:
+            raise ValueError(f"Invalid criteria {', '.join(unknown)}; choose from {', '.join(METRICS)}")
+        if filters and not isinstance(filters, str):
+            filters = ','.join(filters)
+        
+        mask = self._filter_mask(compile_filters(filters) if filters else ())
+        columns = [METRICS.index(name) for name in criteria]
+        signs = np.array([1.0 if name in LOWER_IS_BETTER else -1.0 for name in criteria])
+        values = self._metrics[:len(self._ids)][:, columns] * signs
+        rows = np.flatnonzero(mask & ~np.isnan(values).any(axis=1))
+        
+        # Minimization problem sorted by coordinate sum: a dominating point always
+        # has a smaller sum, so it is visited before anything it dominates
+        points = values[rows]
+        order = np.argsort(points.sum(axis=1), kind='stable')
+        points, rows = points[order], rows[order]
+        
+        # Cheap pre-pass: the lowest-sum points dominate most of the catalog
+        pivots = points[:64]
+        dominated = []
+        for start in range(0, len(points), block_size * 16):
+            block = points[start:start + block_size * 16]
+            le = (pivots[:, None, :] <= block[None, :, :]).all(axis=2)
+            lt = (pivots[:, None, :] < block[None, :, :]).any(axis=2)
+            dominated.append((le & lt).any(axis=0))
+        if dominated:
+            keep = ~np.concatenate(dominated)
+            points, rows = points[keep], rows[keep]
+        
+        front = np.empty((0, len(columns)))
+        front_rows = []
+        for start in range(0, len(points), block_size):
+            block = points[start:start + block_size]
+            block_rows = rows[start:start + block_size]
+            if len(front):
+                # dominated[j] if some front point is <= everywhere and < somewhere
+                le = (front[:, None, :] <= block[None, :, :]).all(axis=2)
+                lt = (front[:, None, :] < block[None, :, :]).any(axis=2)
+                keep = ~(le & lt).any(axis=0)
+                block, block_rows = block[keep], block_rows[keep]
+            le = (block[:, None, :] <= block[None, :, :]).all(axis=2)
+            lt = (block[:, None, :] < block[None, :, :]).any(axis=2)
+            keep = ~(le & lt).any(axis=0)
+            front = np.concatenate([front, block[keep]])
+            front_rows.extend(block_rows[keep])
+        
+        # Present the frontier ordered by the first criterion
+        order = np.lexsort(front.T[::-1])
+        return [(self._ids[front_rows[i]], self.suppliers[self._ids[front_rows[i]]]) for i in order]
+    
     def get_best_supplier(self, priority='balanced'):
         """Get the single best supplier"""
-        ranked = self.evaluate_suppliers(priority)
+        ranked = self.evaluate_suppliers(priority, top_k=1)
         return ranked[0] if ranked else None
     
     def add_supplier(self, supplier_id, metrics):
         """Add a new supplier"""
         self.suppliers[supplier_id] = metrics
+        self._index_supplier(supplier_id, metrics)
+    
+    def hydrate_from_erp(self, client, defaults=None, include_inactive=False):
+        """
+        Load suppliers from an ERP client (see api/erp_client.py)
+        Metrics present on the ERP record are used as-is; a 1-5 'rating'
+        fills quality and reliability on the 1-10 scale, and 'defaults'
+        supplies anything still missing. Returns the number of suppliers added.
+        """
+        added = 0
+        for supplier_id, record in client.get_suppliers().items():
+            if not include_inactive and record.get('status', 'active') != 'active':
+                continue
+            metrics = dict(defaults or {})
+            if 'rating' in record:
+                metrics['quality'] = metrics['reliability'] = round(record['rating'] * 2, 1)
+            metrics.update(record)
+            self.add_supplier(supplier_id, metrics)
+            added += 1
+        return added
 
 # Test the agent
 if __name__ == "__main__":
@@ -0,0 +1,190 @@
+"""
+ERP Client - Pooled, cached access to the ERP endpoints (see erp_mock.py)
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+import requests
+from requests.adapters import HTTPAdapter
+
+class ERPClient:
+    """
+    Thread-safe ERP client
+    - one keep-alive connection pool shared by every caller
+    - TTL cache per endpoint (suppliers, products, inventory, sales)
+    - request coalescing: concurrent identical requests share one HTTP call
+    """
+    DEFAULT_TTLS = {
+        '/api/erp/suppliers': 300,
+        '/api/erp/products': 300,
+        '/api/erp/inventory': 30,
+        '/api/erp/sales': 60
+    }
+
+    def __init__(self, base_url='http://localhost:5001', pool_size=10, timeout=5, ttls=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.ttls = dict(self.DEFAULT_TTLS, **(ttls or {}))
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._cache = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _ttl_for(self, path):
+        for prefix, ttl in self.ttls.items():
+            if path.startswith(prefix):
+                return ttl
+        return 0
+
+    def _get(self, path, params=None):
+        """GET a JSON resource through the cache and the in-flight table"""
+        key = (path, tuple(sorted((params or {}).items())))
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            pending = self._inflight.get(key)
+            leader = pending is None
+            if leader:
+                self.misses += 1
+                pending = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            # Another thread is already fetching this resource; wait for its result
+            return pending.result(timeout=self.timeout * 2)
+
+        try:
+            response = self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
+            response.raise_for_status()
+            value = response.json()
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.set_exception(e)
+            raise
+
+        ttl = self._ttl_for(path)
+        with self._lock:
+            if ttl > 0:
+                self._cache[key] = (time.monotonic() + ttl, value)
+            self._inflight.pop(key, None)
+        pending.set_result(value)
+        return value
+
+    def get_suppliers(self):
+        return self._get('/api/erp/suppliers')
+
+    def get_products(self):
+        return self._get('/api/erp/products')
+
+    def get_inventory(self):
+        return self._get('/api/erp/inventory')
+
+    def get_sales(self, days=30):
+        return self._get(f'/api/erp/sales/{int(days)}')
+
+    def iter_sales(self, start, end, skus=None, limit=5000):
+        """Yield pages of {'date', 'sku', 'sales'} records, following the ERP's cursors (uncached)"""
+        params = {'start': start, 'end': end, 'limit': limit}
+        if skus:
+            params['sku'] = ','.join(skus)
+        cursor = None
+        while True:
+            if cursor is not None:
+                params['cursor'] = cursor
+            response = self.session.get(f"{self.base_url}/api/erp/sales", params=params, timeout=self.timeout)
+            response.raise_for_status()
+            page = response.json()
+            yield page['data']
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+
+    def health(self):
+        return self._get('/api/erp/health')
+
+    def invalidate(self, path=None):
+        """Drop cached responses (all, or those for one path)"""
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+            else:
+                for key in [key for key in self._cache if key[0] == path]:
+                    del self._cache[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'cached_entries': len(self._cache)
+            }
+
+    def close(self):
+        self.session.close()
+
+class AsyncERPClient:
+    """
+    asyncio front end for fan-out
+    Calls run on the pooled ERPClient in worker threads, bounded by max_concurrency,
+    so they share its connection pool, cache and request coalescing
+    """
+    def __init__(self, client=None, max_concurrency=10, **client_kwargs):
+        self.client = client or ERPClient(pool_size=max_concurrency, **client_kwargs)
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+
+    async def _call(self, method, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await asyncio.to_thread(method, *args)
+
+    async def get_suppliers(self):
+        return await self._call(self.client.get_suppliers)
+
+    async def get_products(self):
+        return await self._call(self.client.get_products)
+
+    async def get_inventory(self):
+        return await self._call(self.client.get_inventory)
+
+    async def get_sales(self, days=30):
+        return await self._call(self.client.get_sales, days)
+
+    async def get_snapshot(self, sales_days=30):
+        """Fetch suppliers, products, inventory and sales concurrently"""
+        suppliers, products, inventory, sales = await asyncio.gather(
+            self.get_suppliers(), self.get_products(), self.get_inventory(), self.get_sales(sales_days))
+        return {
+            'suppliers': suppliers,
+            'products': products,
+            'inventory': inventory,
+            'sales': sales
+        }
+
+# Test the client against a locally running erp_mock.py
+if __name__ == "__main__":
+    client = ERPClient()
+
+    print("=== ERP Client Demo ===")
+    try:
+        print(f"Health: {client.health()['status']}")
+        print(f"Suppliers: {len(client.get_suppliers())}")
+        print(f"Products: {len(client.get_products())}")
+        client.get_suppliers()
+        snapshot = asyncio.run(AsyncERPClient(client).get_snapshot(sales_days=7))
+        print(f"Async snapshot: {len(snapshot['inventory'])} inventory items, {len(snapshot['sales'])} sales days")
+        print(f"Cache stats: {client.stats()}")
+    except requests.exceptions.ConnectionError:
+        print("⚠️  ERP Mock API Server not running. Start with: python api/erp_mock.py")
@@ -1,14 +1,35 @@
 """
 ERP Mock API - Simulates ERP system data endpoints
 """
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request
+import json
+import os
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
 app = Flask(__name__)
 
+MAX_PAGE_SIZE = 10000
+STREAM_CHUNK_SIZE = 5000
+
+def _uniform(seed, *keys):
+    """
+    Deterministic uniforms in [0, 1) for each combination of integer keys
+    (splitmix64 over the mixed keys), identical in every process for a given seed
+    """
+    with np.errstate(over='ignore'):
+        x = np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15)
+        for i, key in enumerate(keys):
+            x = x ^ (np.asarray(key).astype(np.uint64) + np.uint64(i + 1)) * np.uint64(0xBF58476D1CE4E5B9)
+            x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+            x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+            x = x ^ (x >> np.uint64(31))
+    return (x >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
 class ERPMockAPI:
-    def __init__(self):
+    def __init__(self, n_skus=3, seed=42):
+        self.seed = seed
         self.suppliers = {
             "SUP001": {"name": "Global Parts Co.", "status": "active", "rating": 4.5},
             "SUP002": {"name": "Premium Suppliers Inc.", "status": "active", "rating": 4.8},
@@ -26,27 +47,97 @@ class ERPMockAPI:
             "PROD002": {"current_stock": 300, "reserved": 30, "available": 270},
             "PROD003": {"current_stock": 150, "reserved": 15, "available": 135}
         }
+        
+        # Synthetic catalog beyond the three named products, for load testing
+        self.skus = [f"PROD{i + 1:03d}" for i in range(max(n_skus, 3))]
+        self.sku_index = {sku: i for i, sku in enumerate(self.skus)}
+        index = np.arange(len(self.skus))
+        self.base_sales = np.round(20 + 180 * _uniform(seed, index, 1))
+        stock = np.round(50 + 950 * _uniform(seed, index, 2))
+        reserved = np.round(stock * 0.1)
+        self.stock = np.column_stack([stock, reserved, stock - reserved]).astype(np.int64)
+        for i, sku in enumerate(self.skus[:3]):
+            item = self.inventory[sku]
+            self.stock[i] = [item['current_stock'], item['reserved'], item['available']]
     
     def get_sales_data(self, days=30):
         """Generate mock sales data"""
-        dates = [(datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d') 
-                for i in range(days-1, -1, -1)]
-        
-        # Generate realistic sales data with some variation
-        base_sales = 100
-        sales_data = []
-        
-        for date in dates:
-            # Add some randomness and weekend pattern
-            day_of_week = datetime.strptime(date, '%Y-%m-%d').weekday()
-            weekend_factor = 0.7 if day_of_week >= 5 else 1.0
-            daily_sales = int(base_sales * weekend_factor * (0.8 + 0.4 * (hash(date) % 100) / 100))
-            sales_data.append({"date": date, "sales": daily_sales})
-        
-        return sales_data
+        end = np.datetime64(datetime.now().date(), 'D').astype(np.int64)
+        epoch_days = np.arange(end - days + 1, end + 1)
+        # Same 100-unit base and weekend pattern as before, now seeded instead of hash()
+        weekend_factor = np.where((epoch_days + 3) % 7 >= 5, 0.7, 1.0)
+        sales = (100 * weekend_factor * (0.8 + 0.4 * _uniform(self.seed, epoch_days))).astype(int)
+        dates = epoch_days.astype('datetime64[D]').astype(str).tolist()
+        return [{"date": date, "sales": int(value)} for date, value in zip(dates, sales)]
+    
+    def resolve_skus(self, skus=None):
+        """SKU labels to catalog positions (all SKUs when none are given)"""
+        if not skus:
+            return np.arange(len(self.skus))
+        unknown = [sku for sku in skus if sku not in self.sku_index]
+        if unknown:
+            raise KeyError(f"Unknown SKU(s): {', '.join(unknown[:10])}")
+        return np.array([self.sku_index[sku] for sku in skus])
+    
+    def sales_records(self, start, end, sku_positions, offset=0, limit=None):
+        """
+        Sales rows for [start, end] x SKUs in date-major order, starting at row offset
+        Only the requested slice is generated, so any page costs O(limit)
+        """
+        start_day = np.datetime64(start, 'D').astype(np.int64)
+        n_days = int(np.datetime64(end, 'D').astype(np.int64) - start_day) + 1
+        total = max(n_days, 0) * len(sku_positions)
+        stop = total if limit is None else min(total, offset + limit)
+        rows = np.arange(offset, stop)
+        epoch_days = start_day + rows // len(sku_positions)
+        positions = sku_positions[rows % len(sku_positions)]
+        weekend_factor = np.where((epoch_days + 3) % 7 >= 5, 0.7, 1.0)
+        noise = 0.8 + 0.4 * _uniform(self.seed, epoch_days, positions)
+        sales = (self.base_sales[positions] * weekend_factor * noise).astype(np.int64)
+        dates = epoch_days.astype('datetime64[D]').astype(str).tolist()
+        records = [
+            {"date": date, "sku": self.skus[position], "sales": int(value)}
+            for date, position, value in zip(dates, positions, sales)
+        ]
+        return records, total
+    
+    def inventory_records(self, sku_positions, offset=0, limit=None):
+        """Inventory rows for the given SKU positions, starting at offset"""
+        stop = len(sku_positions) if limit is None else min(len(sku_positions), offset + limit)
+        positions = sku_positions[offset:stop]
+        records = [
+            {"sku": self.skus[position], "current_stock": int(stock), "reserved": int(reserved), "available": int(available)}
+            for position, (stock, reserved, available) in zip(positions, self.stock[positions].tolist())
+        ]
+        return records, len(sku_positions)
+
+def _query_skus():
+    return [sku for value in request.args.getlist('sku') for sku in value.split(',') if sku]
+
+def _query_range():
+    """start/end query params, defaulting to the last 30 days"""
+    end = request.args.get('end') or datetime.now().strftime('%Y-%m-%d')
+    start = request.args.get('start') or (datetime.strptime(end, '%Y-%m-%d') - timedelta(days=29)).strftime('%Y-%m-%d')
+    return start, end
+
+def _query_page():
+    """cursor (an opaque row offset) and limit query params"""
+    offset = int(request.args.get('cursor') or 0)
+    limit = min(request.args.get('limit', default=1000, type=int), MAX_PAGE_SIZE)
+    if offset < 0 or limit <= 0:
+        raise ValueError("cursor must be >= 0 and limit > 0")
+    return offset, limit
+
+def _ndjson(pages):
+    """Stream records from a page generator as newline-delimited JSON"""
+    def generate():
+        for records in pages:
+            yield ''.join(json.dumps(record) + '\n' for record in records)
+    return Response(generate(), mimetype='application/x-ndjson')
 
-# Initialize ERP mock
-erp = ERPMockAPI()
+# Initialize ERP mock (ERP_MOCK_SKUS sizes the synthetic catalog)
+erp = ERPMockAPI(n_skus=int(os.environ.get('ERP_MOCK_SKUS', 3)),
+                 seed=int(os.environ.get('ERP_MOCK_SEED', 42)))
 
 @app.route('/api/erp/suppliers', methods=['GET'])
 def get_suppliers():
@@ -65,6 +156,65 @@ def get_sales_data(days=30):
     sales_data = erp.get_sales_data(min(days, 90))  # Limit to 90 days max
     return jsonify(sales_data)
 
+@app.route('/api/erp/sales', methods=['GET'])
+def get_sales_page():
+    try:
+        start, end = _query_range()
+        offset, limit = _query_page()
+        positions = erp.resolve_skus(_query_skus())
+        records, total = erp.sales_records(start, end, positions, offset, limit)
+        next_offset = offset + len(records)
+        return jsonify({
+            "data": records,
+            "total": total,
+            "next_cursor": str(next_offset) if next_offset < total else None
+        })
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/api/erp/sales/stream', methods=['GET'])
+def stream_sales():
+    try:
+        start, end = _query_range()
+        positions = erp.resolve_skus(_query_skus())
+        _, total = erp.sales_records(start, end, positions, 0, 0)
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    pages = (erp.sales_records(start, end, positions, offset, STREAM_CHUNK_SIZE)[0]
+             for offset in range(0, total, STREAM_CHUNK_SIZE))
+    return _ndjson(pages)
+
+@app.route('/api/erp/inventory/page', methods=['GET'])
+def get_inventory_page():
+    try:
+        offset, limit = _query_page()
+        positions = erp.resolve_skus(_query_skus())
+        records, total = erp.inventory_records(positions, offset, limit)
+        next_offset = offset + len(records)
+        return jsonify({
+            "data": records,
+            "total": total,
+            "next_cursor": str(next_offset) if next_offset < total else None
+        })
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/api/erp/inventory/stream', methods=['GET'])
+def stream_inventory():
+    try:
+        positions = erp.resolve_skus(_query_skus())
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+    pages = (erp.inventory_records(positions, offset, STREAM_CHUNK_SIZE)[0]
+             for offset in range(0, len(positions), STREAM_CHUNK_SIZE))
+    return _ndjson(pages)
+
 @app.route('/api/erp/health', methods=['GET'])
 def health_check():
     return jsonify({
@@ -83,6 +233,10 @@ def home():
             "/api/erp/products", 
             "/api/erp/inventory",
             "/api/erp/sales/{days}",
+            "/api/erp/sales?start=&end=&sku=&cursor=&limit=",
+            "/api/erp/sales/stream",
+            "/api/erp/inventory/page?sku=&cursor=&limit=",
+            "/api/erp/inventory/stream",
             "/api/erp/health"
         ]
     })
@@ -94,5 +248,9 @@ if __name__ == '__main__':
     print("  http://localhost:5001/api/erp/products")
     print("  http://localhost:5001/api/erp/inventory")
     print("  http://localhost:5001/api/erp/sales/30")
+    print("  http://localhost:5001/api/erp/sales?start=2024-01-01&end=2024-12-31&limit=1000")
+    print("  http://localhost:5001/api/erp/sales/stream?start=2024-01-01&end=2024-12-31")
+    print("  http://localhost:5001/api/erp/inventory/page?limit=1000")
+    print("  http://localhost:5001/api/erp/inventory/stream")
     print("  http://localhost:5001/api/erp/health")
     app.run(host='0.0.0.0', port=5001, debug=True)
\ No newline at end of file
@@ -0,0 +1,12 @@
+"""
+ASGI entry point - serve the API from an asyncio server
+
+    uvicorn asgi:app --workers 4
+
+Heavy forecast and optimization routes are async views that await the
+bounded CPU pool in main.py, returning 503 when it is saturated.
+"""
+from asgiref.wsgi import WsgiToAsgi
+from main import create_app
+
+app = WsgiToAsgi(create_app())
@@ -0,0 +1,307 @@
+"""
+Benchmarks - Throughput, latency and peak memory of the agents, models and API
+
+    python -m benchmarks.run --size small
+    python -m benchmarks.run --size medium --save-baseline
+    python -m benchmarks.run --size medium --only inventory,forecast
+
+Each case runs a warm-up call, then `repeat` timed calls (p50 / p99 latency,
+items per second at p50), then one more call under tracemalloc for peak
+memory. Results are compared with the baseline file (benchmarks/baseline.json
+by default, written by --save-baseline on a reference machine); a case whose
+p50 or peak memory grows by more than --tolerance is a regression and the run
+exits with status 1.
+
+Sizes (suppliers, SKUs, days of history):
+    small   1k, 1k, 730
+    medium  100k, 100k, 730
+    large   1M, 1M, 730     (the demand matrix alone is about 3 GB)
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+SIZES = {
+    'small': {'suppliers': 1_000, 'skus': 1_000, 'days': 730},
+    'medium': {'suppliers': 100_000, 'skus': 100_000, 'days': 730},
+    'large': {'suppliers': 1_000_000, 'skus': 1_000_000, 'days': 730}
+}
+
+GROUPS = ('supplier', 'inventory', 'forecast', 'api')
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+def measure(fn, repeat=5, items=1, warmup=1):
+    """Latency percentiles, throughput and peak traced memory of fn()"""
+    for _ in range(warmup):
+        fn()
+    samples = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - start
+
+    # Separate pass: tracing slows allocations down, so it stays out of the timings
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    p50 = float(np.percentile(samples, 50))
+    return {
+        'p50_ms': round(p50 * 1000, 3),
+        'p99_ms': round(float(np.percentile(samples, 99)) * 1000, 3),
+        'mean_ms': round(float(samples.mean()) * 1000, 3),
+        'items_per_s': round(items / p50, 1) if p50 > 0 else None,
+        'peak_mb': round(peak / 2 ** 20, 2),
+        'repeat': repeat,
+        'items': items
+    }
+
+class Catalog:
+    """Synthetic data for one size, generated once and shared by every group"""
+    def __init__(self, suppliers, skus, days, seed=0):
+        from benchmarks.synthetic import make_demand, make_items, make_suppliers
+        from models.demand_store import write_store
+
+        self.sizes = {'suppliers': suppliers, 'skus': skus, 'days': days, 'seed': seed}
+        self.suppliers = make_suppliers(suppliers, seed)
+        self.dates, self.demand, self.skus = make_demand(skus, days, seed)
+        self.items = make_items(skus, seed)
+        self._tempdir = tempfile.TemporaryDirectory(prefix='supplychain-bench-')
+        self.store_path = os.path.join(self._tempdir.name, 'demand')
+        write_store(self.store_path, self.dates, self.demand, self.skus)
+
+    def close(self):
+        self._tempdir.cleanup()
+
+def supplier_cases(catalog):
+    from agents.supplier_agent import SupplierAgent
+
+    agent = SupplierAgent()
+    for supplier_id, metrics in catalog.suppliers.items():
+        agent.add_supplier(supplier_id, metrics)
+    n = len(agent.suppliers)
+
+    def cold(**kwargs):
+        def evaluate():
+            # Re-adding a supplier drops the cached scores and rankings
+            agent.add_supplier('supplier_a', agent.suppliers['supplier_a'])
+            agent.evaluate_suppliers(**kwargs)
+        return evaluate
+
+    yield 'evaluate_suppliers.full_ranking_cold', cold(priority='balanced'), n, 5
+    yield 'evaluate_suppliers.top10_cold', cold(priority='quality', top_k=10), n, 5
+    yield 'evaluate_suppliers.top10_cached', lambda: agent.evaluate_suppliers('quality', top_k=10), n, 50
+    yield 'evaluate_suppliers.filtered_weights', lambda: agent.evaluate_suppliers(
+        weights='cost:0.5,quality:0.3,lead_time:0.2', filters='lead_time<=5,reliability>=7', top_k=10), n, 10
+    yield 'pareto_front', lambda: agent.pareto_front(), n, 5
+
+def inventory_cases(catalog):
+    from agents.inventory_agent import InventoryAgent
+
+    agent = InventoryAgent()
+    items = catalog.items
+    n = len(items)
+    rows = itertools.cycle(items.head(10_000).itertuples(index=False))
+
+    def single():
+        row = next(rows)
+        agent.optimize_inventory(row.item_id, row.annual_demand, row.ordering_cost, row.holding_cost,
+                                 lead_time_days=row.lead_time, daily_std_dev=row.daily_std_dev)
+
+    yield 'optimize_inventory.single_call', single, 1, 1000
+    yield 'optimize_batch', lambda: agent.optimize_batch(items), n, 5
+    yield 'optimize_service_levels', lambda: agent.optimize_service_levels(items, store=False), n, 3
+    stock = {'item_id': items['item_id'], 'available': np.asarray(items['annual_demand']) / 365 * 5}
+    yield 'check_reorder_batch', lambda: agent.check_reorder_batch(stock), n, 5
+    demand = np.random.default_rng(0).poisson(20, (1000, 365)).astype(np.float32)
+    yield 'simulate_policy.1000x365', lambda: agent.simulate_policy(demand, 150, 400, lead_time_days=5), 1000, 5
+
+def forecast_cases(catalog):
+    from models import holt_winters
+    from models.forecast_model import SimpleForecastModel
+
+    model = SimpleForecastModel()
+    n = len(catalog.skus)
+    yield 'load_store', lambda: model.load_store(catalog.store_path), n, 1
+    model.load_store(catalog.store_path)
+
+    for method in ('moving_average', 'seasonal', 'holt_winters'):
+        yield f"forecast_skus.{method}", (
+            lambda method=method: model.forecast_skus(method=method, periods=30)), n, 3
+    yield 'moving_average_forecast', lambda: model.moving_average_forecast(periods=30), 1, 20
+    yield 'seasonal_forecast', lambda: model.seasonal_forecast(periods=30), 1, 20
+    yield 'holt_winters_forecast', lambda: model.holt_winters_forecast(periods=30), 1, 20
+    yield 'trend_skus', lambda: model.trend_skus(), n, 3
+    yield 'get_trend_analysis.cached', model.get_trend_analysis, 1, 50
+
+    history = np.asarray(catalog.demand[-model.holt_winters_history:], dtype=np.float64)
+    yield 'holt_winters.fit', lambda: holt_winters.fit(history), n, 1
+
+    skus = list(catalog.skus[:1000])
+    days = itertools.count(1)
+
+    def append():
+        date = catalog.dates[-1] + np.timedelta64(next(days), 'D')
+        model.append_observations([{'date': date, 'sku': sku, 'demand': 10.0} for sku in skus])
+
+    yield 'append_observations.1000', append, len(skus), 10
+    yield 'sample_demand_paths.1000x365', lambda: model.sample_demand_paths(
+        skus[0], n_paths=1000, periods=365, seed=0), 1000, 5
+
+def api_cases(catalog):
+    # main reads FORECAST_DATA at import; point it at the synthetic demand store
+    os.environ['FORECAST_DATA'] = catalog.store_path
+    os.environ.setdefault('INVENTORY_MAX_ITEMS', str(max(100_000, len(catalog.skus))))
+    import main
+
+    client = main.create_app(warm_up_mode='eager').test_client()
+    supplier_agent = main.get_supplier_agent()
+    for supplier_id, metrics in catalog.suppliers.items():
+        supplier_agent.add_supplier(supplier_id, metrics)
+
+    items = catalog.items.head(1000)
+    skus = list(items['item_id'])
+    batch = {
+        'item_id': skus,
+        'annual_demand': items['annual_demand'].tolist(),
+        'ordering_cost': items['ordering_cost'].tolist(),
+        'holding_cost': items['holding_cost'].tolist()
+    }
+    stock = {'item_id': skus, 'available': (items['annual_demand'] / 365 * 5).tolist()}
+
+    def call(method, url, **kwargs):
+        def request():
+            response = client.open(url, method=method, **kwargs)
+            response.get_data()
+            if response.status_code != 200:
+                raise RuntimeError(f"{method} {url} -> {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        return request
+
+    yield 'GET /api/health', call('GET', '/api/health'), 1, 200
+    yield 'GET /api/suppliers?top_k=10', call('GET', '/api/suppliers?priority=quality&top_k=10'), 1, 50
+    yield 'GET /api/suppliers/pareto', call('GET', '/api/suppliers/pareto'), 1, 10
+    yield 'POST /api/inventory/optimize', call('POST', '/api/inventory/optimize', json={
+        'item_id': skus[0], 'annual_demand': 10000, 'ordering_cost': 50, 'holding_cost': 2}), 1, 200
+    yield 'POST /api/inventory/optimize/batch', call('POST', '/api/inventory/optimize/batch', json=batch), 1000, 20
+    yield 'POST /api/inventory/check/batch', call('POST', '/api/inventory/check/batch', json=stock), 1000, 20
+    yield 'GET /api/inventory/summary', call('GET', '/api/inventory/summary?limit=100'), 100, 50
+    yield 'GET /api/forecast', call('GET', '/api/forecast?periods=30'), 1, 50
+    yield 'GET /api/forecast?sku=10', call('GET', f"/api/forecast?periods=30&sku={','.join(skus[:10])}"), 10, 50
+    yield 'POST /api/plan', call('POST', '/api/plan', json={'skus': skus, 'store': False}), 1000, 10
+
+CASES = {
+    'supplier': supplier_cases,
+    'inventory': inventory_cases,
+    'forecast': forecast_cases,
+    'api': api_cases
+}
+
+def run(catalog, groups=GROUPS, repeat_scale=1.0, log=print):
+    """Run the selected groups; returns {group.case: measurement}"""
+    results = {}
+    for group in groups:
+        for name, fn, items, repeat in CASES[group](catalog):
+            key = f"{group}.{name}"
+            results[key] = measure(fn, repeat=max(1, int(repeat * repeat_scale)), items=items)
+            result = results[key]
+            log(f"  {key:<55} p50 {result['p50_ms']:>10.3f} ms  p99 {result['p99_ms']:>10.3f} ms  "
+                f"{result['items_per_s'] or 0:>14,.0f} items/s  peak {result['peak_mb']:>8.2f} MB")
+    return results
+
+def compare(results, baseline, tolerance=0.25):
+    """Regressions against a baseline: [(case, metric, baseline, current)]"""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        for metric in ('p50_ms', 'peak_mb'):
+            # Ignore noise on very small values (sub-millisecond, sub-megabyte)
+            if reference[metric] >= 1 and result[metric] > reference[metric] * (1 + tolerance):
+                regressions.append((key, metric, reference[metric], result[metric]))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Supply chain benchmarks")
+    parser.add_argument('--size', choices=SIZES, default='small')
+    parser.add_argument('--suppliers', type=int, help="override the size's supplier count")
+    parser.add_argument('--skus', type=int, help="override the size's SKU count")
+    parser.add_argument('--days', type=int, help="override the size's days of history")
+    parser.add_argument('--only', help=f"comma-separated groups ({', '.join(GROUPS)})")
+    parser.add_argument('--repeat-scale', type=float, default=1.0, help="multiply every case's repeat count")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="write these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed relative slowdown (0.25 = 25%%)")
+    parser.add_argument('--output', help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    groups = GROUPS if not args.only else [group.strip() for group in args.only.split(',') if group.strip()]
+    unknown = [group for group in groups if group not in CASES]
+    if unknown:
+        parser.error(f"unknown group(s): {', '.join(unknown)}")
+    sizes = dict(SIZES[args.size])
+    for name in ('suppliers', 'skus', 'days'):
+        if getattr(args, name):
+            sizes[name] = getattr(args, name)
+
+    print(f"📊 Generating synthetic catalog: {sizes['suppliers']:,} suppliers, "
+          f"{sizes['skus']:,} SKUs, {sizes['days']} days")
+    catalog = Catalog(**sizes)
+    try:
+        print("⏱️  Running benchmarks")
+        results = run(catalog, groups, args.repeat_scale)
+    finally:
+        catalog.close()
+
+    report = {
+        'sizes': catalog.sizes,
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'cpus': os.cpu_count(), 'numpy': np.__version__},
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    status = 0
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        # One baseline per size, so small and medium runs can share the file
+        baseline[args.size if sizes == SIZES[args.size] else 'custom'] = report
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            reference = json.load(f).get(args.size if sizes == SIZES[args.size] else 'custom')
+        if reference is None or reference['sizes'] != catalog.sizes:
+            print(f"⚠️  No baseline for these sizes in {args.baseline}")
+        else:
+            regressions = compare(results, reference['results'], args.tolerance)
+            for key, metric, before, after in regressions:
+                print(f"❌ {key}: {metric} {before} -> {after} (+{(after / before - 1) * 100:.0f}%)")
+            if regressions:
+                status = 1
+            else:
+                print(f"✅ No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    else:
+        print(f"ℹ️  No baseline at {args.baseline}; run with --save-baseline to create one")
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+Synthetic Catalogs - Reproducible suppliers, items and demand history for benchmarks
+
+Everything is drawn from a seeded generator, so two runs with the same sizes
+and seed benchmark exactly the same data.
+"""
+import numpy as np
+import pandas as pd
+
+def make_suppliers(n, seed=0):
+    """{supplier_id: metrics} on the SupplierAgent scales (cost/quality/... 1-10, lead_time in days)"""
+    rng = np.random.default_rng(seed)
+    cost, quality, delivery, reliability = np.round(rng.uniform(1, 10, (4, n)), 1)
+    lead_time = rng.integers(1, 15, n)
+    return {
+        f"supplier_{i:07d}": {
+            'name': f"Supplier {i}",
+            'cost': float(cost[i]),
+            'quality': float(quality[i]),
+            'delivery': float(delivery[i]),
+            'reliability': float(reliability[i]),
+            'lead_time': int(lead_time[i])
+        }
+        for i in range(n)
+    }
+
+def make_items(n, seed=0, prefix='SKU'):
+    """Inventory parameters per item as a DataFrame (the optimize_batch / optimize_service_levels columns)"""
+    rng = np.random.default_rng(seed + 1)
+    annual_demand = np.round(rng.lognormal(8, 1, n))
+    return pd.DataFrame({
+        'item_id': [f"{prefix}{i:07d}" for i in range(n)],
+        'annual_demand': annual_demand,
+        'ordering_cost': np.round(rng.uniform(20, 200, n), 2),
+        'holding_cost': np.round(rng.uniform(0.5, 10, n), 2),
+        'lead_time': rng.integers(1, 15, n),
+        'daily_std_dev': np.round(annual_demand / 365 * rng.uniform(0.1, 0.5, n), 2),
+        'stockout_penalty': np.round(rng.uniform(5, 50, n), 2)
+    })
+
+def make_demand(n_skus, days, seed=0, start='2022-01-01', missing=0.02, prefix='SKU', block_size=10_000):
+    """
+    Daily demand history as (dates, float32 matrix dates x SKUs, SKU labels)
+    Each SKU has its own level, linear trend, weekday pattern and noise;
+    a 'missing' share of the cells is NaN (no observation). Columns are
+    generated in blocks of block_size SKUs to bound temporary memory.
+    """
+    rng = np.random.default_rng(seed + 2)
+    dates = pd.date_range(start, periods=days, freq='D')
+    weekday = dates.dayofweek.to_numpy()
+    t = np.arange(days, dtype=np.float32)[:, None]
+    matrix = np.empty((days, n_skus), dtype=np.float32)
+
+    for lo in range(0, n_skus, block_size):
+        hi = min(lo + block_size, n_skus)
+        width = hi - lo
+        level = rng.lognormal(3, 1, width).astype(np.float32)
+        trend = (level * rng.normal(0, 0.0005, width)).astype(np.float32)
+        pattern = rng.normal(0, 0.15, (7, width)).astype(np.float32)
+        block = level + trend * t + level * pattern[weekday]
+        block += level * rng.standard_normal((days, width), dtype=np.float32) * np.float32(0.2)
+        np.maximum(block, 0, out=block)
+        np.round(block, out=block)
+        if missing:
+            block[rng.random((days, width)) < missing] = np.nan
+        matrix[:, lo:hi] = block
+
+    skus = pd.Index([f"{prefix}{i:07d}" for i in range(n_skus)])
+    return dates, matrix, skus
@@ -1,30 +1,22 @@
 """
 Debug version of main application
+Times each import so slow modules show up; see also: python -X importtime main.py
 """
-print("Starting debug...")
-
-try:
-    from flask import Flask, jsonify, request
-    print("✅ Flask imported successfully")
-except Exception as e:
-    print(f"❌ Flask import error: {e}")
+import time
 
-try:
-    from agents.supplier_agent import SupplierAgent
-    print("✅ SupplierAgent imported successfully")
-except Exception as e:
-    print(f"❌ SupplierAgent import error: {e}")
+print("Starting debug...")
 
-try:
-    from agents.inventory_agent import InventoryAgent
-    print("✅ InventoryAgent imported successfully")
-except Exception as e:
-    print(f"❌ InventoryAgent import error: {e}")
+def timed_import(label, load):
+    start = time.perf_counter()
+    try:
+        load()
+        print(f"✅ {label} imported successfully ({(time.perf_counter() - start) * 1000:.1f} ms)")
+    except Exception as e:
+        print(f"❌ {label} import error: {e}")
 
-try:
-    from models.forecast_model import SimpleForecastModel
-    print("✅ SimpleForecastModel imported successfully")
-except Exception as e:
-    print(f"❌ SimpleForecastModel import error: {e}")
+timed_import("Flask", lambda: __import__('flask'))
+timed_import("SupplierAgent", lambda: __import__('agents.supplier_agent'))
+timed_import("InventoryAgent", lambda: __import__('agents.inventory_agent'))
+timed_import("SimpleForecastModel", lambda: __import__('models.forecast_model'))
 
-print("Debug complete!")
\ No newline at end of file
+print("Debug complete!")
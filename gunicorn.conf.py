@@ -0,0 +1,75 @@
+"""
+Gunicorn configuration for the supply chain API
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Environment overrides:
+    SUPPLYCHAIN_BIND      address to bind          (default 0.0.0.0:5000)
+    SUPPLYCHAIN_WORKERS   worker processes         (default: CPU count)
+    SUPPLYCHAIN_THREADS   threads per worker       (default 4)
+    SUPPLYCHAIN_TIMEOUT   worker timeout, seconds  (default 120)
+    SUPPLYCHAIN_MAX_REQUESTS  requests before a worker is replaced, with up to
+                              10% jitter (default 10000; 0 disables recycling).
+                              A replaced worker starts again from the master's
+                              preloaded state: observations posted to it and its
+                              in-memory inventory results are lost. Background
+                              jobs run in the job runner, not the workers, so
+                              recycling does not interrupt them
+    SUPPLYCHAIN_METRICS_DIR  directory where workers share metrics, so
+                             /api/metrics reports every worker (default: per worker)
+    SUPPLYCHAIN_JOB_RUNNER   'external' when the background job runner is started
+                             separately (`python job_queue.py`); by default the
+                             master starts it next to the workers
+"""
+import glob
+import multiprocessing
+import os
+import subprocess
+import sys
+
+bind = os.environ.get('SUPPLYCHAIN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('SUPPLYCHAIN_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('SUPPLYCHAIN_THREADS', 4))
+worker_class = 'gthread'
+timeout = int(os.environ.get('SUPPLYCHAIN_TIMEOUT', 120))
+keepalive = 5
+
+# Load agents and forecast data in the master before forking so workers share them
+preload_app = True
+
+# Recycle workers periodically; jitter keeps them from restarting together
+max_requests = int(os.environ.get('SUPPLYCHAIN_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+
+accesslog = '-'
+errorlog = '-'
+
+def on_starting(server):
+    # Metric snapshots from a previous run would be counted again
+    directory = os.environ.get('SUPPLYCHAIN_METRICS_DIR')
+    if directory:
+        for path in glob.glob(os.path.join(directory, 'metrics-*.json*')):
+            os.remove(path)
+
+# Background jobs run in one runner process beside the master, never in the
+# workers: workers are recycled, and one process pool per worker would
+# oversubscribe the CPU. Workers only submit jobs and read their state.
+start_job_runner = os.environ.get('SUPPLYCHAIN_JOB_RUNNER', 'thread') != 'external'
+os.environ['SUPPLYCHAIN_JOB_RUNNER'] = 'external'
+_job_runner = None
+
+def when_ready(server):
+    global _job_runner
+    if start_job_runner:
+        # A plain subprocess: forked workers must not inherit it as a multiprocessing child
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'job_queue.py')
+        _job_runner = subprocess.Popen([sys.executable, script, '--exit-with-parent'])
+
+def on_exit(server):
+    # The runner puts unfinished jobs back in the queue; the next start resumes them
+    if _job_runner is not None and _job_runner.poll() is None:
+        _job_runner.terminate()
+        try:
+            _job_runner.wait(30)
+        except subprocess.TimeoutExpired:
+            _job_runner.kill()
@@ -0,0 +1,429 @@
+"""
+Job Queue - Background catalog jobs on a local process pool, no broker needed
+
+A job splits the catalog's SKUs into chunks; each chunk runs in a worker
+process and writes its result to disk as a columnar .npz file:
+    <directory>/jobs.db                     job state (SQLite, shared by every server process)
+    <directory>/<job_id>/skus.npz           the job's SKU labels and chunk size
+    <directory>/<job_id>/chunk-00000.npz    one file per finished chunk
+Any server process can submit a job, then poll its status and read the chunks
+finished so far. One runner per server claims queued jobs and runs their chunks
+on its process pool, outside the web workers, so recycled workers do not
+interrupt jobs and the CPU is not shared by one pool per worker:
+    python job_queue.py         run the runner on its own
+gunicorn.conf.py starts it next to the master; `python main.py` runs it in a
+thread. Workers load the forecast data from its path once per process, so jobs
+see the data as it is on disk (a demand store directory is memory-mapped and shared).
+"""
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+
+JOB_KINDS = ('plan', 'forecast')
+FINISHED = ('done', 'failed', 'cancelled')
+
+# Forecast models and job database connections of this worker process
+_worker_models = {}
+_worker_connections = {}
+
+def _worker_model(data_path):
+    model = _worker_models.get(data_path)
+    if model is None:
+        from models.forecast_model import SimpleForecastModel
+        model = SimpleForecastModel()
+        if not model.load_data(data_path):
+            raise ValueError(f"Could not load forecast data from {data_path}")
+        _worker_models[data_path] = model
+    return model
+
+def _job_status(directory, job_id):
+    """A job's current status as seen by a worker process (None once deleted)"""
+    connection = _worker_connections.get(directory)
+    if connection is None:
+        connection = _worker_connections[directory] = sqlite3.connect(os.path.join(directory, 'jobs.db'), timeout=30)
+    row = connection.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return None if row is None else row[0]
+
+def _columns(result):
+    """Result columns as arrays np.load can read without pickle (None -> '' or NaN)"""
+    columns = {}
+    for key, value in result.items():
+        values = np.asarray(value)
+        if values.dtype == object:
+            if all(item is None or isinstance(item, (int, float)) for item in values.flat):
+                values = np.array([np.nan if item is None else item for item in values.flat], dtype=np.float64)
+            else:
+                values = np.array(['' if item is None else str(item) for item in values.flat])
+        columns[key] = values
+    return columns
+
+def _run_chunk(kind, data_path, directory, job_id, index, skus, params):
+    """
+    Worker entry point: compute one chunk and write it to disk; returns its row count
+    Returns None without computing anything if the job was cancelled or deleted
+    in the meantime, from whichever server process
+    """
+    if _job_status(directory, job_id) != 'running':
+        return None
+    model = _worker_model(data_path)
+    if kind == 'plan':
+        from agents.inventory_agent import InventoryAgent
+        from agents.planning_agent import PlanningAgent
+        agent = PlanningAgent(model, None, InventoryAgent())
+        result = agent.plan_block(skus, tuple(params['supplier']), method=params.get('method', 'moving_average'),
+                                  ordering_cost=params.get('ordering_cost', 50),
+                                  holding_cost=params.get('holding_cost', 2),
+                                  service_level=params.get('service_level'), store=False)
+    else:
+        forecast = model.forecast_skus(skus, method=params.get('method', 'moving_average'),
+                                       window=params.get('window', 7), periods=params.get('periods', 30),
+                                       quantiles=tuple(params.get('quantiles', (0.1, 0.5, 0.9))))
+        result = {'item_id': forecast['skus'], 'date': forecast['dates'], 'forecast': forecast['forecast']}
+        result.update({f"quantile_{label}": values for label, values in forecast['quantiles'].items()})
+
+    # Write then rename, so readers never see a half-written chunk
+    job_dir = os.path.join(directory, job_id)
+    path = os.path.join(job_dir, f"chunk-{index:05d}.npz")
+    partial = os.path.join(job_dir, f"chunk-{index:05d}.partial.npz")
+    np.savez(partial, **_columns(result))
+    os.replace(partial, path)
+    return len(skus)
+
+class JobQueue:
+    """
+    Submit, track and cancel chunked catalog jobs
+    State lives in SQLite, so any server process can submit jobs and answer
+    status and result requests. Chunks run only in the process that calls
+    serve() (the runner): it claims queued jobs and runs their chunks on its
+    pool. Every chunk checks the job status before it starts, so a cancel
+    from any process stops the rest of the job. A runner that shuts down puts
+    its unfinished jobs back in the queue, and the next runner resumes them
+    after their last finished chunk; jobs of a runner that died are marked
+    failed. Finished jobs are deleted after retention seconds.
+    """
+    def __init__(self, directory='data/jobs', data_path=None, max_workers=None, chunk_size=5000,
+                 retention=7 * 24 * 3600):
+        self.directory = directory
+        self.data_path = data_path
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.retention = retention
+        self._lock = threading.RLock()
+        self._executor = None
+        self._futures = {}
+        self._closed = False
+        self._stop = threading.Event()
+        os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(os.path.join(directory, 'jobs.db'), check_same_thread=False, timeout=30)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL,"
+                " params TEXT NOT NULL, total_chunks INTEGER NOT NULL, done_chunks INTEGER NOT NULL DEFAULT 0,"
+                " total_items INTEGER NOT NULL, done_items INTEGER NOT NULL DEFAULT 0, error TEXT,"
+                " owner_pid INTEGER, created REAL NOT NULL, updated REAL NOT NULL)")
+            # Jobs owned by a runner that is gone will never finish
+            for row in self._connection.execute("SELECT id, owner_pid FROM jobs WHERE status = 'running'").fetchall():
+                if not self._pid_alive(row['owner_pid']):
+                    self._connection.execute(
+                        "UPDATE jobs SET status = 'failed', error = 'Interrupted by a server restart', updated = ?"
+                        " WHERE id = ?", (time.time(), row['id']))
+
+    @classmethod
+    def from_env(cls):
+        """Queue configured from the environment, shared by the server and the runner"""
+        return cls(
+            directory=os.environ.get('SUPPLYCHAIN_JOB_DIR', 'data/jobs'),
+            data_path=os.environ.get('FORECAST_DATA', 'data/sample_data.csv'),
+            max_workers=int(os.environ.get('SUPPLYCHAIN_JOB_WORKERS', 0)) or None,
+            chunk_size=int(os.environ.get('SUPPLYCHAIN_JOB_CHUNK', 5000)),
+            retention=float(os.environ.get('SUPPLYCHAIN_JOB_RETENTION_DAYS', 7)) * 24 * 3600
+        )
+
+    @staticmethod
+    def _pid_alive(pid):
+        if pid is None or pid == os.getpid():
+            return False
+        try:
+            os.kill(pid, 0)
+        except (ProcessLookupError, PermissionError):
+            return False
+        return True
+
+    def _pool(self):
+        # 'spawn': the server process has threads, which do not survive a fork safely
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def submit(self, kind, skus, params=None, chunk_size=None):
+        """Queue a job over the given SKU labels; returns its ID (the runner starts it)"""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}', expected one of {', '.join(JOB_KINDS)}")
+        if not self.data_path:
+            raise ValueError("Job queue has no forecast data path")
+        skus = np.array([str(sku) for sku in skus], dtype=str)
+        params = dict(params or {})
+        chunk_size = max(int(chunk_size or self.chunk_size), 1)
+        total_chunks = -(-len(skus) // chunk_size)
+
+        job_id = uuid.uuid4().hex
+        job_dir = os.path.join(self.directory, job_id)
+        os.makedirs(job_dir)
+        np.savez(os.path.join(job_dir, 'skus.npz'), skus=skus, chunk_size=chunk_size)
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO jobs (id, kind, status, params, total_chunks, total_items, created, updated)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, 'queued' if total_chunks else 'done', json.dumps(params), total_chunks, len(skus),
+                 now, now))
+        return job_id
+
+    def run_pending(self):
+        """Claim queued jobs, oldest first, and start their chunks on this process's pool; returns how many"""
+        claimed = 0
+        while True:
+            with self._lock:
+                if self._closed:
+                    return claimed
+                with self._connection:
+                    row = self._connection.execute(
+                        "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1").fetchone()
+                    if row is None:
+                        return claimed
+                    # Conditional update: of several runners on one directory, only one wins
+                    taken = self._connection.execute(
+                        "UPDATE jobs SET status = 'running', owner_pid = ?, updated = ? WHERE id = ? AND status = 'queued'",
+                        (os.getpid(), time.time(), row['id'])).rowcount
+                if taken:
+                    self._start(row)
+                    claimed += 1
+
+    def _start(self, row):
+        """Submit a claimed job's unfinished chunks (call with the lock held)"""
+        job_id = row['id']
+        job_dir = os.path.join(self.directory, job_id)
+        try:
+            with np.load(os.path.join(job_dir, 'skus.npz')) as saved:
+                skus, chunk_size = saved['skus'].tolist(), int(saved['chunk_size'])
+        except OSError as e:
+            with self._connection:
+                self._connection.execute("UPDATE jobs SET status = 'failed', error = ?, updated = ? WHERE id = ?",
+                                         (f"Job input is missing: {e}", time.time(), job_id))
+            return
+
+        # A resumed job keeps the chunks an earlier runner finished
+        chunks = [skus[start:start + chunk_size] for start in range(0, len(skus), chunk_size)]
+        finished = set(os.listdir(job_dir))
+        todo = [index for index in range(len(chunks)) if f"chunk-{index:05d}.npz" not in finished]
+        done = sorted(set(range(len(chunks))) - set(todo))
+        with self._connection:
+            self._connection.execute(
+                "UPDATE jobs SET done_chunks = ?, done_items = ?, updated = ?,"
+                " status = CASE WHEN ? THEN 'done' ELSE status END WHERE id = ?",
+                (len(done), sum(len(chunks[index]) for index in done), time.time(), not todo, job_id))
+        if not todo:
+            return
+
+        pool = self._pool()
+        futures = self._futures[job_id] = []
+        for index in todo:
+            future = pool.submit(_run_chunk, row['kind'], self.data_path, self.directory, job_id, index,
+                                 chunks[index], json.loads(row['params']))
+            future.add_done_callback(lambda done, job_id=job_id: self._chunk_done(job_id, done))
+            futures.append(future)
+
+    def _chunk_done(self, job_id, future):
+        """Record a finished chunk; the first failure fails the job and cancels its other chunks"""
+        if future.cancelled():
+            return
+        error = future.exception()
+        with self._lock:
+            if self._closed:
+                # close() already put the job back in the queue
+                return
+            if error is None and future.result() is None:
+                # Skipped: the job was stopped before this chunk started
+                return
+            with self._connection:
+                if error is not None:
+                    self._connection.execute(
+                        "UPDATE jobs SET status = 'failed', error = ?, updated = ? WHERE id = ? AND status = 'running'",
+                        (f"{type(error).__name__}: {error}", time.time(), job_id))
+                    if isinstance(error, BrokenProcessPool):
+                        # A worker died; the pool fails its other futures itself, start a new one next time
+                        self._executor = None
+                    else:
+                        for other in self._futures.get(job_id, ()):
+                            other.cancel()
+                else:
+                    self._connection.execute(
+                        "UPDATE jobs SET done_chunks = done_chunks + 1, done_items = done_items + ?, updated = ?,"
+                        " status = CASE WHEN status = 'running' AND done_chunks + 1 = total_chunks THEN 'done'"
+                        " ELSE status END WHERE id = ?", (future.result(), time.time(), job_id))
+                row = self._connection.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                if row is None or row['status'] != 'running':
+                    self._futures.pop(job_id, None)
+
+    def status(self, job_id):
+        """Job state and progress; raises KeyError for unknown jobs"""
+        with self._lock:
+            row = self._connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown job: {job_id}")
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        job['progress'] = round(job['done_chunks'] / job['total_chunks'], 4) if job['total_chunks'] else 1.0
+        del job['owner_pid']
+        return job
+
+    def list_jobs(self, limit=50):
+        """Most recent jobs first"""
+        with self._lock:
+            ids = [row['id'] for row in self._connection.execute(
+                "SELECT id FROM jobs ORDER BY created DESC LIMIT ?", (limit,)).fetchall()]
+        return [self.status(job_id) for job_id in ids]
+
+    def results(self, job_id, offset=0, limit=None):
+        """
+        Columns of the leading run of finished chunks, in SKU order
+        Chunks finish out of order, so a running job only serves chunks 0..k-1
+        once all of them are done: rows never shift between polls, and
+        offset/limit page over a prefix that only grows.
+        """
+        job = self.status(job_id)
+        job_dir = os.path.join(self.directory, job_id)
+        finished = set(os.listdir(job_dir))
+        names = []
+        while f"chunk-{len(names):05d}.npz" in finished:
+            names.append(f"chunk-{len(names):05d}.npz")
+        parts = {}
+        rows = 0
+        stop = None if limit is None else offset + limit
+        for name in names:
+            with np.load(os.path.join(job_dir, name)) as chunk:
+                length = len(chunk['item_id'])
+                lo, hi = max(offset - rows, 0), length if stop is None else min(stop - rows, length)
+                if lo < hi:
+                    for key in chunk.files:
+                        values = chunk[key]
+                        parts.setdefault(key, []).append(values if key == 'date' else values[lo:hi])
+                rows += length
+        columns = {key: values[0] if key == 'date' else np.concatenate(values) for key, values in parts.items()}
+        return {'status': job['status'], 'progress': job['progress'], 'chunks_ready': len(names),
+                'rows_ready': rows, 'columns': columns}
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job from any process; returns the job status"""
+        self.status(job_id)
+        with self._lock:
+            for future in self._futures.pop(job_id, ()):
+                future.cancel()
+            with self._connection:
+                self._connection.execute(
+                    "UPDATE jobs SET status = 'cancelled', updated = ? WHERE id = ? AND status IN ('queued', 'running')",
+                    (time.time(), job_id))
+        return self.status(job_id)
+
+    def delete(self, job_id):
+        """Cancel a job and remove its state and result files"""
+        self.cancel(job_id)
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        shutil.rmtree(os.path.join(self.directory, job_id), ignore_errors=True)
+
+    def cleanup(self, retention=None):
+        """
+        Delete finished jobs last updated more than retention seconds ago (default
+        self.retention), and job directories whose job no longer exists; returns the deleted job IDs
+        """
+        cutoff = time.time() - (self.retention if retention is None else retention)
+        with self._lock:
+            expired = [row['id'] for row in self._connection.execute(
+                f"SELECT id FROM jobs WHERE status IN ({', '.join('?' * len(FINISHED))}) AND updated < ?",
+                (*FINISHED, cutoff)).fetchall()]
+            known = {row['id'] for row in self._connection.execute("SELECT id FROM jobs").fetchall()}
+        for job_id in expired:
+            self.delete(job_id)
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name not in known and os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+        return expired
+
+    def serve(self, poll_interval=0.5, cleanup_interval=300):
+        """Runner loop: start queued jobs and clean up expired ones until close() (or stop())"""
+        next_cleanup = 0
+        while not self._stop.is_set():
+            try:
+                self.run_pending()
+                if time.time() >= next_cleanup:
+                    self.cleanup()
+                    next_cleanup = time.time() + cleanup_interval
+            except sqlite3.Error as e:
+                print(f"⚠️  Job runner: {e}")
+            self._stop.wait(poll_interval)
+
+    def start_runner(self):
+        """Run serve() in a daemon thread of this process (single-process servers)"""
+        thread = threading.Thread(target=self.serve, name='job-runner', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+    def close(self):
+        """Stop this process's runner and workers; its unfinished jobs go back in the queue"""
+        self._stop.set()
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            self._futures.clear()
+            with self._connection:
+                self._connection.execute(
+                    "UPDATE jobs SET status = 'queued', owner_pid = NULL, updated = ?"
+                    " WHERE status = 'running' AND owner_pid = ?", (time.time(), os.getpid()))
+            self._connection.close()
+
+def run_runner(exit_with_parent=False):
+    """
+    Entry point of the runner process: serve until SIGTERM / SIGINT
+    exit_with_parent: also stop once the process that started it is gone
+    (gunicorn.conf.py starts the runner from the master)
+    """
+    queue = JobQueue.from_env()
+    signal.signal(signal.SIGTERM, lambda signum, frame: queue.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: queue.stop())
+    if exit_with_parent:
+        parent = os.getppid()
+        def watch():
+            while not queue._stop.wait(1):
+                if os.getppid() != parent:
+                    queue.stop()
+        threading.Thread(target=watch, name='parent-watch', daemon=True).start()
+    print(f"🧵 Job runner {os.getpid()}: {queue.directory} ({queue.max_workers} workers)")
+    try:
+        queue.serve()
+    finally:
+        queue.close()
+
+if __name__ == '__main__':
+    import sys
+    run_runner(exit_with_parent='--exit-with-parent' in sys.argv)
@@ -1,56 +1,232 @@
 """
 Main Application - Integrates all agents and provides API endpoints
+
+Heavy modules (NumPy, pandas and the agents built on them) are imported on
+first use, so importing this module and serving /api/health stays fast.
 """
-print("🚀 Initializing AI Supply Chain System...")
+import atexit
+import json
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Per-phase startup timings, reported by --profile-startup
+STARTUP_TIMINGS = []
+
+@contextmanager
+def startup_phase(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS.append((name, time.perf_counter() - start))
 
 # Import statements with error handling
 try:
-    from flask import Flask, jsonify, request
-    print("✅ Flask imported successfully")
+    with startup_phase("import flask"):
+        from flask import Flask, Response, g, jsonify, request
 except Exception as e:
     print(f"❌ Flask import error: {e}")
     exit(1)
 
-try:
-    from agents.supplier_agent import SupplierAgent
-    print("✅ SupplierAgent imported successfully")
-except Exception as e:
-    print(f"❌ SupplierAgent import error: {e}")
-    exit(1)
+from offload import BoundedExecutor, Overloaded
+from metrics import ERRORS, REGISTRY, REQUEST_LATENCY, REQUESTS, Profiler
 
-try:
-    from agents.inventory_agent import InventoryAgent
-    print("✅ InventoryAgent imported successfully")
-except Exception as e:
-    print(f"❌ InventoryAgent import error: {e}")
-    exit(1)
+# Initialize Flask app
+with startup_phase("create flask app"):
+    app = Flask(__name__)
 
-try:
-    from models.forecast_model import SimpleForecastModel
-    print("✅ SimpleForecastModel imported successfully")
-except Exception as e:
-    print(f"❌ SimpleForecastModel import error: {e}")
-    exit(1)
+# Bounded pool for CPU-heavy forecast and optimization work; full pool -> 503
+cpu_pool = BoundedExecutor(
+    max_workers=int(os.environ.get('SUPPLYCHAIN_CPU_WORKERS', 0)) or None,
+    max_queue=int(os.environ['SUPPLYCHAIN_CPU_QUEUE']) if 'SUPPLYCHAIN_CPU_QUEUE' in os.environ else None
+)
 
-# Initialize Flask app
-app = Flask(__name__)
-print("✅ Flask app created")
+# Forecast data ('date,demand', long-format 'date,sku,demand', or a demand store directory)
+FORECAST_DATA = os.environ.get('FORECAST_DATA', 'data/sample_data.csv')
 
-# Initialize agents
-supplier_agent = SupplierAgent()
-inventory_agent = InventoryAgent()
-forecast_model = SimpleForecastModel()
-print("✅ All agents initialized")
+# Agents are created on first use (or by warm_up) behind one lock
+_components = {}
+_components_lock = threading.RLock()
 
-# Load forecast data
-try:
-    success = forecast_model.load_data('data/sample_data.csv')
-    if success:
-        print("✅ Forecast data loaded successfully")
-    else:
-        print("⚠️  Warning: Could not load forecast data")
-except Exception as e:
-    print(f"⚠️  Warning: Forecast data loading issue: {e}")
+def get_supplier_agent():
+    with _components_lock:
+        if 'supplier_agent' not in _components:
+            with startup_phase("import agents.supplier_agent"):
+                from agents.supplier_agent import SupplierAgent
+            with startup_phase("init SupplierAgent"):
+                _components['supplier_agent'] = SupplierAgent()
+        return _components['supplier_agent']
+
+def create_inventory_store():
+    """SQLite store when INVENTORY_DB is set (persists across restarts), else a bounded in-memory store"""
+    from agents.inventory_store import MemoryInventoryStore, SQLiteInventoryStore
+    if os.environ.get('INVENTORY_DB'):
+        store = SQLiteInventoryStore(os.environ['INVENTORY_DB'],
+                                     batch_size=int(os.environ.get('INVENTORY_DB_BATCH', 1000)))
+        atexit.register(store.close)
+        return store
+    return MemoryInventoryStore(maxsize=int(os.environ.get('INVENTORY_MAX_ITEMS', 100_000)) or None)
+
+def get_inventory_agent():
+    with _components_lock:
+        if 'inventory_agent' not in _components:
+            with startup_phase("import agents.inventory_agent"):
+                from agents.inventory_agent import InventoryAgent
+            with startup_phase("init InventoryAgent"):
+                _components['inventory_agent'] = InventoryAgent(store=create_inventory_store())
+        return _components['inventory_agent']
+
+def get_forecast_model():
+    """The forecast model, with FORECAST_DATA loaded on first use"""
+    with _components_lock:
+        if 'forecast_model' not in _components:
+            with startup_phase("import models.forecast_model"):
+                from models.forecast_model import SimpleForecastModel
+            with startup_phase("init SimpleForecastModel"):
+                model = SimpleForecastModel(
+                    cache_size=int(os.environ.get('FORECAST_CACHE_SIZE', 256)),
+                    cache_ttl=float(os.environ.get('FORECAST_CACHE_TTL', 300))
+                )
+            with startup_phase("load forecast data"):
+                try:
+                    if not model.load_data(FORECAST_DATA):
+                        print("⚠️  Warning: Could not load forecast data")
+                except Exception as e:
+                    print(f"⚠️  Warning: Forecast data loading issue: {e}")
+            _components['forecast_model'] = model
+        return _components['forecast_model']
+
+def get_planning_agent():
+    """Planning agent over the shared components (it holds no state of its own)"""
+    from agents.planning_agent import PlanningAgent
+    return PlanningAgent(get_forecast_model(), get_supplier_agent(), get_inventory_agent())
+
+_job_queue = None
+
+def get_job_queue():
+    """
+    Background job queue, created on first use in the serving process
+    Jobs run in this process's runner thread unless SUPPLYCHAIN_JOB_RUNNER=external,
+    where a separate runner (gunicorn.conf.py, or `python job_queue.py`) runs them
+    """
+    global _job_queue
+    with _components_lock:
+        if _job_queue is None:
+            from job_queue import JobQueue
+            _job_queue = JobQueue.from_env()
+            if os.environ.get('SUPPLYCHAIN_JOB_RUNNER', 'thread') != 'external':
+                _job_queue.start_runner()
+            atexit.register(_job_queue.close)
+        return _job_queue
+
+def __getattr__(name):
+    """Lazy module attributes: main.supplier_agent, main.inventory_agent, main.forecast_model"""
+    accessors = {
+        'supplier_agent': get_supplier_agent,
+        'inventory_agent': get_inventory_agent,
+        'forecast_model': get_forecast_model
+    }
+    if name in accessors:
+        return accessors[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def warm_up():
+    """Build every agent and load forecast data now"""
+    get_supplier_agent()
+    get_inventory_agent()
+    get_forecast_model()
+
+_warm_up_started = False
+
+def create_app(warm_up_mode=None):
+    """
+    App factory: start loading agents and forecast data, return the Flask app
+    warm_up_mode (default SUPPLYCHAIN_WARMUP or 'background'):
+      'eager'      - load before returning; production servers do this in the
+                     master before forking (see wsgi.py) so workers share the state
+      'background' - load in a daemon thread; /api/health answers immediately
+      'lazy'       - load on the first request that needs it
+    """
+    global _warm_up_started
+    mode = warm_up_mode or os.environ.get('SUPPLYCHAIN_WARMUP', 'background')
+    if not _warm_up_started:
+        _warm_up_started = True
+        if mode == 'eager':
+            warm_up()
+        elif mode == 'background':
+            threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
+    return app
+
+def print_startup_profile():
+    print("⏱️  Startup profile:")
+    for name, seconds in STARTUP_TIMINGS:
+        print(f"   {name:<32} {seconds * 1000:8.1f} ms")
+    print(f"   {'total':<32} {sum(seconds for _, seconds in STARTUP_TIMINGS) * 1000:8.1f} ms")
+
+# Opt-in cProfile sampling: share of requests profiled (0 = off), see /api/metrics/profile
+profiler = Profiler(float(os.environ.get('SUPPLYCHAIN_PROFILE_SAMPLE', 0)))
+
+CPU_POOL_STATS = REGISTRY.gauge('supplychain_cpu_pool', 'CPU offload pool state', ('stat',))
+FORECAST_CACHE_STATS = REGISTRY.gauge('supplychain_forecast_cache', 'Forecast cache counters', ('stat',))
+
+# Multi-process servers: merge every worker's metrics on each scrape (see Registry.share)
+if os.environ.get('SUPPLYCHAIN_METRICS_DIR'):
+    REGISTRY.share(os.environ['SUPPLYCHAIN_METRICS_DIR'])
+
+@REGISTRY.collector
+def collect_component_stats():
+    for stat, value in cpu_pool.stats().items():
+        CPU_POOL_STATS.set(stat, value=value)
+    # Read the forecast model only if it is loaded; a scrape must not trigger loading
+    model = _components.get('forecast_model')
+    if model is not None:
+        for stat, value in model.cache_stats().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                FORECAST_CACHE_STATS.set(stat, value=value)
+
+@app.before_request
+def start_request_timer():
+    # First request in a forked worker: drop the inherited values before anything is recorded
+    REGISTRY.start_writer()
+    g.request_start = time.perf_counter()
+    # Scrapes and profile reads are not worth profiling
+    g.profile = None if request.path.startswith('/api/metrics') else profiler.start()
+
+@app.after_request
+def record_request(response):
+    if g.get('profile') is not None:
+        profiler.stop(g.profile)
+        g.profile = None
+    # Route templates, not raw paths, keep label cardinality bounded
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    REQUEST_LATENCY.observe(time.perf_counter() - g.request_start, request.method, route)
+    REQUESTS.inc(request.method, route, str(response.status_code))
+    if response.status_code >= 400:
+        ERRORS.inc(request.method, route, str(response.status_code))
+    return response
+
+def overloaded_response(error):
+    return jsonify({"error": str(error)}), 503, {"Retry-After": "1"}
+
+def number_field(data, field, default=None):
+    """A finite number from a JSON body (numeric strings accepted); ValueError otherwise"""
+    value = data.get(field, default)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{field} must be a number, got {value!r}")
+    try:
+        number = float(value) if isinstance(value, str) else value
+    except ValueError:
+        raise ValueError(f"{field} must be a number, got {value!r}")
+    if not math.isfinite(number):
+        raise ValueError(f"{field} must be finite, got {value!r}")
+    return number
 
 # API Routes
 @app.route('/', methods=['GET'])
@@ -62,8 +238,20 @@ def home():
         "endpoints": [
             "/api/health",
             "/api/suppliers",
+            "/api/suppliers/pareto",
             "/api/inventory/optimize",
-            "/api/forecast"
+            "/api/inventory/optimize/batch",
+            "/api/inventory/check/batch",
+            "/api/inventory/summary",
+            "/api/inventory/service-levels",
+            "/api/inventory/reorder-points",
+            "/api/inventory/simulate",
+            "/api/plan",
+            "/api/jobs",
+            "/api/metrics",
+            "/api/forecast",
+            "/api/forecast/observations",
+            "/api/forecast/cache"
         ]
     })
 
@@ -71,10 +259,16 @@ def home():
 def get_suppliers():
     try:
         priority = request.args.get('priority', 'balanced')
-        ranked_suppliers = supplier_agent.evaluate_suppliers(priority)
+        top_k = request.args.get('top_k', type=int)
+        weights = request.args.get('weights')
+        filters = [spec for value in request.args.getlist('filter') for spec in value.split(',') if spec]
+        ranked_suppliers = get_supplier_agent().evaluate_suppliers(
+            priority, top_k=top_k, weights=weights, filters=filters or None)
         
         return jsonify({
             "priority": priority,
+            "weights": weights,
+            "filters": filters,
             "ranked_suppliers": [
                 {
                     "id": supplier_id,
@@ -84,11 +278,37 @@ def get_suppliers():
                 for supplier_id, data in ranked_suppliers
             ]
         })
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/suppliers/pareto', methods=['GET'])
+def get_supplier_pareto_front():
+    try:
+        criteria = request.args.get('criteria', 'cost,quality,lead_time')
+        filters = [spec for value in request.args.getlist('filter') for spec in value.split(',') if spec]
+        front = get_supplier_agent().pareto_front(criteria, filters=filters or None)
+        
+        return jsonify({
+            "criteria": criteria.split(','),
+            "filters": filters,
+            "count": len(front),
+            "pareto_front": [
+                {
+                    "id": supplier_id,
+                    "details": details
+                }
+                for supplier_id, details in front
+            ]
+        })
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/inventory/optimize', methods=['POST'])
-def optimize_inventory():
+async def optimize_inventory():
     try:
         data = request.get_json()
         
@@ -97,39 +317,454 @@ def optimize_inventory():
             
         required_fields = ['item_id', 'annual_demand', 'ordering_cost', 'holding_cost']
         for field in required_fields:
-            if field not in data:
+            if data.get(field) is None:
                 return jsonify({"error": f"Missing required field: {field}"}), 400
         
-        result = inventory_agent.optimize_inventory(
+        # Convert before offloading: a string here would fail deep in the math as a TypeError
+        result = await cpu_pool.run(
+            get_inventory_agent().optimize_inventory,
             item_id=data['item_id'],
+            annual_demand=number_field(data, 'annual_demand'),
+            ordering_cost=number_field(data, 'ordering_cost'),
+            holding_cost_per_unit=number_field(data, 'holding_cost'),
+            lead_time_days=number_field(data, 'lead_time', 7),
+            daily_std_dev=number_field(data, 'daily_std_dev', 5),
+            service_level=number_field(data, 'service_level')
+        )
+        
+        return jsonify({
+            "status": "success",
+            "optimization_result": result
+        })
+    
+    except Overloaded as e:
+        return overloaded_response(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/inventory/optimize/batch', methods=['POST'])
+async def optimize_inventory_batch():
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({"error": "No JSON data provided"}), 400
+            
+        required_fields = ['item_id', 'annual_demand', 'ordering_cost', 'holding_cost']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({"error": f"Missing required field: {field}"}), 400
+        
+        result = await cpu_pool.run(
+            get_inventory_agent().optimize_batch,
+            item_ids=data['item_id'],
             annual_demand=data['annual_demand'],
             ordering_cost=data['ordering_cost'],
             holding_cost_per_unit=data['holding_cost'],
             lead_time_days=data.get('lead_time', 7),
-            daily_std_dev=data.get('daily_std_dev', 5)
+            daily_std_dev=data.get('daily_std_dev', 5),
+            service_level=data.get('service_level')
         )
         
         return jsonify({
             "status": "success",
-            "optimization_result": result
+            "count": len(result['item_id']),
+            "optimization_result": {
+                key: value if isinstance(value, list) else value.tolist()
+                for key, value in result.items()
+            }
+        })
+    
+    except Overloaded as e:
+        return overloaded_response(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/inventory/check/batch', methods=['POST'])
+async def check_inventory_batch():
+    try:
+        # /api/erp/inventory mapping, columnar {item_id, available}, a list of records,
+        # or no body to check the latest ERP snapshot
+        stock = request.get_json(silent=True) or None
+        only_reorder = request.args.get('only_reorder', 'false').lower() in ('1', 'true', 'yes')
+        
+        result = await cpu_pool.run(get_inventory_agent().check_reorder_batch, stock, only_reorder=only_reorder)
+        
+        columns = {
+            key: value if isinstance(value, list) else
+                 [item if not isinstance(item, float) or math.isfinite(item) else None for item in value.tolist()]
+            for key, value in result.items()
+        }
+        return jsonify({
+            "status": "success",
+            "count": len(result['item_id']),
+            "needs_reorder": int(sum(status in ('stockout', 'reorder') for status in columns['status'])),
+            "decisions": columns
         })
     
+    except Overloaded as e:
+        return overloaded_response(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/inventory/summary', methods=['GET'])
+def get_inventory_summary():
+    try:
+        offset = max(request.args.get('offset', default=0, type=int), 0)
+        limit = min(max(request.args.get('limit', default=100, type=int), 0), 1000)
+        # Keyset paging: pass the previous page's next_after back as ?after=
+        after = request.args.get('after')
+        agent = get_inventory_agent()
+        items = agent.get_inventory_summary(offset, limit, after=after)
+        
+        return jsonify({
+            "offset": offset,
+            "limit": limit,
+            "after": after,
+            "next_after": next(reversed(items)) if limit and len(items) == limit else None,
+            "store": agent.inventory_levels.stats(),
+            "items": items
+        })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/inventory/service-levels', methods=['POST'])
+async def optimize_service_levels():
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({"error": "No JSON data provided"}), 400
+            
+        required_fields = ['item_id', 'annual_demand', 'holding_cost', 'stockout_penalty']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({"error": f"Missing required field: {field}"}), 400
+        
+        result = await cpu_pool.run(
+            get_inventory_agent().optimize_service_levels,
+            item_ids=data['item_id'],
+            annual_demand=data['annual_demand'],
+            holding_cost_per_unit=data['holding_cost'],
+            stockout_penalty=data['stockout_penalty'],
+            ordering_cost=data.get('ordering_cost'),
+            order_quantity=data.get('order_quantity'),
+            lead_time_days=data.get('lead_time', 7),
+            daily_std_dev=data.get('daily_std_dev', 5),
+            service_levels=data.get('service_levels')
+        )
+        
+        return jsonify({
+            "status": "success",
+            "count": len(result['item_id']),
+            "service_level_result": {
+                key: value if isinstance(value, list) else value.tolist()
+                for key, value in result.items()
+            }
+        })
+    
+    except Overloaded as e:
+        return overloaded_response(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def forecast_reorder_points(skus, lead_times, service_level, method):
+    """Quantile forecast over the longest lead time, then quantile-based safety stock"""
+    horizon = int(max(lead_times) if isinstance(lead_times, list) else lead_times)
+    forecast = get_forecast_model().get_forecast(method, periods=max(horizon, 1), skus=skus,
+                                                 quantiles=(service_level,))
+    return get_inventory_agent().reorder_points_from_quantiles(
+        forecast['skus'], forecast['forecast'], next(iter(forecast['quantiles'].values())), lead_times)
+
+@app.route('/api/inventory/reorder-points', methods=['POST'])
+async def quantile_reorder_points():
+    try:
+        data = request.get_json()
+        
+        if not data or 'item_id' not in data:
+            return jsonify({"error": "Missing required field: item_id"}), 400
+        
+        skus = [data['item_id']] if isinstance(data['item_id'], str) else data['item_id']
+        result = await cpu_pool.run(
+            forecast_reorder_points,
+            skus,
+            data.get('lead_time', 7),
+            float(data.get('service_level', 0.95)),
+            data.get('method', 'moving_average')
+        )
+        
+        return jsonify({
+            "status": "success",
+            "count": len(result['item_id']),
+            "reorder_points": {
+                key: value if isinstance(value, list) else value.tolist()
+                for key, value in result.items()
+            }
+        })
+    
+    except Overloaded as e:
+        return overloaded_response(e)
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/inventory/simulate', methods=['POST'])
+async def simulate_inventory():
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({"error": "No JSON data provided"}), 400
+        
+        # One item at the top level, or a list under 'items'
+        items = data.get('items', [data])
+        if not items or any('item_id' not in item for item in items):
+            return jsonify({"error": "Missing required field: item_id"}), 400
+        paths = min(int(data.get('paths', 1000)), 10000)
+        days = min(int(data.get('days', 365)), 730)
+        if len(items) * paths * days > 20_000_000:
+            return jsonify({"error": "Simulation too large: items x paths x days must be at most 20,000,000"}), 400
+        
+        result = await cpu_pool.run(
+            get_inventory_agent().simulate_forecast,
+            get_forecast_model(),
+            items,
+            n_paths=paths,
+            days=days,
+            method=data.get('method', 'moving_average'),
+            seed=data.get('seed')
+        )
+        
+        return jsonify({
+            "status": "success",
+            "paths": paths,
+            "days": days,
+            "simulation_result": [
+                {key: value[i] if isinstance(value, list) else value[i].item() for key, value in result.items()}
+                for i in range(len(items))
+            ]
+        })
+    
+    except Overloaded as e:
+        return overloaded_response(e)
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/plan', methods=['POST'])
+def plan_replenishment():
+    """
+    Forecast → best supplier → EOQ/ROP for many SKUs, streamed as NDJSON
+    One JSON plan per line, written block by block as each block of SKUs is
+    finished; a failure after streaming has started ends the stream with an
+    {"error": ...} line.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        skus = data.get('skus')
+        if isinstance(skus, str):
+            skus = [sku for sku in skus.split(',') if sku]
+        block_size = min(max(int(data.get('block_size', 1000)), 1), 10000)
+        params = {
+            'method': data.get('method', 'moving_average'),
+            'ordering_cost': float(data.get('ordering_cost', 50)),
+            'holding_cost': float(data.get('holding_cost', 2)),
+            'service_level': data.get('service_level'),
+            'store': bool(data.get('store', True))
+        }
+        
+        agent = get_planning_agent()
+        supplier = agent.choose_supplier(data.get('priority', 'balanced'), data.get('weights'), data.get('filters'))
+        trend = cpu_pool.submit(agent.trend_statistics, skus).result()
+    
+    except Overloaded as e:
+        return overloaded_response(e)
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    
+    def generate():
+        try:
+            for start, block in agent.blocks(trend, block_size):
+                skus = trend['skus'][start:start + block_size]
+                result = cpu_pool.submit(agent.plan_block, skus, supplier, block, **params).result()
+                lines = [json.dumps(row, separators=(',', ':')) for row in agent.rows(result)]
+                yield '\n'.join(lines) + '\n'
+        except Exception as e:
+            yield json.dumps({"error": str(e)}) + '\n'
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """
+    Queue a catalog-wide plan or forecast; answers 202 with the job ID
+    Body: kind ('plan' or 'forecast'), optional skus (default: whole catalog),
+    chunk_size, and the /api/plan or /api/forecast parameters
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        kind = data.get('kind', 'plan')
+        skus = data.get('skus')
+        if isinstance(skus, str):
+            skus = [sku for sku in skus.split(',') if sku]
+        
+        labels = get_forecast_model().get_trend_skus(skus)['skus']
+        if kind == 'plan':
+            supplier = get_planning_agent().choose_supplier(
+                data.get('priority', 'balanced'), data.get('weights'), data.get('filters'))
+            params = {
+                'supplier': supplier,
+                'method': data.get('method', 'moving_average'),
+                'ordering_cost': float(data.get('ordering_cost', 50)),
+                'holding_cost': float(data.get('holding_cost', 2)),
+                'service_level': data.get('service_level')
+            }
+        else:
+            params = {
+                'method': data.get('method', 'moving_average'),
+                'window': int(data.get('window', 7)),
+                'periods': min(max(int(data.get('periods', 30)), 1), 365),
+                'quantiles': [float(q) for q in data.get('quantiles', (0.1, 0.5, 0.9))]
+            }
+        
+        job_id = get_job_queue().submit(kind, labels, params, chunk_size=data.get('chunk_size'))
+        return jsonify({
+            "status": "accepted",
+            "job_id": job_id,
+            "status_url": f"/api/jobs/{job_id}",
+            "results_url": f"/api/jobs/{job_id}/results"
+        }), 202
+    
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 1000)
+        return jsonify({"jobs": get_job_queue().list_jobs(limit)})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    try:
+        return jsonify(get_job_queue().status(job_id))
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a job; with ?purge=true also delete its state and result files"""
+    try:
+        if request.args.get('purge', 'false').lower() in ('1', 'true', 'yes'):
+            get_job_queue().delete(job_id)
+            return jsonify({"id": job_id, "status": "deleted"})
+        return jsonify(get_job_queue().cancel(job_id))
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+
+@app.route('/api/jobs/<job_id>/results', methods=['GET'])
+def get_job_results(job_id):
+    """Rows of the leading finished chunks, paginated with offset / limit (at most 10000)"""
+    try:
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = min(max(int(request.args.get('limit', 1000)), 1), 10000)
+        result = get_job_queue().results(job_id, offset, limit)
+        result['offset'] = offset
+        result['columns'] = {
+            key: [item if not isinstance(item, float) or math.isfinite(item) else None for item in value.tolist()]
+            for key, value in result['columns'].items()
+        }
+        return jsonify(result)
+    
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def forecast_with_trend(method, periods, skus=None, quantiles=(0.1, 0.5, 0.9)):
+    """Forecast plus trend analysis in one pool task"""
+    model = get_forecast_model()
+    if skus:
+        return (model.get_forecast(method, periods=periods, skus=skus, quantiles=quantiles),
+                model.get_trend_skus(skus))
+    return model.get_forecast(method, periods=periods, quantiles=quantiles), model.get_trend_analysis()
+
+def query_quantiles():
+    """quantiles query param, e.g. ?quantiles=0.1,0.5,0.9"""
+    values = request.args.get('quantiles', '0.1,0.5,0.9')
+    try:
+        return tuple(float(value) for value in values.split(',') if value)
+    except ValueError:
+        raise ValueError(f"Invalid quantiles: {values}")
+
 @app.route('/api/forecast', methods=['GET'])
-def get_forecast():
+async def get_forecast():
     try:
         method = request.args.get('method', 'moving_average')
         periods = request.args.get('periods', default=30, type=int)
+        if periods < 1:
+            return jsonify({"error": "periods must be at least 1"}), 400
         periods = min(periods, 90)  # Limit to 90 days
+        skus = [sku for value in request.args.getlist('sku') for sku in value.split(',') if sku]
+        quantiles = query_quantiles()
         
-        if method == 'seasonal' and forecast_model.data is not None:
-            forecast = forecast_model.seasonal_forecast(periods)
-        else:
-            forecast = forecast_model.moving_average_forecast(periods=periods)
+        if skus:
+            forecast, trend = await cpu_pool.run(forecast_with_trend, method, periods, skus, quantiles)
+            return jsonify({
+                "method": method,
+                "periods": periods,
+                "forecasts": [
+                    {
+                        "sku": sku,
+                        "forecast": [
+                            {
+                                "date": date,
+                                "predicted_demand": int(forecast_val),
+                                "confidence_lower": int(lower),
+                                "confidence_upper": int(upper),
+                                "quantiles": {label: int(band[i][day]) for label, band in forecast['quantiles'].items()}
+                            }
+                            for day, (date, forecast_val, lower, upper) in
+                            enumerate(zip(forecast['dates'], values, lower_values, upper_values))
+                        ],
+                        "trend_analysis": {
+                            key: trend[key][i] if key == 'trend' else trend[key][i].item()
+                            for key in trend if key != 'skus'
+                        }
+                    }
+                    for i, (sku, values, lower_values, upper_values) in
+                    enumerate(zip(forecast['skus'], forecast['forecast'],
+                                  forecast['confidence_lower'], forecast['confidence_upper']))
+                ]
+            })
         
-        trend = forecast_model.get_trend_analysis()
+        forecast, trend = await cpu_pool.run(forecast_with_trend, method, periods, None, quantiles)
         
         return jsonify({
             "method": method,
@@ -139,47 +774,117 @@ def get_forecast():
                     "date": date,
                     "predicted_demand": forecast_val,
                     "confidence_lower": lower,
-                    "confidence_upper": upper
+                    "confidence_upper": upper,
+                    "quantiles": {label: band[day] for label, band in forecast['quantiles'].items()}
                 }
-                for date, forecast_val, lower, upper in 
-                zip(forecast['dates'], forecast['forecast'], 
-                    forecast['confidence_lower'], forecast['confidence_upper'])
+                for day, (date, forecast_val, lower, upper) in 
+                enumerate(zip(forecast['dates'], forecast['forecast'], 
+                              forecast['confidence_lower'], forecast['confidence_upper']))
             ],
             "trend_analysis": trend
         })
     
+    except Overloaded as e:
+        return overloaded_response(e)
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/forecast/observations', methods=['POST'])
+def append_forecast_observations():
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({"error": "No JSON data provided"}), 400
+        
+        observations = data.get('observations', []) if isinstance(data, dict) else data
+        appended = get_forecast_model().append_observations(observations)
+        
+        return jsonify({
+            "status": "success",
+            "appended": appended,
+            "data_version": get_forecast_model().data_version
+        })
+    
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/forecast/cache', methods=['GET'])
+def get_forecast_cache_stats():
+    return jsonify(get_forecast_model().cache_stats())
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Request, hot-path and pool metrics in the Prometheus text format"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/metrics/profile', methods=['GET'])
+def get_metrics_profile():
+    """Aggregated cProfile output of sampled requests (enable with SUPPLYCHAIN_PROFILE_SAMPLE)"""
+    sort = request.args.get('sort', 'cumulative')
+    if sort not in ('cumulative', 'tottime', 'calls', 'ncalls'):
+        return jsonify({"error": f"Invalid sort: {sort}"}), 400
+    limit = min(max(request.args.get('limit', 30, type=int), 1), 500)
+    report = profiler.report(sort, limit)
+    if request.args.get('reset', 'false').lower() in ('1', 'true', 'yes'):
+        profiler.reset()
+    return Response(report, mimetype='text/plain')
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({
         "status": "healthy",
         "system": "AI Supply Chain Optimization",
-        "timestamp": "now"
+        "ready": len(_components) == 3,
+        "timestamp": datetime.now(timezone.utc).isoformat()
     })
 
 # This is crucial - it tells Python what to do when run directly
 if __name__ == '__main__':
+    if '--profile-startup' in sys.argv:
+        warm_up()
+        print_startup_profile()
+        sys.exit(0)
+
     print("=" * 60)
     print("🚀 AI Supply Chain Optimization System Starting...")
     print("=" * 60)
-    print("✅ System Components:")
-    print("   - Supplier Agent: Active")
-    print("   - Inventory Agent: Active")
-    print("   - Forecast Model: Active")
+    print("✅ System Components (loading in the background):")
+    print("   - Supplier Agent")
+    print("   - Inventory Agent")
+    print("   - Forecast Model")
     print("\n🌐 Available API Endpoints:")
     print("   GET  /                     - System info")
     print("   GET  /api/health           - Health check")
     print("   GET  /api/suppliers        - Supplier evaluation")
+    print("   GET  /api/suppliers/pareto - Pareto-efficient suppliers")
     print("   POST /api/inventory/optimize - Inventory optimization")
+    print("   POST /api/inventory/optimize/batch - Batch inventory optimization")
+    print("   POST /api/inventory/check/batch - Bulk reorder decisions for a stock snapshot")
+    print("   GET  /api/inventory/summary - Paginated optimization results")
+    print("   POST /api/inventory/service-levels - Cost-minimizing service level per item")
+    print("   POST /api/inventory/reorder-points - Safety stock from forecast quantiles")
+    print("   POST /api/inventory/simulate - Monte Carlo (ROP, EOQ) policy simulation")
+    print("   POST /api/plan - Forecast → supplier → EOQ/ROP plan per SKU (NDJSON stream)")
+    print("   POST /api/jobs - Background catalog plan/forecast job (poll /api/jobs/<id>)")
+    print("   GET  /api/metrics      - Prometheus metrics (per-route latency, hot paths)")
     print("   GET  /api/forecast         - Demand forecasting")
+    print("   POST /api/forecast/observations - Stream new demand observations")
+    print("   GET  /api/forecast/cache   - Forecast cache hit/miss counters")
     print("\n🔧 Starting server on http://127.0.0.1:5000")
     print("💡 Press Ctrl+C to stop the server")
     print("=" * 60)
     
-    # Start the Flask server
+    # Start the Flask development server (production: gunicorn -c gunicorn.conf.py wsgi:app)
     try:
-        app.run(host='127.0.0.1', port=5000, debug=True)
+        create_app().run(host='127.0.0.1', port=5000, debug=True, threaded=True)
     except Exception as e:
         print(f"❌ Server failed to start: {e}")
\ No newline at end of file
@@ -0,0 +1,362 @@
+"""
+Metrics - In-process counters and latency histograms in Prometheus text format
+
+    REQUESTS / ERRORS / REQUEST_LATENCY   per-route HTTP metrics (recorded by main.py)
+    HOT_PATHS                             inner hot paths, timed with `with timed('eoq'):`
+    Profiler                              opt-in cProfile sampling of whole requests
+
+Recording is a perf_counter pair, a bisect and a few additions under a lock,
+cheap enough for per-call hot paths. Each process keeps its own registry; with
+Registry.share(directory) every process also writes a snapshot there once a
+second and a scrape from any process merges all of them (see share()).
+"""
+import atexit
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds in seconds, from sub-millisecond scoring to multi-second catalog loads
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def blank(self, extra_labels=()):
+        """An unregistered, empty metric with the same name and labels (plus extra_labels)"""
+        return type(self)(self.name, self.help, self.labelnames + tuple(extra_labels))
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(labels), value] for labels, value in self._values.items()]
+
+    def merge(self, snapshot, extra=()):
+        """Add another process's snapshot (extra: values for the extra labels)"""
+        with self._lock:
+            for labels, value in snapshot:
+                key = tuple(labels) + tuple(extra)
+                self._values[key] = self._values.get(key, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_labels(self.labelnames, labels)} {value}" for labels, value in values)
+        return lines
+
+class Gauge(Counter):
+    def set(self, *labels, value):
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+class Histogram:
+    """Fixed-bucket histogram per label set; buckets are upper bounds in seconds"""
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (last slot: above every bound), sum, count
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def blank(self, extra_labels=()):
+        return Histogram(self.name, self.help, self.labelnames + tuple(extra_labels), self.buckets)
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(labels), list(counts), total, count]
+                    for labels, (counts, total, count) in self._series.items()]
+
+    def merge(self, snapshot, extra=()):
+        with self._lock:
+            for labels, counts, total, count in snapshot:
+                key = tuple(labels) + tuple(extra)
+                series = self._series.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+                series[0] = [a + b for a, b in zip(series[0], counts)]
+                series[1] += total
+                series[2] += count
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        with self._lock:
+            snapshot = sorted((labels, (list(counts), total, count))
+                              for labels, (counts, total, count) in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in snapshot:
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts):
+                cumulative += bucket
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', '+Inf')])} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {round(total, 6)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self.directory = None
+        self.interval = 1.0
+        # Process whose activity the values describe; a forked child starts over
+        self._pid = os.getpid()
+        self._writer_pid = None
+        self._writer_lock = threading.Lock()
+        self._written = None
+
+    def counter(self, name, help, labelnames=()):
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, function):
+        """Register function() to refresh gauges before every render and snapshot"""
+        self._collectors.append(function)
+        return function
+
+    def collect(self):
+        for function in self._collectors:
+            function()
+
+    def share(self, directory, interval=1.0):
+        """
+        Aggregate metrics across processes (e.g. gunicorn workers) through a directory
+        Each process writes metrics-<pid>.json every interval seconds and at exit
+        (start_writer starts that in each worker); render() merges every snapshot:
+        counters and histograms are summed, keeping the totals of exited workers,
+        and gauges of live processes get a pid label. Clear the directory when
+        the server starts (gunicorn.conf.py does) so old runs are not counted.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.interval = interval
+
+    def start_writer(self):
+        """Start this process's snapshot writer; cheap no-op once running or when not shared"""
+        pid = os.getpid()
+        if self.directory is None or self._writer_pid == pid:
+            return
+        with self._writer_lock:
+            if self._writer_pid == pid:
+                return
+            if self._pid != pid:
+                # Forked worker: start from zero rather than count the parent's values once per worker
+                for metric in self._metrics:
+                    metric.reset()
+                self._pid = pid
+                self._written = None
+            self._writer_pid = pid
+            threading.Thread(target=self._write_loop, name='metrics-writer', daemon=True).start()
+            atexit.register(self.write)
+
+    def _write_loop(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.write()
+            except OSError:
+                pass
+
+    def write(self):
+        """Write this process's snapshot to the shared directory (skipped when unchanged)"""
+        if self.directory is None or self._pid != os.getpid():
+            return
+        self.collect()
+        data = json.dumps({'pid': self._pid, 'metrics': {metric.name: metric.snapshot() for metric in self._metrics}})
+        if data == self._written:
+            return
+        # Write then rename, so a scrape never reads a half-written snapshot
+        path = os.path.join(self.directory, f"metrics-{self._pid}.json")
+        partial = f"{path}.partial"
+        with open(partial, 'w') as out:
+            out.write(data)
+        os.replace(partial, path)
+        self._written = data
+
+    def _merged(self):
+        """Fresh metrics holding the sum of every process's snapshot"""
+        self.write()
+        merged = {metric.name: metric.blank(('pid',) if isinstance(metric, Gauge) else ())
+                  for metric in self._metrics}
+        for name in os.listdir(self.directory):
+            if not (name.startswith('metrics-') and name.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as snapshot:
+                    data = json.load(snapshot)
+            except (OSError, ValueError):
+                continue
+            alive = _pid_alive(data['pid'])
+            for metric_name, values in data['metrics'].items():
+                metric = merged.get(metric_name)
+                if metric is None:
+                    continue
+                if isinstance(metric, Gauge):
+                    # Point-in-time state: only meaningful while the process lives
+                    if alive:
+                        metric.merge(values, (data['pid'],))
+                else:
+                    metric.merge(values)
+        return list(merged.values())
+
+    def render(self):
+        """Every metric in the Prometheus text exposition format (merged across processes when shared)"""
+        if self.directory is None:
+            self.collect()
+            metrics = self._metrics
+        else:
+            metrics = self._merged()
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+def _pid_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except (ProcessLookupError, PermissionError):
+        return False
+    return True
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.counter(
+    'supplychain_http_requests_total', 'HTTP requests by route and status', ('method', 'route', 'status'))
+ERRORS = REGISTRY.counter(
+    'supplychain_http_errors_total', 'HTTP responses with a 4xx or 5xx status', ('method', 'route', 'status'))
+REQUEST_LATENCY = REGISTRY.histogram(
+    'supplychain_http_request_duration_seconds', 'Time to produce a response (streams: time to first byte)',
+    ('method', 'route'))
+HOT_PATHS = REGISTRY.histogram(
+    'supplychain_hot_path_duration_seconds', 'Time spent in instrumented inner hot paths', ('path',))
+
+class timed:
+    """
+    Time a block into HOT_PATHS:
+        with timed('eoq'):
+            ...
+    """
+    __slots__ = ('path', 'start')
+
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        HOT_PATHS.observe(time.perf_counter() - self.start, self.path)
+        return False
+
+class Profiler:
+    """
+    cProfile sampling of whole requests
+    start() profiles the calling thread with probability sample_rate (one
+    request at a time); stop() folds the profile into the aggregate that
+    report() prints. Only the request thread is profiled: work handed to
+    the CPU pool shows up as time waiting on its future.
+    """
+    def __init__(self, sample_rate=0.0):
+        self.sample_rate = sample_rate
+        self.samples = 0
+        self._stats = None
+        self._active = threading.Lock()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """A running cProfile.Profile if this request is sampled, else None"""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return None
+        if not self._active.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger) owns the hook
+            self._active.release()
+            return None
+        return profile
+
+    def stop(self, profile):
+        profile.disable()
+        self._active.release()
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            self.samples += 1
+
+    def report(self, sort='cumulative', limit=30):
+        """Aggregated profile of the sampled requests as pstats text"""
+        with self._lock:
+            if self._stats is None:
+                return f"No sampled requests (sample rate {self.sample_rate})\n"
+            out = io.StringIO()
+            self._stats.stream = out
+            out.write(f"{self.samples} sampled requests (sample rate {self.sample_rate})\n")
+            self._stats.sort_stats(sort).print_stats(limit)
+            return out.getvalue()
+
+    def reset(self):
+        with self._lock:
+            self._stats = None
+            self.samples = 0
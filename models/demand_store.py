@@ -0,0 +1,74 @@
+"""
+Demand Store - Columnar binary storage for historical demand
+
+A store is a directory of NumPy files that can be memory-mapped, so several
+worker processes share one page-cached copy of the history:
+    dates.npy   int64 days since 1970-01-01, one per row
+    demand.npy  float32 matrix, rows=dates, columns=SKUs (NaN = no observation)
+    meta.json   format version and SKU labels (null for a single series)
+"""
+import json
+import os
+import numpy as np
+import pandas as pd
+
+STORE_FORMAT = 1
+
+def write_store(path, dates, demand, skus=None):
+    """Write a dates x SKUs demand matrix to a store directory"""
+    demand = np.asarray(demand, dtype=np.float32)
+    if demand.ndim == 1:
+        demand = demand[:, None]
+    if len(dates) != demand.shape[0]:
+        raise ValueError("dates and demand must have the same number of rows")
+
+    os.makedirs(path, exist_ok=True)
+    epoch_days = pd.DatetimeIndex(dates).values.astype('datetime64[D]').astype(np.int64)
+    np.save(os.path.join(path, 'dates.npy'), epoch_days)
+    np.save(os.path.join(path, 'demand.npy'), np.ascontiguousarray(demand))
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump({
+            'format': STORE_FORMAT,
+            'skus': None if skus is None else [str(sku) for sku in skus]
+        }, f)
+
+def read_store(path, mmap=True):
+    """
+    Open a store directory
+    Returns (dates, demand, skus); demand is a read-only memory map unless mmap=False
+    """
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    if meta.get('format') != STORE_FORMAT:
+        raise ValueError(f"Unsupported demand store format: {meta.get('format')}")
+
+    epoch_days = np.load(os.path.join(path, 'dates.npy'))
+    demand = np.load(os.path.join(path, 'demand.npy'), mmap_mode='r' if mmap else None)
+    dates = pd.DatetimeIndex(epoch_days.astype('datetime64[D]'))
+    skus = None if meta['skus'] is None else pd.Index(meta['skus'])
+    return dates, demand, skus
+
+def convert_csv(csv_file, path):
+    """Convert a 'date,demand' or 'date,sku,demand' CSV into a store directory"""
+    from models.forecast_model import SimpleForecastModel
+
+    model = SimpleForecastModel()
+    data = pd.read_csv(csv_file, dtype={'sku': str})
+    data['date'] = pd.to_datetime(data['date'])
+    model.set_data(data)
+    if model.skus is None:
+        write_store(path, model.data['date'], model.data['demand'].to_numpy())
+    else:
+        write_store(path, model.sku_dates, model.sku_demand, model.skus)
+    return path
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        print("Usage: python -m models.demand_store <input.csv> <store_dir>")
+        sys.exit(1)
+
+    convert_csv(sys.argv[1], sys.argv[2])
+    dates, demand, skus = read_store(sys.argv[2])
+    print(f"✅ Wrote {demand.shape[0]} days x {demand.shape[1]} series to {sys.argv[2]}")
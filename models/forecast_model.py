@@ -1,107 +1,949 @@
 """
 Forecast Model - Simple demand forecasting using moving averages
 """
+import os
+import threading
+import time
+from collections import OrderedDict, deque
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from statistics import NormalDist
+try:
+    from metrics import timed
+except ImportError:  # run as a script: hot paths are not timed
+    from contextlib import nullcontext as timed
+
+# Forecast quantiles served with every forecast unless others are requested
+DEFAULT_QUANTILES = (0.1, 0.5, 0.9)
+
+# Fixed histogram bins for relative one-step errors (actual / forecast - 1):
+# fine around zero, coarse in the tails; errors above 3 land in the last bin
+RESIDUAL_BIN_EDGES = np.round(np.concatenate([
+    np.arange(-1.0, -0.5, 0.1),
+    np.arange(-0.5, 0.5, 0.025),
+    np.arange(0.5, 1.0, 0.1),
+    np.arange(1.0, 3.01, 0.5)
+]), 4)
+
+# Every edge is a multiple of 0.025, so errors are binned through a lookup table
+# on a uniform 0.025 grid (indexed by actual / forecast) instead of a binary search
+_BIN_STEP = 0.025
+_slot_centers = RESIDUAL_BIN_EDGES[0] + (np.arange(round(4.0 / _BIN_STEP)) + 0.5) * _BIN_STEP
+_BIN_LOOKUP = np.searchsorted(RESIDUAL_BIN_EDGES, _slot_centers).astype(np.intp) - 1
+
+def quantile_label(q):
+    """0.1 -> 'p10'"""
+    return f"p{q * 100:g}"
+
+def histogram_quantiles(counts, quantiles):
+    """
+    Quantiles of binned distributions, interpolated linearly within bins
+    counts: (bins, N) histogram per series; returns (len(quantiles), N)
+    """
+    cdf = np.cumsum(counts, axis=0, dtype=np.float64)
+    total = cdf[-1]
+    target = np.asarray(quantiles, dtype=np.float64)[:, None] * total
+    index = np.minimum((cdf[None, :, :] < target[:, None, :]).sum(axis=1), len(counts) - 1)
+    columns = np.arange(counts.shape[1])
+    below = np.where(index > 0, cdf[np.maximum(index - 1, 0), columns], 0.0)
+    in_bin = counts[index, columns]
+    fraction = np.divide(target - below, in_bin, out=np.zeros_like(target), where=in_bin > 0)
+    lower_edge = RESIDUAL_BIN_EDGES[index]
+    return lower_edge + np.clip(fraction, 0.0, 1.0) * (RESIDUAL_BIN_EDGES[index + 1] - lower_edge)
+
+class ForecastCache:
+    """Thread-safe LRU cache with a per-entry time-to-live and hit/miss counters"""
+    def __init__(self, maxsize=256, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, calling compute() on a miss or expiry"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        
+        value = compute()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl
+            }
+
+class RollingDemandState:
+    """
+    Incremental statistics for N demand series sharing one daily date axis
+    Keeps the last few rows, a rolling sum over the moving-average window,
+    per-weekday aggregates and least-squares sums (Σx, Σy, Σxy, Σx², Σy² with
+    x = days since the first date) so forecasts and trends never rescan history.
+    Residual sketches: fixed-bin histograms of the relative one-step errors of
+    the moving-average and weekday forecasts, per series. A day enters them
+    once it is complete, i.e. when the next day opens.
+    """
+    def __init__(self, dates, matrix, window=7, max_window=28, block_size=1_000_000):
+        n_series = matrix.shape[1]
+        block_rows = max(1, block_size // max(n_series, 1))
+        self.window = window
+        self.n_rows = len(matrix)
+        self.last_date = dates[-1] if len(dates) else None
+        self.origin = dates[0] if len(dates) else None
+        self.tail = deque((np.array(row, dtype=np.float64) for row in matrix[-max(max_window, window):]),
+                          maxlen=max(max_window, window))
+        
+        # Rolling sum over the default moving-average window
+        recent = np.asarray(matrix[-window:], dtype=np.float64)
+        self.window_sum = np.nansum(recent, axis=0)
+        self.window_count = np.sum(~np.isnan(recent), axis=0)
+        
+        self.dow_sum = np.zeros((7, n_series))
+        self.dow_count = np.zeros((7, n_series))
+        self.count = np.zeros(n_series)
+        self.total = np.zeros(n_series)
+        self.total_sq = np.zeros(n_series)
+        self.sum_x = np.zeros(n_series)
+        self.sum_xx = np.zeros(n_series)
+        self.sum_xy = np.zeros(n_series)
+        n_bins = len(RESIDUAL_BIN_EDGES) - 1
+        self.residuals = {
+            'moving_average': np.zeros((n_bins, n_series), dtype=np.uint32),
+            'seasonal': np.zeros((n_bins, n_series), dtype=np.uint32)
+        }
+        previous = np.empty((0, n_series))
+        
+        # Scan history in row blocks so memory-mapped matrices are never copied whole
+        day_of_week = dates.dayofweek.to_numpy()
+        day_number = ((dates - self.origin).days.to_numpy(dtype=np.float64) if len(dates) else np.zeros(0))
+        for start in range(0, self.n_rows, block_rows):
+            block = np.asarray(matrix[start:start + block_rows], dtype=np.float64)
+            observed = ~np.isnan(block)
+            values = np.where(observed, block, 0.0)
+            block_days = day_of_week[start:start + block_rows]
+            
+            # Moving average of the 'window' days before each row, carried across blocks
+            extended = np.vstack([previous, block])
+            extended_observed = ~np.isnan(extended)
+            sums = np.vstack([np.zeros((1, n_series)), np.cumsum(np.where(extended_observed, extended, 0.0), axis=0)])
+            counts = np.vstack([np.zeros((1, n_series)), np.cumsum(extended_observed, axis=0)])
+            rows = np.arange(len(previous), len(extended))
+            lows = np.maximum(rows - window, 0)
+            moving_average = np.divide(sums[rows] - sums[lows], counts[rows] - counts[lows],
+                                       out=np.full(block.shape, np.nan), where=counts[rows] > counts[lows])
+            previous = extended[-window:]
+            
+            # Running aggregates per (day of week, series); the weekday mean
+            # before each row is its seasonal forecast
+            weekday_mean = np.full(block.shape, np.nan)
+            for day in range(7):
+                rows = np.flatnonzero(block_days == day)
+                day_values, day_observed = values[rows], observed[rows]
+                before_sum = self.dow_sum[day] + np.cumsum(day_values, axis=0) - day_values
+                before_count = self.dow_count[day] + np.cumsum(day_observed, axis=0) - day_observed
+                weekday_mean[rows] = np.divide(before_sum, before_count, out=np.full(before_sum.shape, np.nan),
+                                               where=before_count > 0)
+                self.dow_sum[day] += day_values.sum(axis=0)
+                self.dow_count[day] += day_observed.sum(axis=0)
+            
+            # The last row stays out of the sketches until it is complete
+            final = slice(None, max(0, min(len(block), self.n_rows - 1 - start)))
+            self._add_residuals('moving_average', block[final], moving_average[final])
+            self._add_residuals('seasonal', block[final], weekday_mean[final])
+            
+            # Least-squares sums over observed points
+            x = day_number[start:start + block_rows]
+            self.count += observed.sum(axis=0)
+            self.total += values.sum(axis=0)
+            self.total_sq += np.square(values).sum(axis=0)
+            self.sum_x += x @ observed
+            self.sum_xx += np.square(x) @ observed
+            self.sum_xy += x @ values
+        
+        # Rows appended since the last history flush
+        self.pending_dates = []
+        self.pending_rows = []
+        self.updated_last_row = None
+    
+    def add(self, date, columns, values):
+        """
+        Add demand for one date to the given series positions
+        A date equal to last_date adds to that day's demand; a later date opens a new day
+        """
+        if self.last_date is None or date > self.last_date:
+            self._push_row(date)
+            if self.origin is None:
+                self.origin = date
+        elif date < self.last_date:
+            raise ValueError(f"Observation for {date:%Y-%m-%d} is older than the latest date {self.last_date:%Y-%m-%d}")
+    
+        # Merge repeated positions so each series is touched once
+        columns, inverse = np.unique(np.asarray(columns), return_inverse=True)
+        values = np.bincount(inverse, weights=np.asarray(values, dtype=np.float64), minlength=len(columns))
+    
+        row = self.tail[-1]
+        old = row[columns]
+        was_missing = np.isnan(old)
+        new = np.where(was_missing, 0.0, old) + values
+        row[columns] = new
+        if not self.pending_rows:
+            self.updated_last_row = row
+    
+        day = date.dayofweek
+        self.dow_sum[day, columns] += values
+        self.dow_count[day, columns] += was_missing
+        self.window_sum[columns] += values
+        self.window_count[columns] += was_missing
+        self.total[columns] += values
+        self.total_sq[columns] += np.square(new) - np.square(np.where(was_missing, 0.0, old))
+        self.count[columns] += was_missing
+        x = float((date - self.origin).days)
+        self.sum_x[columns] += x * was_missing
+        self.sum_xx[columns] += x * x * was_missing
+        self.sum_xy[columns] += x * values
+    
+    def _add_residuals(self, method, actual, expected):
+        """Bin relative errors actual / expected - 1 of a (rows, N) block into the method's sketch"""
+        sketch = self.residuals[method]
+        n_bins, n_series = sketch.shape
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slots = actual / expected
+        # Skipped points (no actual or no positive forecast) go to an extra bin that is dropped
+        skipped = ~(expected > 0) | np.isnan(slots)
+        slots *= 1 / _BIN_STEP
+        slots[skipped] = 0
+        np.clip(slots, 0, len(_BIN_LOOKUP) - 1, out=slots)
+        bins = _BIN_LOOKUP[slots.astype(np.intp)]
+        bins[skipped] = n_bins
+        bins *= n_series
+        bins += np.arange(n_series)
+        counts = np.bincount(bins.ravel(), minlength=(n_bins + 1) * n_series)[:n_bins * n_series]
+        sketch += counts.reshape(sketch.shape).astype(np.uint32)
+    
+    def residual_quantiles(self, method, quantiles, min_count=10):
+        """
+        Quantiles of the relative one-step error per series as a (len(quantiles), N) array
+        Series with fewer than min_count residuals use the pooled sketch of all series
+        """
+        sketch = self.residuals['seasonal' if method == 'seasonal' else 'moving_average']
+        values = histogram_quantiles(sketch, quantiles)
+        sparse = sketch.sum(axis=0) < min_count
+        if sparse.any():
+            pooled = histogram_quantiles(sketch.sum(axis=1, dtype=np.float64)[:, None], quantiles)
+            values[:, sparse] = pooled
+        return values
+    
+    def _push_row(self, date):
+        """Open a new day, dropping the oldest row out of the rolling window"""
+        if len(self.tail):
+            # The previous day is complete: add its one-step errors to the sketches
+            finished = self.tail[-1][None, :]
+            before = np.array([self.tail[-i] for i in range(2, min(self.window + 1, len(self.tail)) + 1)])
+            before_count = np.sum(~np.isnan(before), axis=0) if len(before) else np.zeros(finished.shape[1])
+            moving_average = np.divide(np.nansum(before, axis=0) if len(before) else 0.0, before_count,
+                                       out=np.full(finished.shape[1], np.nan), where=before_count > 0)
+            day = self.last_date.dayofweek
+            observed = ~np.isnan(finished[0])
+            weekday_count = self.dow_count[day] - observed
+            weekday_mean = np.divide(self.dow_sum[day] - np.where(observed, finished[0], 0.0), weekday_count,
+                                     out=np.full(finished.shape[1], np.nan), where=weekday_count > 0)
+            self._add_residuals('moving_average', finished, moving_average[None, :])
+            self._add_residuals('seasonal', finished, weekday_mean[None, :])
+        if len(self.tail) >= self.window:
+            leaving = self.tail[-self.window]
+            observed = ~np.isnan(leaving)
+            self.window_sum -= np.where(observed, leaving, 0.0)
+            self.window_count -= observed
+        row = np.full(len(self.window_sum), np.nan)
+        self.tail.append(row)
+        self.pending_dates.append(date)
+        self.pending_rows.append(row)
+        self.last_date = date
+        self.n_rows += 1
+    
+    def take_pending(self):
+        """Return (dates, rows, updated_last_row) added since the last call and reset them"""
+        pending = (self.pending_dates, self.pending_rows, self.updated_last_row)
+        self.pending_dates, self.pending_rows, self.updated_last_row = [], [], None
+        return pending
+    
+    def _recent(self, days, columns=None):
+        """The last 'days' kept rows as a (days, N) array, or (days, len(columns))"""
+        rows = [self.tail[-i] for i in range(min(days, len(self.tail)), 0, -1)]
+        width = len(self.window_sum) if columns is None else len(columns)
+        if not rows:
+            return np.empty((0, width))
+        return np.array(rows) if columns is None else np.array([row[columns] for row in rows])
+    
+    def moving_average(self, window=None, columns=None):
+        """
+        Mean of the last 'window' days per series, ignoring days without data
+        columns: only these series positions (None for all)
+        Only the kept tail is available; longer windows raise ValueError
+        """
+        if window is None or window == self.window:
+            sums, counts = self.window_sum, self.window_count
+            if columns is not None:
+                sums, counts = sums[columns], counts[columns]
+        elif window > self.tail.maxlen:
+            raise ValueError(f"window {window} is longer than the {self.tail.maxlen} days kept in the rolling state")
+        else:
+            recent = self._recent(window, columns)
+            sums, counts = np.nansum(recent, axis=0), np.sum(~np.isnan(recent), axis=0)
+        return np.divide(sums, counts, out=np.zeros(len(sums)), where=counts > 0)
+    
+    def std(self):
+        """Sample standard deviation of daily demand per series (0 with fewer than 2 days)"""
+        counts = np.maximum(self.count, 1)
+        variance = np.divide(self.total_sq - self.total ** 2 / counts, self.count - 1,
+                             out=np.zeros(len(self.count)), where=self.count > 1)
+        return np.sqrt(np.maximum(variance, 0.0))
+    
+    def day_of_week_profile(self, columns=None):
+        """Average demand per (day of week, series) as a (7, N) array (or only the given columns)"""
+        dow_sum = self.dow_sum if columns is None else self.dow_sum[:, columns]
+        dow_count = self.dow_count if columns is None else self.dow_count[:, columns]
+        return np.divide(dow_sum, dow_count, out=np.zeros_like(dow_sum), where=dow_count > 0)
+    
+    def trend_statistics(self, columns=None):
+        """
+        Per-series trend statistics from the running sums, O(N) whatever the history length
+        (O(len(columns)) when only some series positions are requested)
+          slope, intercept  OLS fit of demand on days since the first date
+          r_squared         share of variance explained by that line
+          volatility        standard deviation over the last max_window days
+          seasonality       share of variance explained by the day of week (0-1)
+        """
+        pick = (lambda values: values) if columns is None else (lambda values: values[..., columns])
+        n, total, total_sq, sum_x, sum_xx, sum_xy = (
+            pick(values) for values in (self.count, self.total, self.total_sq, self.sum_x, self.sum_xx, self.sum_xy))
+        has_fit = n > 1
+        sxx = n * sum_xx - sum_x ** 2
+        sxy = n * sum_xy - sum_x * total
+        syy = n * total_sq - total ** 2
+        fit = has_fit & (sxx > 0)
+        slope = np.divide(sxy, sxx, out=np.zeros(len(n)), where=fit)
+        mean = np.divide(total, n, out=np.zeros(len(n)), where=n > 0)
+        intercept = mean - slope * np.divide(sum_x, n, out=np.zeros(len(n)), where=n > 0)
+        r_squared = np.divide(sxy ** 2, sxx * syy, out=np.zeros(len(n)), where=fit & (syy > 0))
+        
+        # Between-weekday sum of squares over the total sum of squares
+        profile = self.day_of_week_profile(columns)
+        between = (pick(self.dow_count) * (profile - mean) ** 2).sum(axis=0)
+        total_ss = np.divide(syy, n, out=np.zeros(len(n)), where=n > 0)
+        seasonality = np.divide(between, total_ss, out=np.zeros(len(n)), where=total_ss > 1e-12)
+        
+        recent = self._recent(len(self.tail), columns)
+        recent_count = np.sum(~np.isnan(recent), axis=0)
+        recent_mean = np.divide(np.nansum(recent, axis=0), recent_count, out=np.zeros(len(n)), where=recent_count > 0)
+        recent_ss = np.nansum((recent - recent_mean) ** 2, axis=0)
+        volatility = np.sqrt(np.divide(recent_ss, recent_count - 1, out=np.zeros(len(n)), where=recent_count > 1))
+        
+        return {
+            'count': n,
+            'slope': slope,
+            'intercept': intercept,
+            'r_squared': np.minimum(r_squared, 1.0),
+            'avg_demand': mean,
+            'volatility': volatility,
+            'seasonality_strength': np.clip(seasonality, 0.0, 1.0)
+        }
 
 class SimpleForecastModel:
-    def __init__(self):
-        self.data = None
+    def __init__(self, cache_size=256, cache_ttl=300, window=7):
+        self._data = None
+        # Bumped on every data load or append; part of every cache key
+        self.data_version = 0
+        self.cache = ForecastCache(maxsize=cache_size, ttl=cache_ttl)
+        # Multi-series mode: one column per SKU, one row per date. The loaded matrix
+        # (possibly a shared memory map) is never written; appended days live in a
+        # small list of rows, and a later point for its last day in a replacement row
+        self.skus = None
+        self._sku_dates = None
+        self._sku_demand = None
+        self._sku_appended = []
+        self._sku_last_row = None
+        # Running statistics for the aggregate series and for every SKU
+        self.window = window
+        self._series_state = None
+        self._sku_state = None
+        # Holt-Winters fits per series group: {'aggregate' | 'skus': (data_version, fit)}
+        # Parameters survive appends (only the recursions rerun); a new load resets them
+        self.holt_winters_history = 16 * 7
+        self._hw_fits = {}
+        # One fit at a time per group: concurrent requests wait for it instead of repeating it
+        self._hw_fit_locks = {'aggregate': threading.Lock(), 'skus': threading.Lock()}
+        self._lock = threading.RLock()
+    
+    @property
+    def data(self):
+        """Aggregate 'date,demand' history, including appended observations"""
+        self._flush_pending()
+        return self._data
+    
+    @property
+    def sku_dates(self):
+        self._flush_pending()
+        return self._sku_dates
+    
+    @property
+    def sku_demand(self):
+        """
+        Dates x SKUs demand matrix (NaN where a SKU has no observation)
+        The loaded matrix itself until observations are appended; after that a
+        new array, O(history) to build: readers of recent days use recent_sku_demand
+        """
+        self._flush_pending()
+        with self._lock:
+            base = self._sku_demand
+            if not self._sku_appended and self._sku_last_row is None:
+                return base
+            matrix = np.concatenate([base, np.array(self._sku_appended, dtype=base.dtype).reshape(-1, base.shape[1])])
+            if self._sku_last_row is not None:
+                matrix[len(base) - 1] = self._sku_last_row
+            return matrix
+    
+    def recent_sku_demand(self, days, columns=None):
+        """
+        The last 'days' rows of the SKU matrix as float64, shaped (days, SKUs)
+        (or only the given column positions); reads just those rows of the loaded matrix
+        """
+        self._flush_pending()
+        with self._lock:
+            base = self._sku_demand
+            appended = self._sku_appended[-days:] if days > 0 else []
+            base_rows = min(max(days - len(appended), 0), len(base))
+            pick = (lambda values: values) if columns is None else (lambda values: values[..., columns])
+            blocks = []
+            if base_rows:
+                block = np.array(pick(base[len(base) - base_rows:]), dtype=np.float64)
+                if self._sku_last_row is not None:
+                    block[-1] = pick(self._sku_last_row)
+                blocks.append(block)
+            if appended:
+                blocks.append(np.array([pick(row) for row in appended], dtype=np.float64))
+            width = base.shape[1] if columns is None else len(columns)
+            return np.concatenate(blocks) if blocks else np.empty((0, width))
     
     def load_data(self, csv_file):
-        """Load historical demand data"""
+        """
+        Load historical demand data
+        Accepts a single 'date,demand' series or a long-format
+        'date,sku,demand' table covering many SKUs, or a demand store
+        directory written by models.demand_store
+        """
         try:
-            self.data = pd.read_csv(csv_file)
-            self.data['date'] = pd.to_datetime(self.data['date'])
+            if os.path.isdir(csv_file):
+                return self.load_store(csv_file)
+            with timed('csv_load'):
+                data = pd.read_csv(csv_file, dtype={'sku': str})
+                data['date'] = pd.to_datetime(data['date'])
+            self.set_data(data)
             return True
         except Exception as e:
             print(f"Error loading data: {e}")
             return False
     
-    def moving_average_forecast(self, window=7, periods=30):
+    def load_store(self, path, mmap=True):
+        """
+        Load a columnar demand store
+        With mmap=True the demand matrix stays a read-only memory map shared
+        through the page cache by every process that opens the same store
+        """
+        from models.demand_store import read_store
+        
+        dates, demand, skus = read_store(path, mmap=mmap)
+        if skus is None:
+            self.set_data(pd.DataFrame({'date': dates, 'demand': np.asarray(demand[:, 0], dtype=np.float64)}))
+        else:
+            self._install_matrix(dates, demand, skus)
+        return True
+    
+    def load_from_erp(self, client, days=90):
+        """
+        Load sales history from an ERP client (see api/erp_client.py)
+        Records are {'date', 'sales'} plus an optional 'sku'
+        """
+        data = pd.DataFrame(client.get_sales(days)).rename(columns={'sales': 'demand'})
+        if data.empty:
+            return False
+        data['date'] = pd.to_datetime(data['date'])
+        self.set_data(data)
+        return True
+    
+    def set_data(self, data):
+        """Install a demand table, building the SKU matrix when a 'sku' column is present"""
+        if 'sku' not in data.columns:
+            with self._lock:
+                self.data_version += 1
+                self.cache.clear()
+                self._data = data.sort_values('date', kind='stable').reset_index(drop=True)
+                self.skus = None
+                self._sku_dates = None
+                self._sku_demand = None
+                self._sku_appended = []
+                self._sku_last_row = None
+                self._sku_state = None
+                self._hw_fits = {}
+                self._series_state = RollingDemandState(
+                    pd.DatetimeIndex(self._data['date']),
+                    self._data['demand'].to_numpy(dtype=np.float64)[:, None], window=self.window)
+            return
+        
+        with timed('groupby'):
+            # Pivot the long table into a dates x SKUs matrix without a Python loop
+            date_codes, dates = pd.factorize(data['date'], sort=True)
+            sku_codes, skus = pd.factorize(data['sku'], sort=True)
+            n_dates, n_skus = len(dates), len(skus)
+            flat_index = date_codes * n_skus + sku_codes
+            totals = np.bincount(flat_index, weights=data['demand'].to_numpy(dtype=np.float64),
+                                 minlength=n_dates * n_skus)
+            observed = np.bincount(flat_index, minlength=n_dates * n_skus) > 0
+            matrix = np.where(observed, totals, np.nan).reshape(n_dates, n_skus).astype(np.float32)
+        self._install_matrix(pd.DatetimeIndex(dates), matrix, pd.Index(skus))
+    
+    def _install_matrix(self, dates, matrix, skus, block_size=1_000_000):
+        """Install a dates x SKUs matrix (possibly memory-mapped) and rebuild the running state"""
+        block_rows = max(1, block_size // max(matrix.shape[1], 1))
+        # The aggregate series keeps the single-series methods working
+        totals = np.concatenate([np.nansum(matrix[start:start + block_rows], axis=1, dtype=np.float64)
+                                 for start in range(0, len(matrix), block_rows)] or [np.zeros(0)])
+        with self._lock:
+            self.data_version += 1
+            self.cache.clear()
+            self.skus = skus
+            self._sku_dates = dates
+            self._sku_demand = matrix
+            self._sku_appended = []
+            self._sku_last_row = None
+            self._data = pd.DataFrame({'date': dates, 'demand': totals})
+            self._sku_state = RollingDemandState(dates, matrix, window=self.window)
+            self._hw_fits = {}
+            self._series_state = RollingDemandState(dates, totals[:, None], window=self.window)
+    
+    def append_observations(self, observations):
+        """
+        Ingest new demand points without reloading history
+        observations: DataFrame or list of dicts with 'date', 'demand' and,
+        in multi-series mode, 'sku'. Points for the latest date add to that
+        day's demand; older dates are rejected. Each point updates the rolling
+        window, weekday and trend statistics in O(1). Every point is
+        validated first (a parseable date, a finite non-negative demand), so a
+        rejected batch raises ValueError and leaves the model unchanged.
+        """
+        frame = observations if hasattr(observations, 'columns') else pd.DataFrame(list(observations))
+        for column in ('date', 'demand'):
+            if column not in frame.columns:
+                raise ValueError(f"Missing required field: {column}")
+        if frame.empty:
+            return 0
+        try:
+            dates = pd.to_datetime(frame['date'])
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid date in observations: {e}")
+        if dates.isna().any():
+            raise ValueError("Every observation needs a date")
+        demand = pd.to_numeric(frame['demand'], errors='coerce').to_numpy(dtype=np.float64)
+        if not (np.isfinite(demand) & (demand >= 0)).all():
+            raise ValueError("demand must be a finite, non-negative number")
+        frame = frame.assign(date=dates, demand=demand).sort_values('date', kind='stable')
+        
+        with self._lock:
+            if self._series_state is None:
+                self.set_data(frame)
+                return len(frame)
+            
+            last_date = self._series_state.last_date
+            if last_date is not None and frame['date'].iloc[0] < last_date:
+                raise ValueError(f"Observations must not be older than {last_date:%Y-%m-%d}")
+            
+            positions = None
+            if self._sku_state is not None:
+                if 'sku' not in frame.columns:
+                    raise ValueError("Missing required field: sku")
+                positions, _ = self._sku_columns(frame['sku'].tolist())
+            elif 'sku' in frame.columns:
+                raise ValueError("Loaded data has no 'sku' column")
+            
+            demand = frame['demand'].to_numpy(dtype=np.float64)
+            dates, starts = np.unique(frame['date'].to_numpy(), return_index=True)
+            bounds = list(starts[1:]) + [len(frame)]
+            for date, start, stop in zip(pd.DatetimeIndex(dates), starts, bounds):
+                if positions is not None:
+                    self._sku_state.add(date, positions[start:stop], demand[start:stop])
+                self._series_state.add(date, [0], [demand[start:stop].sum()])
+            
+            self.data_version += 1
+            self.cache.clear()
+            return len(frame)
+    
+    def _flush_pending(self):
+        """Fold appended rows into the materialized history frames"""
+        with self._lock:
+            if self._series_state is None:
+                return
+            dates, rows, updated = self._series_state.take_pending()
+            if dates or updated is not None:
+                demand = self._data['demand'].to_numpy(dtype=np.float64, copy=True)
+                if updated is not None:
+                    demand[-1] = updated[0]
+                self._data = pd.DataFrame({
+                    'date': pd.DatetimeIndex(self._data['date']).append(pd.DatetimeIndex(dates)),
+                    'demand': np.concatenate([demand, [row[0] for row in rows]])
+                })
+            
+            if self._sku_state is None:
+                return
+            dates, rows, updated = self._sku_state.take_pending()
+            # Rows are the rolling state's own arrays, so later points for the
+            # latest day show up without another copy
+            if updated is not None and not self._sku_appended:
+                self._sku_last_row = updated
+            if dates:
+                self._sku_appended.extend(rows)
+                self._sku_dates = self._sku_dates.append(pd.DatetimeIndex(dates))
+    
+    @staticmethod
+    def _forecast_dates(last_date, periods):
+        """Daily dates following last_date"""
+        if periods < 1:
+            raise ValueError("periods must be at least 1")
+        return pd.date_range(last_date + timedelta(days=1), periods=periods, freq='D')
+    
+    def _sku_columns(self, skus=None):
+        """Resolve SKU labels to matrix column positions"""
+        if self._sku_state is None:
+            raise ValueError("Loaded data has no 'sku' column")
+        if skus is None:
+            return np.arange(len(self.skus)), list(self.skus)
+        skus = [skus] if isinstance(skus, str) else list(skus)
+        positions = self.skus.get_indexer(skus)
+        if (positions < 0).any():
+            missing = [sku for sku, pos in zip(skus, positions) if pos < 0]
+            raise KeyError(f"Unknown SKU(s): {', '.join(map(str, missing[:10]))}")
+        return positions, skus
+    
+    def _moving_average(self, state, window, columns=None):
+        """
+        Mean of the last 'window' days per series of a state (call with the lock held)
+        columns: only these series positions (None for all)
+        Windows longer than the state's tail are averaged over the stored history
+        """
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        if window <= state.tail.maxlen:
+            return state.moving_average(window, columns)
+        if state is self._sku_state:
+            recent = self.recent_sku_demand(window, columns)
+        else:
+            recent = self.data['demand'].to_numpy(dtype=np.float64)[-window:, None]
+        counts = np.sum(~np.isnan(recent), axis=0)
+        return np.divide(np.nansum(recent, axis=0), counts, out=np.zeros(recent.shape[1]), where=counts > 0)
+    
+    def forecast_skus(self, skus=None, method='moving_average', window=7, periods=30, quantiles=DEFAULT_QUANTILES):
+        """
+        Forecast many SKUs at once
+        skus: a SKU label, a list of labels, or None for the whole catalog
+        Returns columnar results: 'forecast', the P10/P90 confidence bounds
+        and each requested quantile under 'quantiles' are arrays shaped
+        (len(skus), periods)
+        """
+        with timed('forecast_skus'):
+            columns = None
+            rmse = None
+            with self._lock:
+                positions, labels = self._sku_columns(skus)
+                if skus is not None:
+                    columns = positions
+                forecast_dates = self._forecast_dates(self._sku_state.last_date, periods)
+            
+                if method == 'seasonal':
+                    # Index the running (day of week, SKU) profile by each forecast date
+                    profile = self._sku_state.day_of_week_profile(columns)
+                    values = profile[forecast_dates.dayofweek.to_numpy()].T
+                elif method != 'holt_winters':
+                    # Mean of the last 'window' days per SKU, ignoring days without data
+                    avg_demand = self._moving_average(self._sku_state, window, columns)
+                    values = np.repeat(avg_demand[:, None], periods, axis=1)
+            
+            if method == 'holt_winters':
+                fit = self._holt_winters_fit('skus')
+                values = fit.forecast(periods, columns)
+                rmse = fit.rmse if columns is None else fit.rmse[columns]
+            bands = self._quantile_bands('skus', method, values, columns, quantiles, rmse)
+            
+            return {
+                'skus': labels,
+                'dates': forecast_dates.strftime('%Y-%m-%d').tolist(),
+                'forecast': np.round(values),
+                'confidence_lower': np.round(bands[0.1]),
+                'confidence_upper': np.round(bands[0.9]),
+                'quantiles': {quantile_label(q): np.round(bands[q]) for q in quantiles}
+            }
+    
+    def _quantile_bands(self, group, method, values, columns, quantiles, rmse=None):
+        """
+        Quantile forecasts {q: array like values} for the requested quantiles plus 0.1 / 0.9
+        Moving-average and seasonal forecasts scale by the empirical relative
+        error quantiles of their residual sketch, minus the median error: the
+        bias of the point forecast (e.g. a trend) is not moved into the bands,
+        so P50 is the point forecast and P10 <= forecast <= P90. Holt-Winters
+        uses normal quantiles of its one-step RMSE, widening with the square
+        root of the horizon
+        """
+        levels = tuple(sorted(set(quantiles) | {0.1, 0.5, 0.9}))
+        if not all(0 < q < 1 for q in levels):
+            raise ValueError("quantiles must be between 0 and 1 (exclusive)")
+        
+        if rmse is not None:
+            horizon = np.sqrt(np.arange(1, values.shape[1] + 1))
+            return {q: np.maximum(values + NormalDist().inv_cdf(q) * rmse[:, None] * horizon, 0.0) for q in levels}
+        
+        errors = self._residual_quantiles(group, method, levels)
+        if columns is not None:
+            errors = errors[:, columns]
+        errors = errors - errors[levels.index(0.5)]
+        return {q: np.maximum(values * (1 + errors[i][:, None]), 0.0) for i, q in enumerate(levels)}
+    
+    def _residual_quantiles(self, group, method, quantiles):
+        """Relative error quantiles (len(quantiles), N) from the residual sketches, cached per data version"""
+        def compute():
+            with self._lock:
+                state = self._series_state if group == 'aggregate' else self._sku_state
+                return state.residual_quantiles(method, quantiles)
+        
+        sketch = 'seasonal' if method == 'seasonal' else 'moving_average'
+        key = (self.data_version, 'residual_quantiles', group, sketch, quantiles)
+        return self.cache.get_or_compute(key, compute)
+    
+    def get_forecast(self, method='moving_average', window=7, periods=30, skus=None, quantiles=DEFAULT_QUANTILES):
+        """
+        Cached forecast lookup keyed on data version, method, window, periods, SKUs and quantiles
+        Cached results are shared between callers and must not be mutated
+        """
+        quantiles = tuple(quantiles)
+        if skus is not None:
+            skus = (skus,) if isinstance(skus, str) else tuple(skus)
+            key = (self.data_version, 'skus', method, window, periods, skus, quantiles)
+            return self.cache.get_or_compute(
+                key, lambda: self.forecast_skus(list(skus), method=method, window=window, periods=periods,
+                                                quantiles=quantiles))
+        
+        if method == 'seasonal' and self._series_state is not None:
+            key = (self.data_version, 'seasonal', None, periods, quantiles)
+            return self.cache.get_or_compute(key, lambda: self.seasonal_forecast(periods, quantiles))
+        if method == 'holt_winters' and self._series_state is not None:
+            key = (self.data_version, 'holt_winters', None, periods, quantiles)
+            return self.cache.get_or_compute(key, lambda: self.holt_winters_forecast(periods, quantiles))
+        key = (self.data_version, 'moving_average', window, periods, quantiles)
+        return self.cache.get_or_compute(
+            key, lambda: self.moving_average_forecast(window=window, periods=periods, quantiles=quantiles))
+    
+    def cache_stats(self):
+        """Forecast cache counters plus the current data version"""
+        stats = self.cache.stats()
+        stats['data_version'] = self.data_version
+        return stats
+    
+    def sample_demand_paths(self, sku=None, n_paths=1000, periods=365, method='moving_average', window=7, seed=None):
+        """
+        Monte Carlo demand scenarios for one series (a SKU, or the aggregate series)
+        Each path is the forecast plus independent daily normal noise with the
+        series' historical standard deviation, floored at zero.
+        Returns a float32 array shaped (n_paths, periods)
+        """
+        if sku is None:
+            forecast = self.get_forecast(method, window=window, periods=periods)
+            if forecast is None:
+                raise ValueError("No demand data loaded")
+            mean = np.asarray(forecast['forecast'], dtype=np.float32)
+            with self._lock:
+                std = self._series_state.std()[0]
+        else:
+            forecast = self.get_forecast(method, window=window, periods=periods, skus=[sku])
+            mean = forecast['forecast'][0].astype(np.float32)
+            with self._lock:
+                std = self._sku_state.std()[self._sku_columns([sku])[0][0]]
+        
+        rng = np.random.default_rng(seed)
+        paths = rng.standard_normal((n_paths, periods), dtype=np.float32)
+        paths *= np.float32(std)
+        paths += mean
+        return np.maximum(paths, 0, out=paths)
+    
+    def moving_average_forecast(self, window=7, periods=30, quantiles=DEFAULT_QUANTILES):
         """
         Simple moving average forecast
         window: number of days to average
         periods: number of future periods to forecast
+        quantiles: forecast quantiles from the moving-average residual sketch
         """
-        if self.data is None:
+        if self._series_state is None:
             return None
         
-        # Get the last 'window' days of data
-        recent_data = self.data['demand'].tail(window).values
-        avg_demand = np.mean(recent_data)
-        
-        # Generate forecast dates
-        last_date = self.data['date'].max()
-        forecast_dates = [(last_date + timedelta(days=i+1)).strftime('%Y-%m-%d') 
-                         for i in range(periods)]
-        
-        # Create forecast (same average for all periods)
-        forecast = {
-            'dates': forecast_dates,
-            'forecast': [round(avg_demand) for _ in range(periods)],
-            'confidence_lower': [round(avg_demand * 0.8) for _ in range(periods)],
-            'confidence_upper': [round(avg_demand * 1.2) for _ in range(periods)]
-        }
-        
-        return forecast
+        with timed('forecast'):
+            # Average of the last 'window' days from the rolling state
+            with self._lock:
+                avg_demand = self._moving_average(self._series_state, window)[0]
+                forecast_dates = self._forecast_dates(self._series_state.last_date, periods)
+            
+            # Create forecast (same average for all periods)
+            values = np.full((1, periods), avg_demand)
+            return self._aggregate_forecast(forecast_dates, values, 'moving_average', quantiles)
     
-    def seasonal_forecast(self, periods=30):
+    def seasonal_forecast(self, periods=30, quantiles=DEFAULT_QUANTILES):
         """
         Simple seasonal forecast based on day of week patterns
         """
-        if self.data is None:
+        if self._series_state is None:
             return None
         
-        # Calculate average demand by day of week
-        self.data['day_of_week'] = self.data['date'].dt.dayofweek
-        daily_avg = self.data.groupby('day_of_week')['demand'].mean()
-        
-        # Generate forecast
-        last_date = self.data['date'].max()
-        forecast_dates = []
-        forecast_values = []
-        
-        for i in range(periods):
-            next_date = last_date + timedelta(days=i+1)
-            day_of_week = next_date.weekday()
-            avg_demand = daily_avg[day_of_week]
-            
-            forecast_dates.append(next_date.strftime('%Y-%m-%d'))
-            forecast_values.append(round(avg_demand))
+        with timed('forecast'):
+            # Look up the running day-of-week profile for every forecast date
+            with self._lock:
+                profile = self._series_state.day_of_week_profile()[:, 0]
+                forecast_dates = self._forecast_dates(self._series_state.last_date, periods)
+            values = profile[forecast_dates.dayofweek.to_numpy()][None, :]
+            return self._aggregate_forecast(forecast_dates, values, 'seasonal', quantiles)
+    
+    def holt_winters_forecast(self, periods=30, quantiles=DEFAULT_QUANTILES):
+        """
+        Additive Holt-Winters forecast with weekly seasonality (see models/holt_winters.py)
+        The fitted state is cached, so repeated calls only extrapolate
+        """
+        if self._series_state is None:
+            return None
         
+        with timed('forecast'):
+            with self._lock:
+                forecast_dates = self._forecast_dates(self._series_state.last_date, periods)
+            fit = self._holt_winters_fit('aggregate')
+            return self._aggregate_forecast(forecast_dates, fit.forecast(periods), 'holt_winters', quantiles, fit.rmse)
+    
+    def _aggregate_forecast(self, forecast_dates, values, method, quantiles, rmse=None):
+        """Forecast dict (lists) for the aggregate series, with P10/P90 bounds and quantiles"""
+        values = np.round(values)
+        bands = self._quantile_bands('aggregate', method, values, None, quantiles, rmse)
+        as_list = lambda array: np.round(array[0]).astype(int).tolist()
         return {
-            'dates': forecast_dates,
-            'forecast': forecast_values,
-            'confidence_lower': [round(val * 0.8) for val in forecast_values],
-            'confidence_upper': [round(val * 1.2) for val in forecast_values]
+            'dates': forecast_dates.strftime('%Y-%m-%d').tolist(),
+            'forecast': as_list(values),
+            'confidence_lower': as_list(bands[0.1]),
+            'confidence_upper': as_list(bands[0.9]),
+            'quantiles': {quantile_label(q): as_list(bands[q]) for q in quantiles}
         }
     
+    def _holt_winters_fit(self, group):
+        """
+        Fitted Holt-Winters state for 'aggregate' or 'skus', on the last holt_winters_history days
+        The parameter grid search runs once per load; after appends the
+        recursions are rerun with the chosen parameters
+        """
+        from models import holt_winters
+        
+        # Single flight per data version: whoever waited here finds the fit cached
+        with self._hw_fit_locks[group]:
+            with self._lock:
+                version = self.data_version
+                cached = self._hw_fits.get(group)
+                if cached is not None and cached[0] == version:
+                    return cached[1]
+                if group == 'aggregate':
+                    history = self.data['demand'].to_numpy(dtype=np.float64)[-self.holt_winters_history:, None]
+                else:
+                    history = self.recent_sku_demand(self.holt_winters_history)
+            
+            # Fit outside the model lock so appends and other forecasts are not blocked
+            with timed('holt_winters_fit'):
+                fit = holt_winters.fit(history) if cached is None else holt_winters.refit(history, cached[1])
+            with self._lock:
+                if self.data_version == version:
+                    self._hw_fits[group] = (version, fit)
+            return fit
+    
     def get_trend_analysis(self):
-        """Simple trend analysis"""
-        if self.data is None or len(self.data) < 2:
+        """Trend analysis of the aggregate series, cached until the data changes"""
+        return self.cache.get_or_compute((self.data_version, 'trend'), self._compute_trend_analysis)
+    
+    def _compute_trend_analysis(self):
+        state = self._series_state
+        if state is None or state.count[0] < 2:
             return "Insufficient data"
         
-        # Calculate trend using linear regression
-        y = self.data['demand'].values
-        x = np.arange(len(y))
-        
-        # Simple slope calculation
-        slope = (y[-1] - y[0]) / len(y) if len(y) > 0 else 0
+        # OLS fit and rolling statistics from the running sums
+        with self._lock:
+            stats = state.trend_statistics()
         
+        slope = round(float(stats['slope'][0]), 2)
+        return {
+            'trend': self._trend_label(slope),
+            'slope': slope,
+            'intercept': round(float(stats['intercept'][0]), 2),
+            'r_squared': round(float(stats['r_squared'][0]), 3),
+            'avg_demand': round(float(stats['avg_demand'][0]), 2),
+            'volatility': round(float(stats['volatility'][0]), 2),
+            'seasonality_strength': round(float(stats['seasonality_strength'][0]), 3)
+        }
+    
+    @staticmethod
+    def _trend_label(slope):
         if slope > 0:
-            trend = "📈 Increasing"
+            return "📈 Increasing"
         elif slope < 0:
-            trend = "📉 Decreasing"
-        else:
-            trend = "➡️  Stable"
+            return "📉 Decreasing"
+        return "➡️  Stable"
+    
+    def trend_skus(self, skus=None):
+        """
+        Trend analysis for many SKUs at once (None for the whole catalog)
+        Returns columnar results; SKUs with fewer than 2 observations get a
+        'trend' of None and zero statistics
+        """
+        with self._lock:
+            positions, labels = self._sku_columns(skus)
+            stats = self._sku_state.trend_statistics(None if skus is None else positions)
         
+        slope = np.round(stats['slope'], 2)
+        enough = stats.pop('count') >= 2
         return {
-            'trend': trend,
-            'slope': round(slope, 2),
-            'avg_demand': round(np.mean(y), 2)
+            'skus': labels,
+            'trend': [self._trend_label(value) if ok else None for value, ok in zip(slope.tolist(), enough.tolist())],
+            'slope': slope,
+            'intercept': np.round(stats['intercept'], 2),
+            'r_squared': np.round(stats['r_squared'], 3),
+            'avg_demand': np.round(stats['avg_demand'], 2),
+            'volatility': np.round(stats['volatility'], 2),
+            'seasonality_strength': np.round(stats['seasonality_strength'], 3)
         }
+    
+    def get_trend_skus(self, skus=None):
+        """Cached trend_skus keyed on data version and SKUs"""
+        key = (self.data_version, 'trend_skus', None if skus is None else tuple(skus))
+        return self.cache.get_or_compute(key, lambda: self.trend_skus(skus))
 
 # Test the model
 if __name__ == "__main__":
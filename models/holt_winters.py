@@ -0,0 +1,197 @@
+"""
+Holt-Winters - Additive weekly exponential smoothing for many series at once
+
+Series are columns of a (dates x series) matrix. The recursions step through
+time once and update every series (and every candidate parameter set) as one
+NumPy vector operation per day:
+    level    l = α(y − s) + (1 − α)(l + b)
+    trend    b = β(l − l_prev) + (1 − β)b
+    season   s = γ(y − l) + (1 − γ)s
+Missing observations (NaN) are replaced by the one-step forecast.
+"""
+import atexit
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+
+SEASON = 7
+
+# Candidate smoothing parameters; every series picks the combination with the lowest one-step SSE
+DEFAULT_GRID = {
+    'alpha': (0.1, 0.3, 0.5),
+    'beta': (0.01, 0.1),
+    'gamma': (0.05, 0.2)
+}
+
+# Process pool for wide catalogs, created on first use and shared by every fit in this process
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+def _fit_pool(workers):
+    """The shared pool, (re)created with at least 'workers' processes"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers < workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # 'spawn': fits run on server threads, which do not survive a fork safely
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+def _reset_pool(broken):
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+
+@atexit.register
+def _shutdown_pool():
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+
+class HoltWintersFit:
+    """Fitted parameters and final smoothing state for N series"""
+    def __init__(self, alpha, beta, gamma, level, trend, seasonal, n_rows, sse, n_obs):
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.level = level
+        self.trend = trend
+        self.seasonal = seasonal  # (season, N), indexed by row number % season
+        self.n_rows = n_rows
+        self.sse = sse
+        self.n_obs = n_obs
+
+    @property
+    def rmse(self):
+        """One-step in-sample forecast error per series"""
+        return np.sqrt(np.divide(self.sse, self.n_obs, out=np.zeros_like(self.sse), where=self.n_obs > 0))
+
+    def forecast(self, periods, columns=None):
+        """Extrapolate the fitted state: (len(columns) or N, periods) array, floored at zero"""
+        level, trend, seasonal = self.level, self.trend, self.seasonal
+        if columns is not None:
+            level, trend, seasonal = level[columns], trend[columns], seasonal[:, columns]
+        steps = np.arange(1, periods + 1)
+        phase = (self.n_rows + steps - 1) % len(seasonal)
+        values = level[:, None] + trend[:, None] * steps + seasonal[phase].T
+        return np.maximum(values, 0.0)
+
+    def take(self, columns):
+        """Fit restricted to some series"""
+        return HoltWintersFit(self.alpha[columns], self.beta[columns], self.gamma[columns],
+                              self.level[columns], self.trend[columns], self.seasonal[:, columns],
+                              self.n_rows, self.sse[columns], self.n_obs[columns])
+
+def initial_state(history, season=SEASON):
+    """Level, trend and seasonal indices from the first two seasons (flat when history is shorter)"""
+    history = np.asarray(history, dtype=np.float64)
+    n_series = history.shape[1]
+
+    def season_mean(rows):
+        observed = ~np.isnan(rows)
+        counts = observed.sum(axis=0)
+        return np.divide(np.nansum(rows, axis=0), counts, out=np.zeros(n_series), where=counts > 0)
+
+    first = history[:season]
+    level = season_mean(first)
+    if len(history) < 2 * season:
+        return level, np.zeros(n_series), np.zeros((season, n_series))
+
+    second = history[season:2 * season]
+    trend = (season_mean(second) - level) / season
+    deviations = np.stack([first - level, second - season_mean(second)])
+    observed = ~np.isnan(deviations)
+    counts = observed.sum(axis=0)
+    seasonal = np.divide(np.nansum(deviations, axis=0), counts, out=np.zeros((season, n_series)), where=counts > 0)
+    return level, trend, seasonal
+
+def smooth(history, alpha, beta, gamma, season=SEASON):
+    """
+    Run the recursions over a (T, N) history for C parameter sets at once
+    alpha, beta, gamma: arrays broadcastable to (C, N), or (N,) for one set per series
+    Returns (level, trend, seasonal, sse, n_obs) shaped like the parameters
+    """
+    history = np.asarray(history, dtype=np.float64)
+    alpha, beta, gamma = (np.asarray(value, dtype=np.float64) for value in (alpha, beta, gamma))
+    shape = np.broadcast_shapes(alpha.shape, beta.shape, gamma.shape, (history.shape[1],))
+    level0, trend0, seasonal0 = initial_state(history, season)
+
+    level = np.broadcast_to(level0, shape).copy()
+    trend = np.broadcast_to(trend0, shape).copy()
+    seasonal0 = seasonal0.reshape((season,) + (1,) * (len(shape) - 1) + (history.shape[1],))
+    seasonal = np.broadcast_to(seasonal0, (season,) + shape).copy()
+    sse = np.zeros(shape)
+    n_obs = np.zeros(shape[-1])
+
+    for t, row in enumerate(history):
+        s = seasonal[t % season]
+        expected = level + trend + s
+        observed = ~np.isnan(row)
+        y = np.where(observed, row, expected)
+        sse += np.square(y - expected)
+        n_obs += observed
+
+        previous = level
+        level = alpha * (y - s) + (1 - alpha) * (previous + trend)
+        trend = beta * (level - previous) + (1 - beta) * trend
+        seasonal[t % season] = gamma * (y - level) + (1 - gamma) * s
+
+    return level, trend, seasonal, sse, n_obs
+
+def _fit_block(history, grid, season):
+    """Grid search for one block of series; runs in-process or in a pool worker"""
+    combos = np.array(list(itertools.product(grid['alpha'], grid['beta'], grid['gamma'])))
+    alpha, beta, gamma = (combos[:, i, None] for i in range(3))
+    level, trend, seasonal, sse, n_obs = smooth(history, alpha, beta, gamma, season)
+
+    best = np.argmin(sse, axis=0)
+    columns = np.arange(history.shape[1])
+    return HoltWintersFit(
+        combos[best, 0], combos[best, 1], combos[best, 2],
+        level[best, columns], trend[best, columns], seasonal[:, best, columns],
+        len(history), sse[best, columns], n_obs
+    )
+
+def fit(history, grid=None, season=SEASON, block_size=5000, max_workers=None):
+    """
+    Fit every column of a (T, N) history, choosing parameters per series from the grid
+    Catalogs wider than block_size columns are split into blocks searched in
+    parallel on a shared spawn process pool (max_workers, default: CPU count)
+    """
+    history = np.asarray(history, dtype=np.float64)
+    grid = dict(DEFAULT_GRID, **(grid or {}))
+    n_series = history.shape[1]
+    if n_series <= block_size:
+        return _fit_block(history, grid, season)
+
+    blocks = [history[:, start:start + block_size] for start in range(0, n_series, block_size)]
+    pool = _fit_pool(min(len(blocks), max_workers or os.cpu_count() or 1))
+    try:
+        fits = list(pool.map(_fit_block, blocks, itertools.repeat(grid), itertools.repeat(season)))
+    except BrokenProcessPool:
+        # A worker died; the next fit starts a new pool
+        _reset_pool(pool)
+        raise
+
+    return HoltWintersFit(
+        *(np.concatenate([getattr(part, name) for part in fits])
+          for name in ('alpha', 'beta', 'gamma', 'level', 'trend')),
+        np.concatenate([part.seasonal for part in fits], axis=1),
+        len(history),
+        np.concatenate([part.sse for part in fits]),
+        np.concatenate([part.n_obs for part in fits])
+    )
+
+def refit(history, previous, season=SEASON):
+    """Rerun the recursions with already chosen parameters (no grid search)"""
+    level, trend, seasonal, sse, n_obs = smooth(history, previous.alpha, previous.beta, previous.gamma, season)
+    return HoltWintersFit(previous.alpha, previous.beta, previous.gamma,
+                          level, trend, seasonal, len(history), sse, n_obs)
@@ -0,0 +1,63 @@
+"""
+Offload - Bounded worker pool for CPU-heavy request work with backpressure
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class Overloaded(Exception):
+    """Raised when the pool and its queue are full; the API answers 503"""
+
+class BoundedExecutor:
+    """
+    Thread pool with a hard cap on running + queued tasks
+    submit() fails fast with Overloaded instead of letting the queue grow,
+    so a burst of heavy requests cannot starve cheap endpoints or the server.
+    A thread pool (not processes) is used because the agents' state lives in
+    this process; NumPy/pandas release the GIL in their heavy kernels.
+    """
+    def __init__(self, max_workers=None, max_queue=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = self.max_workers * 2 if max_queue is None else max_queue
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='cpu-offload')
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def submit(self, fn, *args, **kwargs):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise Overloaded(f"Server busy: {self.max_workers} workers and {self.max_queue} queued tasks in use")
+        with self._lock:
+            self.in_flight += 1
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    async def run(self, fn, *args, **kwargs):
+        """Await fn(*args, **kwargs) on the pool from async code"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'in_flight': self.in_flight,
+                'rejected': self.rejected
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -41,6 +41,20 @@ def test_main_api():
         else:
             print("❌ Inventory Optimization: FAILED")
         
+        # Test batch inventory optimization
+        batch_data = {
+            "item_id": ["TEST_ITEM_1", "TEST_ITEM_2", "TEST_ITEM_3"],
+            "annual_demand": [10000, 5000, 20000],
+            "ordering_cost": 50,
+            "holding_cost": 2
+        }
+        response = requests.post(f'{BASE_URL}/api/inventory/optimize/batch', json=batch_data)
+        if response.status_code == 200:
+            result = response.json()
+            print(f"✅ Batch Inventory Optimization: PASSED ({result['count']} items)")
+        else:
+            print("❌ Batch Inventory Optimization: FAILED")
+        
         # Test forecasting
         response = requests.get(f'{BASE_URL}/api/forecast?periods=5')
         if response.status_code == 200:
@@ -49,12 +63,12 @@ def test_main_api():
         else:
             print("❌ Forecasting: FAILED")
         
-        # Test demo
-        response = requests.get(f'{BASE_URL}/api/demo')
+        # Test forecast cache counters
+        response = requests.get(f'{BASE_URL}/api/forecast/cache')
         if response.status_code == 200:
-            print("✅ Demo Endpoint: PASSED")
+            print("✅ Forecast Cache Stats: PASSED")
         else:
-            print("❌ Demo Endpoint: FAILED")
+            print("❌ Forecast Cache Stats: FAILED")
             
     except requests.exceptions.ConnectionError:
         print("⚠️  Main API Server not running. Start with: python main.py")
@@ -127,10 +141,11 @@ def run_demo_scenario():
         
         # 4. Check inventory status
         print("\n4. Inventory Status Check:")
-        response = requests.get(f'{BASE_URL}/api/inventory/check?item_id=WIDGET_A&stock=200')
+        response = requests.post(f'{BASE_URL}/api/inventory/check/batch',
+                                 json={"item_id": ["WIDGET_A"], "available": [200]})
         if response.status_code == 200:
-            status = response.json()['status']
-            print(f"   {status}")
+            decisions = response.json()['decisions']
+            print(f"   {decisions['item_id'][0]}: {decisions['status'][0]}")
             
     except requests.exceptions.ConnectionError:
         print("⚠️  Servers not running. Start both servers first!")
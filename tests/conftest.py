@@ -0,0 +1,10 @@
+"""
+Shared test setup: run from the repository root so agents/, models/ and the
+top-level modules import the same way main.py imports them
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
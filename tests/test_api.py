@@ -0,0 +1,81 @@
+"""
+API route tests through the Flask test client, with fresh agents per test
+"""
+import json
+import pytest
+import main
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, '_components', {})
+    monkeypatch.setattr(main, 'FORECAST_DATA', 'data/sample_sku_data.csv')
+    monkeypatch.delenv('INVENTORY_DB', raising=False)
+    return main.app.test_client()
+
+OPTIMIZE = {'item_id': 'WIDGET', 'annual_demand': 3650, 'ordering_cost': 50, 'holding_cost': 2}
+
+def test_optimize_accepts_numbers_and_numeric_strings(client):
+    numbers = client.post('/api/inventory/optimize', json=OPTIMIZE).get_json()['optimization_result']
+    strings = client.post('/api/inventory/optimize', json={key: str(value) for key, value in OPTIMIZE.items()})
+    assert strings.status_code == 200
+    assert strings.get_json()['optimization_result']['reorder_point'] == numbers['reorder_point']
+    assert numbers['lead_time_days'] == 7
+
+@pytest.mark.parametrize('field, value', [
+    ('annual_demand', 'abc'), ('ordering_cost', [50]), ('holding_cost', True), ('lead_time', 'soon'),
+    ('daily_std_dev', {'sd': 5}), ('service_level', 'high'), ('service_level', 1.5), ('annual_demand', 'nan')
+])
+def test_optimize_rejects_invalid_numbers(client, field, value):
+    response = client.post('/api/inventory/optimize', json=dict(OPTIMIZE, **{field: value}))
+    assert response.status_code == 400
+    assert field in response.get_json()['error'] or field == 'service_level'
+
+def test_optimize_requires_fields(client):
+    response = client.post('/api/inventory/optimize', json=dict(OPTIMIZE, holding_cost=None))
+    assert response.status_code == 400
+    assert response.get_json()['error'] == "Missing required field: holding_cost"
+
+def plan_lines(client, **body):
+    response = client.post('/api/plan', json=body)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+def test_plan_streams_one_row_per_sku(client):
+    rows = plan_lines(client, priority='delivery')
+    assert [row['item_id'] for row in rows] == ['PROD001', 'PROD002', 'PROD003']
+    supplier_id, details = main.get_supplier_agent().evaluate_suppliers('delivery', top_k=1)[0]
+    assert {row['supplier_id'] for row in rows} == {supplier_id}
+    assert all(row['lead_time_days'] == details['details']['lead_time'] for row in rows)
+    # Plans are stored like /api/inventory/optimize results
+    assert main.get_inventory_agent().inventory_levels['PROD002']['reorder_point'] == rows[1]['reorder_point']
+
+def test_plan_blocks_match_single_pass(client):
+    whole = plan_lines(client, store=False)
+    assert plan_lines(client, block_size=1, store=False) == whole
+    agent = main.get_planning_agent()
+    assert list(agent.plan(store=False)) == whole
+    assert len(main.get_inventory_agent().inventory_levels) == 0
+
+def test_plan_selected_skus(client):
+    rows = plan_lines(client, skus='PROD003,PROD001', ordering_cost=100)
+    assert [row['item_id'] for row in rows] == ['PROD003', 'PROD001']
+    assert all(row['ordering_cost'] == 100 for row in rows)
+
+@pytest.mark.parametrize('body, status', [
+    ({'skus': ['PROD001', 'NOPE']}, 404),
+    ({'filters': 'cost<0'}, 400),
+    ({'block_size': 'many'}, 400),
+])
+def test_plan_rejects_bad_requests_before_streaming(client, body, status):
+    response = client.post('/api/plan', json=body)
+    assert response.status_code == status
+    assert 'error' in response.get_json()
+
+def test_summary_pages_with_next_after(client):
+    main.get_inventory_agent().optimize_batch([f"SKU{i}" for i in range(5)], [1000] * 5, 50, 2)
+    first = client.get('/api/inventory/summary?limit=3').get_json()
+    assert first['store']['items'] == 5
+    second = client.get(f"/api/inventory/summary?limit=3&after={first['next_after']}").get_json()
+    assert second['next_after'] is None
+    assert sorted(first['items']) + sorted(second['items']) == [f"SKU{i}" for i in range(5)]
@@ -0,0 +1,59 @@
+"""
+Demand store round-trips: write/read, CSV conversion and loading into the model
+"""
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from models.demand_store import convert_csv, read_store, write_store
+from models.forecast_model import SimpleForecastModel
+
+def test_round_trip_keeps_dates_demand_and_skus(tmp_path):
+    dates = pd.date_range('2024-01-01', periods=5)
+    demand = np.array([[1, np.nan], [2, 3], [4, 5], [6, np.nan], [7, 8]])
+    write_store(str(tmp_path), dates, demand, skus=['A', 'B'])
+
+    read_dates, read_demand, skus = read_store(str(tmp_path))
+    assert read_dates.equals(dates)
+    assert list(skus) == ['A', 'B']
+    assert read_demand.dtype == np.float32
+    np.testing.assert_array_equal(read_demand, demand.astype(np.float32))
+
+def test_memory_map_is_read_only_unless_loaded(tmp_path):
+    write_store(str(tmp_path), pd.date_range('2024-01-01', periods=3), [1.0, 2.0, 3.0])
+    _, mapped, skus = read_store(str(tmp_path))
+    assert skus is None
+    assert isinstance(mapped, np.memmap)
+    with pytest.raises(ValueError):
+        mapped[0, 0] = 9
+
+    _, loaded, _ = read_store(str(tmp_path), mmap=False)
+    assert not isinstance(loaded, np.memmap)
+    assert loaded.shape == (3, 1)
+
+def test_rejects_mismatched_rows_and_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        write_store(str(tmp_path), pd.date_range('2024-01-01', periods=2), [1.0, 2.0, 3.0])
+
+    write_store(str(tmp_path), pd.date_range('2024-01-01', periods=3), [1.0, 2.0, 3.0])
+    with open(tmp_path / 'meta.json', 'w') as f:
+        json.dump({'format': 99, 'skus': None}, f)
+    with pytest.raises(ValueError):
+        read_store(str(tmp_path))
+
+@pytest.mark.parametrize('csv_file', ['data/sample_data.csv', 'data/sample_sku_data.csv'])
+def test_converted_store_forecasts_like_csv(tmp_path, csv_file):
+    from_csv = SimpleForecastModel()
+    assert from_csv.load_data(csv_file)
+    from_store = SimpleForecastModel()
+    assert from_store.load_data(convert_csv(csv_file, str(tmp_path / 'store')))
+
+    assert (from_store.skus is None) == (from_csv.skus is None)
+    pd.testing.assert_frame_equal(from_store.data, from_csv.data, check_dtype=False)
+    for method in ('moving_average', 'seasonal'):
+        expected = from_csv.get_forecast(method, periods=14)
+        actual = from_store.get_forecast(method, periods=14)
+        np.testing.assert_allclose(actual['forecast'], expected['forecast'], rtol=1e-5)
+    if from_csv.skus is not None:
+        assert list(from_store.skus) == list(from_csv.skus)
+        np.testing.assert_allclose(from_store.sku_demand, from_csv.sku_demand)
@@ -0,0 +1,108 @@
+"""
+ERP client caching, coalescing and pagination, served by the ERP mock app in-process
+"""
+import asyncio
+import threading
+import time
+import pytest
+from api import erp_mock
+from api.erp_client import AsyncERPClient, ERPClient
+
+class MockResponse:
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self._json = response.get_json()
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self._json
+
+class MockSession:
+    """Stands in for requests.Session, routing GETs to the mock's Flask test client"""
+    def __init__(self, gate=None):
+        self.client = erp_mock.app.test_client()
+        self.gate = gate
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        path = url.split('localhost:5001', 1)[1]
+        with self._lock:
+            self.calls.append((path, dict(params or {})))
+        if self.gate is not None:
+            self.gate.wait(timeout)
+        return MockResponse(self.client.get(path, query_string=params))
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def client():
+    client = ERPClient()
+    client.session = MockSession()
+    return client
+
+def test_repeated_calls_are_served_from_cache(client):
+    assert client.get_suppliers() == client.get_suppliers()
+    assert client.get_sales(7) == client.get_sales(7)
+    assert len(client.session.calls) == 2
+    assert client.stats() == {'hits': 2, 'misses': 2, 'coalesced': 0, 'cached_entries': 2}
+
+    client.invalidate('/api/erp/suppliers')
+    client.get_suppliers()
+    assert len(client.session.calls) == 3
+    assert client.stats()['cached_entries'] == 2
+
+def test_expired_and_uncached_paths_are_refetched(client):
+    client.ttls['/api/erp/inventory'] = 0
+    client.get_inventory()
+    client.get_inventory()
+    client.health()
+    client.health()
+    assert [path for path, _ in client.session.calls] == ['/api/erp/inventory'] * 2 + ['/api/erp/health'] * 2
+
+def test_concurrent_identical_requests_share_one_call(client):
+    gate = threading.Event()
+    client.session.gate = gate
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.get_products())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while client.stats()['coalesced'] < 7 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(client.session.calls) == 1
+    assert len(results) == 8 and all(result == results[0] for result in results)
+    assert client.stats()['misses'] == 1
+
+def test_failed_request_is_not_cached(client):
+    client.session.get = lambda *args, **kwargs: (_ for _ in ()).throw(ConnectionError("down"))
+    with pytest.raises(ConnectionError):
+        client.get_suppliers()
+    client.session = MockSession()
+    assert client.get_suppliers() == erp_mock.erp.suppliers
+    assert client.stats()['cached_entries'] == 1
+
+def test_iter_sales_follows_cursors(client, monkeypatch):
+    monkeypatch.setattr(erp_mock, 'erp', erp_mock.ERPMockAPI(n_skus=7))
+    pages = list(client.iter_sales('2024-01-01', '2024-01-10', limit=16))
+    assert [len(page) for page in pages] == [16, 16, 16, 16, 6]
+    records = [record for page in pages for record in page]
+    assert records == erp_mock.erp.sales_records('2024-01-01', '2024-01-10', erp_mock.erp.resolve_skus())[0]
+    # Pages are not cached: a second pass fetches again
+    list(client.iter_sales('2024-01-01', '2024-01-10', limit=16))
+    assert len(client.session.calls) == 10
+
+def test_async_snapshot_shares_the_pooled_client(client):
+    snapshot = asyncio.run(AsyncERPClient(client).get_snapshot(sales_days=7))
+    assert set(snapshot) == {'suppliers', 'products', 'inventory', 'sales'}
+    assert len(snapshot['sales']) == 7
+    asyncio.run(AsyncERPClient(client).get_snapshot(sales_days=7))
+    assert len(client.session.calls) == 4
@@ -0,0 +1,82 @@
+"""
+ERP mock paginated and NDJSON endpoints
+"""
+import json
+import pytest
+from api import erp_mock
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(erp_mock, 'erp', erp_mock.ERPMockAPI(n_skus=25))
+    return erp_mock.app.test_client()
+
+def follow(client, path, **params):
+    """All records of a paginated endpoint, following next_cursor"""
+    records, cursor = [], None
+    while True:
+        query = dict(params, **({'cursor': cursor} if cursor is not None else {}))
+        page = client.get(path, query_string=query).get_json()
+        records.extend(page['data'])
+        total, cursor = page['total'], page['next_cursor']
+        if cursor is None:
+            return records, total
+
+def ndjson(client, path, **params):
+    response = client.get(path, query_string=params)
+    assert response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+def test_sales_pages_cover_the_range_once(client):
+    records, total = follow(client, '/api/erp/sales', start='2024-01-01', end='2024-01-31', limit=40)
+    assert total == len(records) == 31 * 25
+    assert len({(record['date'], record['sku']) for record in records}) == total
+    assert records[0]['date'] == '2024-01-01' and records[-1]['date'] == '2024-01-31'
+    assert [record['sales'] for record in records[:25]] == \
+        [record['sales'] for record in follow(client, '/api/erp/sales', start='2024-01-01', end='2024-01-01')[0]]
+
+def test_sales_stream_matches_pages(client, monkeypatch):
+    monkeypatch.setattr(erp_mock, 'STREAM_CHUNK_SIZE', 30)
+    pages, _ = follow(client, '/api/erp/sales', start='2024-02-01', end='2024-02-10', sku='PROD003,PROD020',
+                      limit=7)
+    streamed = ndjson(client, '/api/erp/sales/stream', start='2024-02-01', end='2024-02-10', sku='PROD003,PROD020')
+    assert streamed == pages
+    assert {record['sku'] for record in streamed} == {'PROD003', 'PROD020'}
+
+def test_inventory_pages_and_stream_agree(client, monkeypatch):
+    monkeypatch.setattr(erp_mock, 'STREAM_CHUNK_SIZE', 4)
+    pages, total = follow(client, '/api/erp/inventory/page', limit=6)
+    assert total == len(pages) == 25
+    assert pages[0] == {'sku': 'PROD001', 'current_stock': 500, 'reserved': 50, 'available': 450}
+    assert ndjson(client, '/api/erp/inventory/stream') == pages
+    assert all(record['available'] == record['current_stock'] - record['reserved'] for record in pages)
+
+def test_data_is_identical_across_instances():
+    first = erp_mock.ERPMockAPI(n_skus=10, seed=7)
+    second = erp_mock.ERPMockAPI(n_skus=10, seed=7)
+    positions = first.resolve_skus()
+    assert first.sales_records('2024-01-01', '2024-01-05', positions)[0] == \
+        second.sales_records('2024-01-01', '2024-01-05', positions)[0]
+    # A page is the matching slice of the full range
+    assert first.sales_records('2024-01-01', '2024-01-05', positions, offset=13, limit=9)[0] == \
+        first.sales_records('2024-01-01', '2024-01-05', positions)[0][13:22]
+
+@pytest.mark.parametrize('path, params, status', [
+    ('/api/erp/sales', {'sku': 'NOPE'}, 404),
+    ('/api/erp/sales', {'cursor': '-1'}, 400),
+    ('/api/erp/sales', {'limit': '0'}, 400),
+    ('/api/erp/sales/stream', {'sku': 'NOPE'}, 404),
+    ('/api/erp/inventory/page', {'sku': 'PROD001,NOPE'}, 404),
+    ('/api/erp/inventory/stream', {'sku': 'NOPE'}, 404),
+])
+def test_bad_queries_are_rejected(client, path, params, status):
+    response = client.get(path, query_string=params)
+    assert response.status_code == status
+    assert 'error' in response.get_json()
+
+def test_page_size_is_capped(client):
+    page = client.get('/api/erp/inventory/page', query_string={'limit': 10 ** 6}).get_json()
+    assert len(page['data']) == 25
+    page = client.get('/api/erp/sales', query_string={'start': '2020-01-01', 'end': '2024-12-31',
+                                                      'limit': 10 ** 6}).get_json()
+    assert len(page['data']) == erp_mock.MAX_PAGE_SIZE
+    assert page['next_cursor'] == str(erp_mock.MAX_PAGE_SIZE)
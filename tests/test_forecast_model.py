@@ -0,0 +1,150 @@
+"""
+Forecast model tests against the bundled sample data
+"""
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from models.forecast_model import RESIDUAL_BIN_EDGES, RollingDemandState, SimpleForecastModel, histogram_quantiles
+
+@pytest.fixture
+def model():
+    model = SimpleForecastModel()
+    assert model.load_data('data/sample_data.csv')
+    return model
+
+@pytest.fixture
+def sku_model():
+    model = SimpleForecastModel()
+    assert model.load_data('data/sample_sku_data.csv')
+    return model
+
+@pytest.mark.parametrize('demand', [None, float('nan'), float('inf'), -5, 'abc'])
+def test_rejected_observation_leaves_forecast_unchanged(model, demand):
+    before = model.get_forecast('moving_average', periods=5)
+    trend = model.get_trend_analysis()
+    version = model.data_version
+    last_date = model.data['date'].iloc[-1] + pd.Timedelta(days=1)
+
+    with pytest.raises(ValueError):
+        model.append_observations([{'date': last_date, 'demand': 10},
+                                   {'date': last_date, 'demand': demand}])
+
+    assert model.data_version == version
+    assert model.moving_average_forecast(periods=5) == before
+    assert model._compute_trend_analysis() == trend
+    assert not math.isnan(trend['slope'])
+
+def test_rejected_observation_date(model):
+    version = model.data_version
+    with pytest.raises(ValueError):
+        model.append_observations([{'date': 'not a date', 'demand': 10}])
+    with pytest.raises(ValueError):
+        model.append_observations([{'date': None, 'demand': 10}])
+    assert model.data_version == version
+
+@pytest.mark.parametrize('window', [7, 28, 29, 30])
+def test_moving_average_windows_beyond_rolling_tail(model, window):
+    series = pd.read_csv('data/sample_data.csv')['demand']
+    forecast = model.moving_average_forecast(window=window, periods=1)
+    assert forecast['forecast'][0] == round(series.tail(window).mean())
+
+def test_sku_moving_average_window_beyond_rolling_tail(sku_model):
+    data = pd.read_csv('data/sample_sku_data.csv', dtype={'sku': str})
+    forecast = sku_model.forecast_skus(['PROD001', 'PROD002'], window=30, periods=1)
+    for sku, value in zip(forecast['skus'], forecast['forecast'][:, 0]):
+        assert value == round(data.loc[data['sku'] == sku, 'demand'].tail(30).mean())
+
+def test_appends_leave_memory_mapped_history_shared(tmp_path):
+    from models.demand_store import convert_csv
+    store = convert_csv('data/sample_sku_data.csv', str(tmp_path / 'store'))
+    mapped, reference = SimpleForecastModel(), SimpleForecastModel()
+    assert mapped.load_data(store)
+    data = pd.read_csv('data/sample_sku_data.csv', dtype={'sku': str})
+    data['date'] = pd.to_datetime(data['date'])
+    last = data['date'].max()
+    batches = [
+        [{'date': last, 'sku': 'PROD001', 'demand': 5}],
+        [{'date': last + pd.Timedelta(days=1), 'sku': 'PROD002', 'demand': 40}],
+        [{'date': last + pd.Timedelta(days=1), 'sku': 'PROD002', 'demand': 2},
+         {'date': last + pd.Timedelta(days=2), 'sku': 'PROD001', 'demand': 30}]
+    ]
+    frames = [data]
+    for batch in batches:
+        mapped.append_observations(batch)
+        mapped.get_forecast('moving_average', window=40, skus=['PROD001', 'PROD002'])
+        frames.append(pd.DataFrame(batch).assign(date=lambda frame: pd.to_datetime(frame['date'])))
+    assert reference.load_data('data/sample_sku_data.csv')
+    reference.set_data(pd.concat(frames, ignore_index=True))
+
+    # The loaded matrix is still the read-only map, not a private copy
+    assert isinstance(mapped._sku_demand, np.memmap)
+    assert not mapped._sku_demand.flags.writeable
+    np.testing.assert_array_equal(mapped.sku_demand, reference.sku_demand)
+    np.testing.assert_array_equal(mapped.recent_sku_demand(5, [1]), reference.sku_demand[-5:, [1]])
+    for window in (7, 40):
+        np.testing.assert_array_equal(mapped.forecast_skus(window=window)['forecast'],
+                                      reference.forecast_skus(window=window)['forecast'])
+
+@pytest.mark.parametrize('method', ['moving_average', 'seasonal', 'holt_winters'])
+def test_quantile_bands_contain_point_forecast(model, sku_model, method):
+    forecast = model.get_forecast(method, periods=14, quantiles=(0.1, 0.5, 0.9))
+    point = np.array(forecast['forecast'])
+    assert (np.array(forecast['quantiles']['p10']) <= point).all()
+    assert (point <= np.array(forecast['quantiles']['p90'])).all()
+    assert (np.array(forecast['confidence_lower']) <= point).all()
+    assert (point <= np.array(forecast['confidence_upper'])).all()
+    if method != 'holt_winters':
+        assert forecast['quantiles']['p50'] == forecast['forecast']
+
+    skus = sku_model.get_forecast(method, periods=14, skus=list(sku_model.skus), quantiles=(0.1, 0.5, 0.9))
+    assert (skus['quantiles']['p10'] <= skus['forecast']).all()
+    assert (skus['forecast'] <= skus['quantiles']['p90']).all()
+
+def test_quantile_bands_are_ordered(model):
+    forecast = model.get_forecast('moving_average', periods=7, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95))
+    bands = [np.array(forecast['quantiles'][label]) for label in ('p5', 'p25', 'p50', 'p75', 'p95')]
+    for lower, upper in zip(bands, bands[1:]):
+        assert (lower <= upper).all()
+
+def noisy_state(n_days=200, n_series=2, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2024-01-01', periods=n_days)
+    matrix = 100 * (1 + rng.uniform(-0.3, 0.3, (n_days, n_series)))
+    return dates, matrix, RollingDemandState(dates, matrix, window=7)
+
+def test_residual_sketch_quantiles_match_exact_errors():
+    dates, matrix, state = noisy_state()
+    quantiles = (0.1, 0.25, 0.5, 0.75, 0.9)
+    # Exact one-step errors of every complete day against the trailing 7-day mean and the weekday mean
+    rows = range(1, len(matrix) - 1)
+    moving = np.array([matrix[t] / matrix[max(0, t - 7):t].mean(axis=0) - 1 for t in rows])
+    weekday = np.array([matrix[t] / matrix[t % 7:t:7].mean(axis=0) - 1 for t in rows if t >= 7])
+
+    for method, errors in (('moving_average', moving), ('seasonal', weekday)):
+        expected = np.quantile(errors, quantiles, axis=0)
+        # Within one histogram bin (0.025 around zero)
+        np.testing.assert_allclose(state.residual_quantiles(method, quantiles), expected, atol=0.03)
+
+def test_residual_sketch_from_appends_matches_batch():
+    dates, matrix, batch = noisy_state(n_days=60)
+    streamed = RollingDemandState(dates[:30], matrix[:30], window=7)
+    for date, row in zip(dates[30:], matrix[30:]):
+        streamed.add(date, np.arange(len(row)), row)
+    for method in ('moving_average', 'seasonal'):
+        np.testing.assert_array_equal(streamed.residuals[method], batch.residuals[method])
+
+def test_sparse_series_use_pooled_residuals():
+    dates, matrix, _ = noisy_state(n_days=60)
+    matrix[:-5, 1] = np.nan
+    state = RollingDemandState(dates, matrix, window=7)
+    assert state.residuals['moving_average'][:, 1].sum() < 10
+    pooled = histogram_quantiles(state.residuals['moving_average'].sum(axis=1, dtype=np.float64)[:, None], (0.1, 0.9))
+    np.testing.assert_allclose(state.residual_quantiles('moving_average', (0.1, 0.9))[:, 1], pooled[:, 0])
+
+def test_histogram_quantiles_interpolate_within_bins():
+    counts = np.zeros((len(RESIDUAL_BIN_EDGES) - 1, 1))
+    low = np.searchsorted(RESIDUAL_BIN_EDGES, 0.0)
+    counts[low] = 50   # [0, 0.025)
+    counts[low + 1] = 50  # [0.025, 0.05)
+    np.testing.assert_allclose(histogram_quantiles(counts, (0.25, 0.5, 0.75))[:, 0], [0.0125, 0.025, 0.0375])
@@ -0,0 +1,119 @@
+"""
+Holt-Winters recursions, grid search and the model's shared fit
+"""
+import threading
+import time
+import numpy as np
+import pytest
+from models import holt_winters
+from models.forecast_model import SimpleForecastModel
+
+def weekly_series(n_rows=8 * 7, n_series=3, noise=1.0, seed=0):
+    rng = np.random.default_rng(seed)
+    days = np.arange(n_rows)[:, None]
+    pattern = np.array([0, 2, 4, 6, 4, 2, -18], dtype=np.float64)
+    return 100 + 0.5 * days + pattern[days % 7] + rng.normal(0, noise, (n_rows, n_series))
+
+def reference_smooth(series, alpha, beta, gamma, season=7):
+    """Scalar textbook recursions for one series"""
+    level, trend, seasonal = holt_winters.initial_state(series[:, None], season)
+    level, trend, seasonal = level[0], trend[0], list(seasonal[:, 0])
+    sse = 0.0
+    for t, y in enumerate(series):
+        s = seasonal[t % season]
+        sse += (y - (level + trend + s)) ** 2
+        previous = level
+        level = alpha * (y - s) + (1 - alpha) * (previous + trend)
+        trend = beta * (level - previous) + (1 - beta) * trend
+        seasonal[t % season] = gamma * (y - level) + (1 - gamma) * s
+    return level, trend, np.array(seasonal), sse
+
+def test_initial_state_recovers_level_trend_and_season():
+    level, trend, seasonal = holt_winters.initial_state(weekly_series(n_series=1, noise=0))
+    assert level[0] == pytest.approx(101.5)
+    assert trend[0] == pytest.approx(0.5)
+    # Deviations from each week's mean: the pattern shifted by the in-week trend
+    expected = np.array([0, 2, 4, 6, 4, 2, -18]) + 0.5 * (np.arange(7) - 3)
+    np.testing.assert_allclose(seasonal[:, 0], expected)
+
+def test_vectorized_recursions_match_scalar_reference():
+    history = weekly_series()
+    level, trend, seasonal, sse, n_obs = holt_winters.smooth(history, 0.3, 0.1, 0.2)
+    for column in range(history.shape[1]):
+        expected = reference_smooth(history[:, column], 0.3, 0.1, 0.2)
+        assert level[column] == pytest.approx(expected[0])
+        assert trend[column] == pytest.approx(expected[1])
+        np.testing.assert_allclose(seasonal[:, column], expected[2])
+        assert sse[column] == pytest.approx(expected[3])
+    assert (n_obs == len(history)).all()
+
+def test_missing_observations_are_not_counted():
+    history = weekly_series()
+    history[10:14, 0] = np.nan
+    fit = holt_winters.fit(history)
+    assert fit.n_obs.tolist() == [len(history) - 4, len(history), len(history)]
+    assert np.isfinite(fit.level).all()
+
+def test_fit_picks_lowest_error_parameters_from_grid():
+    history = weekly_series()
+    fit = holt_winters.fit(history)
+    for column in range(history.shape[1]):
+        best = min((reference_smooth(history[:, column], a, b, g)[3], a, b, g)
+                   for a in holt_winters.DEFAULT_GRID['alpha']
+                   for b in holt_winters.DEFAULT_GRID['beta']
+                   for g in holt_winters.DEFAULT_GRID['gamma'])
+        assert (fit.alpha[column], fit.beta[column], fit.gamma[column]) == best[1:]
+        assert fit.sse[column] == pytest.approx(best[0])
+
+def test_refit_with_chosen_parameters_matches_fit():
+    history = weekly_series()
+    fit = holt_winters.fit(history)
+    again = holt_winters.refit(history, fit)
+    np.testing.assert_allclose(again.level, fit.level)
+    np.testing.assert_allclose(again.seasonal, fit.seasonal)
+    np.testing.assert_allclose(again.sse, fit.sse)
+
+def test_forecast_repeats_weekly_season_on_trend():
+    fit = holt_winters.fit(weekly_series())
+    values = fit.forecast(21)
+    assert values.shape == (3, 21)
+    step = values[:, 7:14] - values[:, :7]
+    np.testing.assert_allclose(step, 7 * fit.trend[:, None] * np.ones((1, 7)))
+    np.testing.assert_allclose(fit.forecast(21, columns=[2]), values[[2]])
+
+def test_blocks_on_pool_match_single_block():
+    history = weekly_series(n_series=10)
+    whole = holt_winters.fit(history)
+    blocked = holt_winters.fit(history, block_size=4, max_workers=2)
+    pool = holt_winters._pool
+    assert pool is not None
+    for name in ('alpha', 'beta', 'gamma', 'level', 'trend', 'sse', 'n_obs'):
+        np.testing.assert_allclose(getattr(blocked, name), getattr(whole, name))
+    np.testing.assert_allclose(blocked.seasonal, whole.seasonal)
+
+    # Later fits reuse the same pool
+    holt_winters.fit(history, block_size=4, max_workers=2)
+    assert holt_winters._pool is pool
+
+def test_concurrent_forecasts_fit_once_per_data_version(monkeypatch):
+    model = SimpleForecastModel()
+    assert model.load_data('data/sample_data.csv')
+    calls = []
+    original = holt_winters.fit
+
+    def slow_fit(history, **kwargs):
+        calls.append(len(history))
+        time.sleep(0.2)
+        return original(history, **kwargs)
+
+    monkeypatch.setattr(holt_winters, 'fit', slow_fit)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(model._holt_winters_fit('aggregate')))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
@@ -0,0 +1,131 @@
+"""
+Inventory simulation, service-level solver and reorder check tests
+"""
+import math
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+import pytest
+from agents.inventory_agent import SERVICE_LEVEL_GRID, InventoryAgent
+from models.forecast_model import SimpleForecastModel
+
+@pytest.fixture
+def model():
+    model = SimpleForecastModel()
+    assert model.load_data('data/sample_sku_data.csv')
+    return model
+
+def test_simulate_unknown_item_raises(model):
+    agent = InventoryAgent()
+    with pytest.raises(KeyError):
+        agent.simulate_forecast(model, [{'item_id': 'NOPE', 'reorder_point': 10, 'order_quantity': 20}],
+                                n_paths=10, days=30, seed=0)
+
+def test_simulate_uses_stored_demand_and_costs(model):
+    agent = InventoryAgent()
+    agent.optimize_inventory('WIDGET', 3650, ordering_cost=50, holding_cost_per_unit=2, lead_time_days=5,
+                             daily_std_dev=3)
+    result = agent.simulate_forecast(model, [{'item_id': 'WIDGET'}], n_paths=50, days=60, seed=0)
+    assert result['orders'][0] > 0
+    assert result['ordering_cost'][0] == result['orders'][0] * 50
+    assert result['holding_cost'][0] > 0
+
+def test_service_level_targets_are_bounded():
+    agent = InventoryAgent()
+    agent.service_levels.maxsize = 3
+    items = [f"SKU{i}" for i in range(5)]
+    agent.optimize_service_levels(items, annual_demand=[1000] * 5, holding_cost_per_unit=2, stockout_penalty=20,
+                                  ordering_cost=50)
+    assert len(agent.service_levels) == 3
+    assert agent.service_levels.get('SKU0') is None
+    level = agent.service_levels.get('SKU4')
+    assert agent.optimize_inventory('SKU4', 1000, 50, 2)['service_level'] == level
+
+def test_service_level_solver_matches_scalar_grid_search():
+    agent = InventoryAgent()
+    rng = np.random.default_rng(0)
+    n = 50
+    demand, holding, penalty = rng.uniform(100, 20000, n), rng.uniform(0.5, 5, n), rng.uniform(1, 100, n)
+    lead_time, std_dev = rng.integers(1, 15, n), rng.uniform(0.5, 20, n)
+    result = agent.optimize_service_levels([f"SKU{i}" for i in range(n)], demand, holding, penalty,
+                                           order_quantity=200, lead_time_days=lead_time, daily_std_dev=std_dev,
+                                           block_size=37, store=False)
+
+    for i in range(n):
+        sigma = std_dev[i] * math.sqrt(lead_time[i])
+        costs = []
+        for level in SERVICE_LEVEL_GRID:
+            z = NormalDist().inv_cdf(level)
+            loss = math.exp(-z * z / 2) / math.sqrt(2 * math.pi) - z * (1 - level)
+            costs.append((holding[i] * z + penalty[i] * demand[i] / 200 * loss) * sigma)
+        assert result['service_level'][i] == SERVICE_LEVEL_GRID[int(np.argmin(costs))]
+        assert result['total_cost'][i] == pytest.approx(min(costs), abs=0.01)
+
+def test_service_level_solver_follows_critical_ratio():
+    agent = InventoryAgent()
+    # Optimal Φ(z) = 1 − H·Q / (penalty·D): cheap holding or costly stockouts raise the target
+    result = agent.optimize_service_levels(['low', 'mid', 'high'], annual_demand=1000, holding_cost_per_unit=2,
+                                           stockout_penalty=[4, 40, 400], order_quantity=100)
+    np.testing.assert_allclose(result['service_level'], [0.95, 0.995, 0.9995], atol=0.001)
+    assert list(result['safety_stock']) == sorted(result['safety_stock'])
+    assert agent.service_levels.get('high') == result['service_level'][2]
+
+def test_service_level_solver_accepts_frame_and_eoq():
+    agent = InventoryAgent()
+    frame = pd.DataFrame({'item_id': ['A', 'B'], 'annual_demand': [3650, 730], 'holding_cost': [2, 2],
+                          'stockout_penalty': [25, 25], 'ordering_cost': [50, 50], 'lead_time': [5, 5]})
+    from_frame = agent.optimize_service_levels(frame, store=False)
+    # Without order_quantity the cycle length comes from the unrounded EOQ √(2DS/H)
+    explicit = agent.optimize_service_levels(['A', 'B'], [3650, 730], 2, 25, order_quantity=np.sqrt([182500, 36500]),
+                                             lead_time_days=5, store=False)
+    np.testing.assert_array_equal(from_frame['service_level'], explicit['service_level'])
+
+    with pytest.raises(ValueError):
+        agent.optimize_service_levels(['A'], [100], 2, 25)
+    with pytest.raises(ValueError):
+        agent.optimize_service_levels(['A', 'B'], [100, 200, 300], 2, 25, ordering_cost=50)
+
+@pytest.fixture
+def stocked_agent():
+    agent = InventoryAgent()
+    # daily demand 10, ROP 70 without safety stock, EOQ 100
+    for item_id in ('A', 'B', 'C', 'D'):
+        agent.optimize_inventory(item_id, 3650, ordering_cost=100 / 73, holding_cost_per_unit=1, daily_std_dev=0)
+    return agent
+
+def test_reorder_batch_statuses_orders_and_urgency(stocked_agent):
+    assert stocked_agent.inventory_levels['A']['reorder_point'] == 70
+    assert stocked_agent.inventory_levels['A']['optimal_order_quantity'] == 100
+    result = stocked_agent.check_reorder_batch({'A': 500, 'B': 40, 'C': -20, 'D': 70, 'NEW': 5})
+
+    assert result['item_id'] == ['C', 'B', 'D', 'A', 'NEW']
+    assert list(result['status']) == ['stockout', 'reorder', 'reorder', 'ok', 'no_policy']
+    # Enough EOQ multiples to lift stock above the reorder point
+    assert list(result['suggested_order_quantity']) == [100, 100, 100, 0, 0]
+    assert list(result['days_of_cover']) == [0.0, 4.0, 7.0, 50.0, np.inf]
+    assert np.isnan(result['reorder_point'][-1])
+
+    urgent = stocked_agent.check_reorder_batch({'A': 500, 'B': 40, 'C': -200, 'NEW': 5}, only_reorder=True)
+    assert urgent['item_id'] == ['C', 'B']
+    assert list(urgent['suggested_order_quantity']) == [300, 100]
+
+@pytest.mark.parametrize('stock', [
+    {'A': {'current_stock': 80, 'reserved': 20, 'available': 60}, 'B': {'current_stock': 90}},
+    {'item_id': ['A', 'B'], 'available': [60, 90]},
+    [{'sku': 'A', 'available': 60}, {'item_id': 'B', 'current_stock': 90}],
+])
+def test_reorder_batch_accepts_snapshot_shapes(stocked_agent, stock):
+    result = stocked_agent.check_reorder_batch(stock)
+    assert result['item_id'] == ['A', 'B']
+    assert list(result['available']) == [60, 90]
+    assert list(result['status']) == ['reorder', 'ok']
+
+def test_reorder_batch_defaults_to_erp_snapshot(stocked_agent):
+    assert stocked_agent.check_reorder_batch()['item_id'] == []
+    stocked_agent.stock_levels = {'A': 10, 'B': 100}
+    snapshot = stocked_agent.check_reorder_batch()
+    frame = stocked_agent.check_reorder_batch(pd.DataFrame({'item_id': ['A', 'B'], 'current_stock': [10, 100]}))
+    assert snapshot['item_id'] == frame['item_id'] == ['A', 'B']
+    assert list(snapshot['status']) == ['reorder', 'ok']
+    with pytest.raises(ValueError):
+        stocked_agent.check_reorder_batch({'item_id': ['A', 'B'], 'available': [1, 2, 3]})
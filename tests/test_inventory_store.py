@@ -0,0 +1,69 @@
+"""
+Inventory store tests
+"""
+import pytest
+from agents.inventory_store import MemoryInventoryStore, SQLiteInventoryStore
+
+def test_sqlite_writes_visible_to_other_connections(tmp_path):
+    path = str(tmp_path / 'inventory.db')
+    writer, reader = SQLiteInventoryStore(path), SQLiteInventoryStore(path)
+    writer['WIDGET'] = {'reorder_point': 10}
+    assert reader.get('WIDGET') == {'reorder_point': 10}
+    writer.close()
+    reader.close()
+
+def test_sqlite_bulk_write_commits_in_batches(tmp_path):
+    path = str(tmp_path / 'inventory.db')
+    store = SQLiteInventoryStore(path, batch_size=3)
+    store.put_many((f"SKU{i}", {'reorder_point': i}) for i in range(10))
+    assert not store._pending
+    assert len(SQLiteInventoryStore(path)) == 10
+    store.close()
+
+def test_sqlite_count_follows_own_and_other_writes(tmp_path):
+    path = str(tmp_path / 'inventory.db')
+    store, other = SQLiteInventoryStore(path, batch_size=4), SQLiteInventoryStore(path)
+    store.put_many((f"SKU{i}", {'reorder_point': i}) for i in range(10))
+    assert store.stats()['items'] == 10
+    # Replacing existing items and adding new ones in one batch
+    store.put_many((f"SKU{i}", {'reorder_point': -i}) for i in range(5, 15))
+    assert len(store) == 15
+    other.put_many([('SKU0', {}), ('OTHER', {})])
+    assert store.stats()['items'] == 16
+    store.close()
+    other.close()
+
+def test_sqlite_count_is_not_recomputed_for_own_writes(tmp_path):
+    store = SQLiteInventoryStore(str(tmp_path / 'inventory.db'))
+    assert len(store) == 0
+    statements = []
+    store._connect().set_trace_callback(statements.append)
+    store['A'] = {}
+    assert len(store) == 1
+    assert not any(statement == "SELECT COUNT(*) FROM inventory_levels" for statement in statements)
+    store.close()
+
+@pytest.mark.parametrize('make_store', [
+    lambda tmp_path: MemoryInventoryStore(),
+    lambda tmp_path: SQLiteInventoryStore(str(tmp_path / 'inventory.db'))
+])
+def test_keyset_pages_cover_store_once(tmp_path, make_store):
+    store = make_store(tmp_path)
+    store.put_many((f"SKU{i:03d}", {'reorder_point': i}) for i in range(25))
+    seen, after = [], None
+    while True:
+        page = store.page(limit=10, after=after)
+        seen.extend(item_id for item_id, _ in page)
+        if len(page) < 10:
+            break
+        after = page[-1][0]
+    assert seen == [item_id for item_id, _ in store.page()] == [f"SKU{i:03d}" for i in range(25)]
+    assert store.page(offset=2, limit=3, after='SKU010') == store.page(offset=13, limit=3)
+    store.close()
+
+def test_memory_get_many_marks_items_used():
+    store = MemoryInventoryStore(maxsize=3)
+    store.put_many([('A', {}), ('B', {}), ('C', {})])
+    assert store.get_many(['A', 'MISSING']) == [{}, None]
+    store['D'] = {}
+    assert 'A' in store and 'B' not in store
@@ -0,0 +1,94 @@
+"""
+Job queue tests: result paging over hand-written chunks, the runner, cancel, resume and cleanup
+"""
+import os
+import time
+import numpy as np
+from job_queue import JobQueue
+
+def write_chunk(queue, job_id, index, item_ids):
+    np.savez(os.path.join(queue.directory, job_id, f"chunk-{index:05d}.npz"),
+             item_id=np.array(item_ids), reorder_point=np.arange(len(item_ids)))
+
+def test_results_serve_only_contiguous_finished_chunks(tmp_path):
+    queue = JobQueue(str(tmp_path), data_path='data/sample_sku_data.csv')
+    job_id = queue.submit('plan', [])
+    write_chunk(queue, job_id, 0, ['A', 'B'])
+    write_chunk(queue, job_id, 2, ['E', 'F'])
+
+    result = queue.results(job_id, offset=0, limit=10)
+    assert result['chunks_ready'] == 1
+    assert result['rows_ready'] == 2
+    assert result['columns']['item_id'].tolist() == ['A', 'B']
+
+    write_chunk(queue, job_id, 1, ['C', 'D'])
+    assert queue.results(job_id, offset=2, limit=3)['columns']['item_id'].tolist() == ['C', 'D', 'E']
+    assert queue.results(job_id)['rows_ready'] == 6
+    queue.close()
+
+def wait_for(queue, job_id, statuses=('done', 'failed', 'cancelled'), timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.status(job_id)
+        if job['status'] in statuses:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} still {job['status']}")
+
+def test_runner_runs_jobs_submitted_from_another_process(tmp_path):
+    # The web worker only submits; the runner (another JobQueue on the same directory) runs
+    web = JobQueue(str(tmp_path), data_path='data/sample_sku_data.csv')
+    runner = JobQueue(str(tmp_path), data_path='data/sample_sku_data.csv', max_workers=1)
+    job_id = web.submit('forecast', ['PROD001', 'PROD002', 'PROD003'], {'periods': 5}, chunk_size=1)
+    assert web.status(job_id)['status'] == 'queued'
+    runner.start_runner()
+    job = wait_for(web, job_id)
+    assert job['status'] == 'done' and job['done_items'] == 3
+    assert web.results(job_id)['columns']['item_id'].tolist() == ['PROD001', 'PROD002', 'PROD003']
+    runner.close()
+    web.close()
+
+def test_cancel_from_any_process_skips_remaining_chunks(tmp_path):
+    web = JobQueue(str(tmp_path), data_path='data/sample_sku_data.csv')
+    runner = JobQueue(str(tmp_path), data_path='data/sample_sku_data.csv', max_workers=1)
+    job_id = web.submit('forecast', ['PROD001'] * 200, {'periods': 5}, chunk_size=1)
+    runner.run_pending()
+    web.cancel(job_id)
+    time.sleep(2)
+    job = web.status(job_id)
+    assert job['status'] == 'cancelled'
+    assert job['done_chunks'] < 200
+    runner.close()
+    web.close()
+
+def test_closed_runner_requeues_and_next_runner_resumes(tmp_path):
+    queue = JobQueue(str(tmp_path), data_path='data/sample_sku_data.csv')
+    job_id = queue.submit('forecast', ['PROD001', 'PROD002', 'PROD003'], {'periods': 5}, chunk_size=1)
+    with queue._lock, queue._connection:
+        # As if a runner had finished chunk 0 before shutting down
+        queue._connection.execute("UPDATE jobs SET status = 'running', owner_pid = ? WHERE id = ?",
+                                  (os.getpid(), job_id))
+    write_chunk(queue, job_id, 0, ['PROD001'])
+    queue.close()
+
+    web = JobQueue(str(tmp_path), data_path='data/sample_sku_data.csv')
+    assert web.status(job_id)['status'] == 'queued'
+    runner = JobQueue(str(tmp_path), data_path='data/sample_sku_data.csv', max_workers=1)
+    runner.run_pending()
+    job = wait_for(web, job_id)
+    assert job['status'] == 'done' and job['done_chunks'] == 3
+    # Chunk 0 was not recomputed: it still has the hand-written columns
+    assert 'reorder_point' in web.results(job_id)['columns']
+    runner.close()
+    web.close()
+
+def test_cleanup_deletes_expired_jobs_and_orphaned_directories(tmp_path):
+    queue = JobQueue(str(tmp_path), data_path='data/sample_sku_data.csv')
+    finished = queue.submit('plan', [])
+    queued = queue.submit('forecast', ['PROD001'])
+    os.makedirs(tmp_path / 'orphan')
+    assert queue.cleanup(retention=-1) == [finished]
+    assert not os.path.exists(tmp_path / finished)
+    assert not os.path.exists(tmp_path / 'orphan')
+    assert queue.status(queued)['status'] == 'queued'
+    queue.close()
@@ -0,0 +1,61 @@
+"""
+Cross-process metric aggregation tests
+"""
+import os
+from metrics import Registry
+
+def make_registry(directory):
+    registry = Registry()
+    requests = registry.counter('requests_total', 'Requests', ('route',))
+    latency = registry.histogram('latency_seconds', 'Latency', ('route',), buckets=(0.1, 1))
+    pool = registry.gauge('pool', 'Pool state', ('stat',))
+    registry.share(str(directory))
+    return registry, requests, latency, pool
+
+def test_render_merges_forked_workers(tmp_path):
+    registry, requests, latency, pool = make_registry(tmp_path)
+    requests.inc('/a')
+    pool.set('queued', value=3)
+
+    pid = os.fork()
+    if pid == 0:
+        # Worker: inherited values are dropped, its own are written for the parent to merge
+        registry.start_writer()
+        requests.inc('/a', amount=2)
+        latency.observe(0.5, '/a')
+        pool.set('queued', value=7)
+        registry.write()
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+    text = registry.render()
+    assert 'requests_total{route="/a"} 3' in text
+    assert 'latency_seconds_bucket{route="/a",le="1"} 1' in text
+    assert 'latency_seconds_count{route="/a"} 1' in text
+    # The exited worker's counts stay, its gauges do not
+    assert f'pool{{stat="queued",pid="{os.getpid()}"}} 3' in text
+    assert f'pid="{pid}"' not in text
+
+def test_render_without_directory_is_per_process():
+    registry = Registry()
+    requests = registry.counter('requests_total', 'Requests', ('route',))
+    requests.inc('/a')
+    assert 'requests_total{route="/a"} 1' in registry.render()
+
+def test_forked_worker_keeps_its_first_request(tmp_path):
+    registry, requests, _, _ = make_registry(tmp_path)
+    requests.inc('/inherited')
+
+    pid = os.fork()
+    if pid == 0:
+        # The order of main.py's hooks: start the writer, then record
+        for _ in range(2):
+            registry.start_writer()
+            requests.inc('/a')
+        registry.write()
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+    text = registry.render()
+    assert 'requests_total{route="/a"} 2' in text
+    assert 'requests_total{route="/inherited"} 1' in text
@@ -0,0 +1,68 @@
+"""
+Supplier ranking and filtering tests against the built-in supplier table
+"""
+import numpy as np
+import pytest
+from agents.supplier_agent import SupplierAgent
+
+@pytest.fixture
+def agent():
+    return SupplierAgent()
+
+def test_top_k_limits_ranking(agent):
+    ranked = agent.evaluate_suppliers('balanced')
+    assert [supplier_id for supplier_id, _ in agent.evaluate_suppliers('balanced', top_k=2)] == \
+        [supplier_id for supplier_id, _ in ranked[:2]]
+    assert agent.evaluate_suppliers('balanced', top_k=0) == []
+
+def test_negative_top_k_rejected(agent):
+    with pytest.raises(ValueError):
+        agent.evaluate_suppliers('balanced', top_k=-1)
+
+@pytest.mark.parametrize('condition', ['lead_time!=5', 'lead_time<=100', 'lead_time>=0'])
+def test_filters_skip_suppliers_missing_the_metric(agent, condition):
+    agent.add_supplier('supplier_d', {'name': 'No Lead Time Ltd.', 'cost': 5, 'quality': 9,
+                                      'delivery': 9, 'reliability': 9})
+    ids = [supplier_id for supplier_id, _ in agent.evaluate_suppliers('balanced', filters=condition)]
+    assert 'supplier_d' not in ids
+    assert ids
+
+def tied_agent(n=5000):
+    agent = SupplierAgent()
+    for i in range(n):
+        # Integer scores on a 1-10 scale: many suppliers tie
+        agent.add_supplier(f"s{i}", {'name': f"S{i}", 'cost': 1 + (i * 7) % 3, 'quality': 5, 'delivery': 5,
+                                     'reliability': 5, 'lead_time': 3})
+    return agent
+
+def test_top_k_is_prefix_of_full_ranking_with_ties():
+    full = [supplier_id for supplier_id, _ in tied_agent().evaluate_suppliers('cost')]
+    for k in (1, 5, 50):
+        # A fresh agent each time, so no cached full ranking is reused
+        partial = [supplier_id for supplier_id, _ in tied_agent().evaluate_suppliers('cost', top_k=k)]
+        assert partial == full[:k]
+    assert tied_agent().get_best_supplier('cost')[0] == full[0]
+
+def test_pareto_front_matches_pairwise_dominance():
+    agent = SupplierAgent()
+    rng = np.random.default_rng(0)
+    # Coarse integer metrics give duplicates and ties on single criteria
+    for i, (cost, quality, lead_time) in enumerate(rng.integers(1, 11, (3000, 3)).tolist()):
+        agent.add_supplier(f"s{i}", {'name': f"S{i}", 'cost': cost, 'quality': quality, 'delivery': 5,
+                                     'reliability': 5, 'lead_time': lead_time})
+
+    ids = list(agent.suppliers)
+    points = np.array([[agent.suppliers[i]['cost'], -agent.suppliers[i]['quality'], agent.suppliers[i]['lead_time']]
+                       for i in ids])
+    dominated = ((points[:, None, :] <= points[None, :, :]).all(axis=2) &
+                 (points[:, None, :] < points[None, :, :]).any(axis=2)).any(axis=0)
+    expected = {ids[i] for i in np.flatnonzero(~dominated)}
+
+    front = agent.pareto_front(block_size=64)
+    assert {supplier_id for supplier_id, _ in front} == expected
+    costs = [supplier['cost'] for _, supplier in front]
+    assert costs == sorted(costs)
+
+def test_pareto_front_rejects_unknown_criteria(agent):
+    with pytest.raises(ValueError):
+        agent.pareto_front(criteria='cost,price')
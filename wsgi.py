@@ -0,0 +1,17 @@
+"""
+WSGI entry point - production serving with pre-loaded shared state
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+With preload_app the master imports this module once, loads agents and
+forecast data, then forks the workers, which share those pages copy-on-write.
+"""
+import gc
+from main import create_app
+
+app = create_app(warm_up_mode='eager')
+
+# Move everything allocated so far out of the collector's generations so
+# garbage collection in the workers does not touch (and copy) shared pages
+gc.collect()
+gc.freeze()